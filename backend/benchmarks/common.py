@@ -0,0 +1,50 @@
+import statistics
+from collections.abc import Sequence
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.models import DOCUMENT_MODELS
+from src.utils.database import create_mongo_client
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    index = max(round(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def report(name: str, timings: Sequence[float], unit: str = "us") -> None:
+    """Prints latency statistics for timings measured in seconds.
+
+    Args:
+        name (str): Label of the measured scenario.
+        timings (Sequence[float]): Measured durations in seconds.
+        unit (str, optional): Display unit, "us" or "ms". Defaults to "us".
+    """
+    scale = 1e6 if unit == "us" else 1e3
+    values = [timing * scale for timing in timings]
+    print(
+        f"{name:<36} n={len(values):<6}"
+        f" mean={statistics.fmean(values):9.1f}{unit}"
+        f" p50={percentile(values, 50):9.1f}{unit}"
+        f" p99={percentile(values, 99):9.1f}{unit}"
+    )
+
+
+async def init_database(
+    database_name: str = "formwise_benchmarks",
+) -> AsyncIOMotorClient:
+    """Initializes Beanie against a dedicated benchmark database.
+
+    Args:
+        database_name (str, optional): Database to use.
+            Defaults to "formwise_benchmarks".
+
+    Returns:
+        AsyncIOMotorClient: The MongoDB client, to be closed by the caller.
+    """
+    client = create_mongo_client()
+    await init_beanie(database=client[database_name], document_models=DOCUMENT_MODELS)
+    return client
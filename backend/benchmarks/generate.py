@@ -0,0 +1,107 @@
+"""Load-tests `POST /forms/generate` through the ASGI app with the offline LLM,
+measuring middleware, rate limiting and persistence overhead without a provider.
+
+Usage:
+    python -m benchmarks.generate --requests 200 --concurrency 20 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from collections import Counter
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.common import init_database, percentile, report
+from src.config import settings
+from src.main import app
+from src.models.user import AuthProvider, User
+from src.utils.form_generation import FormGenerator
+from src.utils.metrics import METRICS
+from src.utils.security import create_access_token
+
+PROMPT = "Create a customer feedback form for our coffee shop, variant {}."
+
+
+async def create_users(count: int) -> list[dict[str, str]]:
+    """Creates benchmark users, returning their auth headers."""
+    users = [
+        User(
+            email=f"benchmark{i}@example.com",
+            first_name="Benchmark",
+            last_name="User",
+            auth_provider=AuthProvider.EMAIL,
+            is_active=True,
+        )
+        for i in range(count)
+    ]
+    await User.insert_many(users)
+    return [
+        {"Authorization": f"Bearer {create_access_token(user.email)}"} for user in users
+    ]
+
+
+async def run(args: argparse.Namespace) -> tuple[list[float], Counter]:
+    """Sends generation requests from a number of users, with limited concurrency."""
+    headers = await create_users(args.users)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    timings, statuses = [], Counter()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+
+        async def generate(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/forms/generate",
+                    json={"prompt": PROMPT.format(i % args.prompts)},
+                    headers=headers[i % args.users],
+                )
+                timings.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+        await asyncio.gather(*(generate(i) for i in range(args.requests)))
+
+    return timings, statuses
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.LLM_PROVIDER = "fake"
+    settings.FAKE_LLM_LATENCY = args.latency
+    settings.FAKE_LLM_LATENCY_SIGMA = args.sigma
+    settings.MAX_FORMS = args.requests  # measure generation, not the form limit
+    settings.GENERATION_TEMPLATE_THRESHOLD = math.inf  # always call the model
+    app.state.form_generator = FormGenerator()
+
+    client = await init_database()
+    try:
+        start = time.perf_counter()
+        timings, statuses = await run(args)
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.drop_database("formwise_benchmarks")
+        client.close()
+
+    report(f"generate latency={args.latency:g}s", timings, unit="ms")
+    print(f"throughput={len(timings) / elapsed:.1f} req/s statuses={dict(statuses)}")
+
+    # Time spent outside the (fake) model call: middlewares, auth, persistence
+    model_p50 = METRICS.histogram("generation_duration_seconds").percentile(50)
+    overhead = percentile(timings, 50) - model_p50
+    print(f"model p50={model_p50 * 1e3:.1f}ms overhead p50~={overhead * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.generate")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50, help="Spreads rate limits.")
+    parser.add_argument(
+        "--prompts", type=int, default=200, help="Distinct prompts, fewer hit caches."
+    )
+    parser.add_argument("--latency", type=float, default=0.5, help="Median seconds.")
+    parser.add_argument("--sigma", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
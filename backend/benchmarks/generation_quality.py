@@ -0,0 +1,109 @@
+"""Measures generation quality and latency of `FormGenerator` over a prompt corpus.
+
+Records the provider's outputs to a cassette, or replays a recorded cassette
+offline and deterministically, so the effect of prompt, model or repair changes
+on parse success, field counts and latency can be compared between runs.
+
+Usage:
+    python -m benchmarks.generation_quality --record --cassette cassettes/base.jsonl
+    python -m benchmarks.generation_quality --cassette cassettes/base.jsonl
+"""
+
+import argparse
+import asyncio
+import math
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.common import percentile, report
+from src.config import settings
+from src.models.form import FormCreate
+from src.utils.form_generation import FormGenerator
+from src.utils.llm_cassette import CassetteMissError
+from src.utils.metrics import METRICS
+
+CORPUS = Path(__file__).with_name("prompts.txt")
+
+
+def load_corpus(path: Path) -> list[str]:
+    """Reads distinct prompts, one per line, so none is served from the cache."""
+    lines = (line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return list(dict.fromkeys(line for line in lines if line))
+
+
+async def run(
+    generator: FormGenerator, prompts: list[str], concurrency: int
+) -> tuple[list[float], list[FormCreate], Counter]:
+    """Generates a form per prompt, with limited concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, forms, outcomes = [], [], Counter()
+
+    async def generate(prompt: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                form = await generator.generate_form(prompt)
+            except CassetteMissError:
+                outcomes["not recorded"] += 1
+                return
+            except ValueError:
+                outcomes["parse failure"] += 1
+            except Exception as err:
+                outcomes[type(err).__name__] += 1
+            else:
+                forms.append(form)
+                outcomes["ok"] += 1
+            timings.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(generate(prompt) for prompt in prompts))
+    return timings, forms, outcomes
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.LLM_CASSETTE = "record" if args.record else "replay"
+    settings.LLM_CASSETTE_PATH = args.cassette
+    settings.LLM_CASSETTE_LATENCY = not args.no_latency
+    settings.GENERATION_TEMPLATE_THRESHOLD = math.inf  # always call the model
+    settings.GENERATION_MAX_CONCURRENCY = args.concurrency
+    generator = FormGenerator()
+
+    prompts = load_corpus(args.corpus)
+    timings, forms, outcomes = await run(generator, prompts, args.concurrency)
+
+    attempted = len(prompts) - outcomes["not recorded"]
+    repairs = METRICS.counter("generation_repairs_total").value
+    print(f"{settings.LLM_CASSETTE} {args.cassette}: {len(prompts)} prompts")
+    print(
+        f"parse success={outcomes['ok'] / max(attempted, 1):.1%}"
+        f" repaired={repairs} outcomes={dict(outcomes)}"
+    )
+
+    if forms:
+        field_counts = [len(form.fields) for form in forms]
+        field_types = Counter(
+            field.type.value for form in forms for field in form.fields
+        )
+        print(
+            f"fields per form mean={statistics.fmean(field_counts):.1f}"
+            f" p50={percentile(field_counts, 50)}"
+            f" min={min(field_counts)} max={max(field_counts)}"
+        )
+        print(f"field types={dict(field_types.most_common())}")
+    if timings:
+        report("generate_form", timings, unit="ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.generation_quality")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--cassette", default=settings.LLM_CASSETTE_PATH)
+    parser.add_argument(
+        "--record", action="store_true", help="Calls the provider, recording outputs."
+    )
+    parser.add_argument(
+        "--no-latency", action="store_true", help="Replays without recorded latency."
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
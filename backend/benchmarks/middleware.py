@@ -0,0 +1,89 @@
+"""Measures the per-request overhead of the middleware stack built by
+`add_middlewares`, for rate-limited and unrelated routes.
+
+Usage:
+    python -m benchmarks.middleware --requests 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from benchmarks.common import report
+from src.middlewares import add_middlewares
+
+UNRELATED_PATH = "/api/v1/forms"
+LIMITED_PATH = "/api/v1/forms/generate"
+
+
+def create_app(with_middlewares: bool) -> FastAPI:
+    """Creates a minimal app, optionally with the production middleware stack."""
+    app = FastAPI()
+
+    @app.get(UNRELATED_PATH)
+    async def unrelated():
+        return {"detail": "OK"}
+
+    @app.post(LIMITED_PATH)
+    async def limited():
+        return {"detail": "OK"}
+
+    if with_middlewares:
+        add_middlewares(app)
+    return app
+
+
+async def call(app: FastAPI, method: str, path: str, client: int) -> None:
+    """Sends a single HTTP request through the ASGI interface."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": (f"10.0.{client // 256 % 256}.{client % 256}", 1234),
+        "server": ("benchmark", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: FastAPI, method: str, path: str, requests: int) -> list[float]:
+    """Times sequential requests, each from a distinct client."""
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        await call(app, method, path, client=i)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main(args: argparse.Namespace) -> None:
+    for with_middlewares in (False, True):
+        app = create_app(with_middlewares)
+        # Warm up routing and middleware stack construction
+        await measure(app, "GET", UNRELATED_PATH, 100)
+
+        label = "stack" if with_middlewares else "bare"
+        for method, path in (("GET", UNRELATED_PATH), ("POST", LIMITED_PATH)):
+            timings = await measure(app, method, path, args.requests)
+            report(f"{label} {method} {path}", timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.middleware")
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
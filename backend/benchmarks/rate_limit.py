@@ -0,0 +1,55 @@
+"""Measures the overhead each rate limit backend adds per request.
+
+Usage:
+    python -m benchmarks.rate_limit --requests 2000 --backend memory mongo
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import init_database, report
+from src.utils.rate_limit import (
+    InMemoryRateLimitBackend,
+    MongoRateLimitBackend,
+    RateLimitBackend,
+)
+
+BACKENDS: dict[str, type[RateLimitBackend]] = {
+    "memory": InMemoryRateLimitBackend,
+    "mongo": MongoRateLimitBackend,
+}
+
+
+async def measure(
+    backend: RateLimitBackend, requests: int, clients: int
+) -> list[float]:
+    """Times sequential checks spread across a number of client keys."""
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        await backend.hit(f"benchmark:{i % clients}", limit=10, period=60)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await init_database() if "mongo" in args.backend else None
+    try:
+        for name in args.backend:
+            timings = await measure(BACKENDS[name](), args.requests, args.clients)
+            report(f"backend={name}", timings)
+    finally:
+        if client:
+            await client.drop_database("formwise_benchmarks")
+            client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rate_limit")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument(
+        "--backend", nargs="+", choices=list(BACKENDS), default=["memory"]
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""Measures the latency of saving a form submission at each durability level.
+
+Writes at the "durable" level wait for a majority of the replica set, so run
+against a replica set to see the difference with "fast" writes.
+
+Usage:
+    python -m benchmarks.submit --requests 500 --durability fast standard durable
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import init_database, report
+from src.models.form import Form, FormDurability, FormResponse
+from src.models.user import AuthProvider, User
+from src.utils.database import insert
+
+ANSWERS = {"name": "Ada Lovelace", "email": "ada@example.com", "guests": 2}
+
+
+async def measure(
+    form: Form, durability: FormDurability, requests: int, concurrency: int
+) -> list[float]:
+    """Times submissions saved by concurrent clients."""
+    timings = []
+
+    async def client(count: int) -> None:
+        for _ in range(count):
+            start = time.perf_counter()
+            await insert(FormResponse(form=form, answers=ANSWERS), durability)
+            timings.append(time.perf_counter() - start)
+
+    await asyncio.gather(
+        *(
+            client(requests // concurrency + (i < requests % concurrency))
+            for i in range(concurrency)
+        )
+    )
+    return timings
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await init_database()
+    try:
+        user = User(
+            email="benchmark@example.com",
+            first_name="Bench",
+            last_name="Mark",
+            auth_provider=AuthProvider.EMAIL,
+        )
+        await user.create()
+
+        for durability in args.durability:
+            form = Form(title="Benchmark", durability=durability, creator=user)
+            await form.create()
+            timings = await measure(
+                form, FormDurability(durability), args.requests, args.concurrency
+            )
+            report(f"durability={durability}", timings, unit="ms")
+    finally:
+        await client.drop_database("formwise_benchmarks")
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.submit")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--durability",
+        nargs="+",
+        choices=[durability.value for durability in FormDurability],
+        default=[durability.value for durability in FormDurability],
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,5 @@
+import os
+
+# Logfire registers a pydantic plugin, which pydantic imports with the first
+# model even though it is disabled by default, delaying startup noticeably
+os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "logfire-plugin")
@@ -1,9 +1,10 @@
-from typing import Literal
+from typing import Literal, Self
 
 from dotenv import load_dotenv
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from src.utils.custom_types import MongoDsn
+from src.utils.custom_types import MongoDsn, ReadPreferenceMode
 
 
 class Settings(BaseSettings):
@@ -19,12 +20,37 @@ class Settings(BaseSettings):
     # *** MongoDB settings ***
     MONGO_URI: MongoDsn
     MONGO_DB_NAME: str = "formwise"
+    # Create missing indexes at startup, or with `python -m src.manage indexes`
+    MONGO_INIT_INDEXES: bool = True
+
+    # *** MongoDB connection pool settings ***
+    # Override the options of MONGO_URI, timeouts are in seconds
+    MONGO_MAX_POOL_SIZE: int = 100  # connections per server
+    MONGO_MIN_POOL_SIZE: int = 5  # opened at startup, and kept open
+    MONGO_MAX_IDLE_TIME: float | None = 300  # before closing idle connections
+    MONGO_WAIT_QUEUE_TIMEOUT: float | None = None  # to check out a connection
+    MONGO_CONNECT_TIMEOUT: float = 20
+    MONGO_SERVER_SELECTION_TIMEOUT: float = 30
+    MONGO_SOCKET_TIMEOUT: float | None = None
+    MONGO_COMPRESSORS: str = ""  # e.g. "zstd,zlib", zstd needs `zstandard`
+
+    # *** MongoDB read preference settings ***
+    # Where read-heavy endpoints read from, e.g. "secondaryPreferred" to keep
+    # dashboard traffic off the primary. Submissions always use the primary.
+    MONGO_READ_PREFERENCE_FORM: ReadPreferenceMode = "primary"  # form reads
+    MONGO_READ_PREFERENCE_FORM_LIST: ReadPreferenceMode = "primary"  # user's forms
+    MONGO_READ_PREFERENCE_RESPONSES: ReadPreferenceMode = "primary"  # form responses
+    MONGO_MAX_STALENESS: int | None = None  # of secondaries, in seconds (at least 90)
 
     # *** JWT settings ***
     JWT_SECRET: str = "secret"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 60  # 1 hour
 
+    # *** Password hashing settings ***
+    # bcrypt cost factor, tune with `python -m src.manage calibrate-hash`
+    PASSWORD_HASH_ROUNDS: int = 12
+
     # *** Google OAuth settings ***
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
@@ -32,16 +58,75 @@ class Settings(BaseSettings):
     # *** Logfire settings ***
     LOGFIRE_TOKEN: str = ""
 
+    # *** Metrics settings ***
+    # Serve process metrics at /metrics, which is otherwise not found
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""  # bearer token required by /metrics, if set
+
     # *** Form settings ***
     MAX_FORMS: int = 5  # per user
     MAX_FIELDS: int = 50
     MAX_RESPONSES: int = 150  # per form
 
     # *** LLM settings ***
-    GROQ_API_KEY: str
+    # "fake" answers locally with synthesized forms, for load tests and development
+    LLM_PROVIDER: Literal["groq", "fake"] = "groq"
+    GROQ_API_KEY: str = ""  # required for the "groq" provider
     GROQ_MODEL: str = "llama-3.1-70b-versatile"
     GROQ_TEMPERATURE: float = 0.5
 
+    FAKE_LLM_LATENCY: float = 1.0  # median, in seconds
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5  # log-normal shape, 0 for a fixed latency
+    FAKE_LLM_SEED: int | None = None  # makes latencies reproducible per prompt
+
+    # "record" saves model outputs to the cassette, "replay" serves them offline
+    LLM_CASSETTE: Literal["record", "replay"] | None = None
+    LLM_CASSETTE_PATH: str = "cassettes/generation.jsonl"
+    LLM_CASSETTE_LATENCY: bool = True  # replay with the recorded latencies
+
+    # *** Generation prompt screening settings ***
+    GENERATION_PROMPT_SCREENING: bool = True  # reject unusable prompts locally
+
+    # *** Generation admission settings ***
+    GENERATION_MAX_CONCURRENCY: int = 4  # LLM calls in flight per worker
+    GENERATION_MAX_QUEUE: int = 16  # requests waiting for a slot
+    GENERATION_QUEUE_TIMEOUT: float = 10  # in seconds
+
+    # *** Generation fair share settings ***
+    GENERATION_USER_MAX_CONCURRENCY: int = 2  # LLM calls in flight per user
+    GENERATION_USER_MAX_QUEUE: int = 4  # requests waiting per user
+    GENERATION_USER_DAILY_TOKENS: int = 200_000  # per user, 0 disables the budget
+
+    # *** Generation resilience settings ***
+    GENERATION_TIMEOUT: float = 30  # per attempt, in seconds
+    GENERATION_MAX_RETRIES: int = 2
+    GENERATION_RETRY_BACKOFF: float = 0.5  # base delay, in seconds
+    GENERATION_RETRY_BACKOFF_MAX: float = 8  # in seconds
+    GENERATION_HEDGE: bool = False  # duplicate attempts slower than p95
+    GENERATION_HEDGE_MIN_SAMPLES: int = 20  # latencies needed before hedging
+    GENERATION_BREAKER_THRESHOLD: int = 5  # consecutive failures
+    GENERATION_BREAKER_RESET: float = 30  # in seconds
+
+    # *** Generation template settings ***
+    # Minimum prompt similarity (0-1) to serve a curated template, above 1 disables
+    GENERATION_TEMPLATE_THRESHOLD: float = 0.75
+
+    # *** Generation cache settings ***
+    GENERATION_CACHE_SIZE: int = 256  # in-memory entries per worker
+    GENERATION_CACHE_TTL: int = 24 * 60 * 60  # in seconds
+    GENERATION_CACHE_PERSIST: bool = False  # share entries through MongoDB
+
+    # *** Generation job settings ***
+    GENERATION_WORKERS: int = 2  # in-process job workers, 0 to run them separately
+    GENERATION_JOB_POLL_INTERVAL: float = 1  # in seconds
+    GENERATION_JOB_LEASE: float = 120  # in seconds, before a job is reclaimed
+    GENERATION_JOB_MAX_ATTEMPTS: int = 3
+    GENERATION_JOB_TTL: int = 7 * 24 * 60 * 60  # in seconds, after completion
+
+    # *** Generation batch settings ***
+    GENERATION_BATCH_MAX_SIZE: int = 12  # prompts per batch
+    GENERATION_BATCH_CONCURRENCY: int = 4  # generations in flight per batch
+
     # *** LangSmith settings ***
     LANGCHAIN_API_KEY: str
     LANGCHAIN_ENDPOINT: str
@@ -49,8 +134,33 @@ class Settings(BaseSettings):
     LANGCHAIN_TRACING_V2: Literal["true", "false"]
 
     # *** Rate Limit settings ***
+    # "memory" is per process, "mongo" is shared across workers
+    RATE_LIMIT_BACKEND: Literal["memory", "mongo"] = "memory"
     RATE_LIMIT_DELTA: int = 60  # in seconds
-    RATE_LIMIT_LIMIT: int = 10
+    RATE_LIMIT_LIMIT: int = 10  # per client
+    RATE_LIMIT_MAX_KEYS: int = 10_000  # clients tracked in memory
+    RATE_LIMIT_BATCH_LIMIT: int = 2  # batch generations per client
+    RATE_LIMIT_SUBMIT_DELTA: int = 60  # in seconds
+    RATE_LIMIT_SUBMIT_LIMIT: int = 5  # per client per form
+    RATE_LIMIT_SUBMIT_FORM_LIMIT: int = 60  # per form across clients
+
+    @model_validator(mode="after")
+    def validate_llm_provider(self) -> Self:
+        """Ensures the selected LLM provider is configured."""
+        if (
+            self.LLM_PROVIDER == "groq"
+            and self.LLM_CASSETTE != "replay"
+            and not self.GROQ_API_KEY
+        ):
+            raise ValueError('GROQ_API_KEY is required for the "groq" LLM provider.')
+        return self
+
+    @model_validator(mode="after")
+    def validate_max_staleness(self) -> Self:
+        """Ensures the max staleness of secondaries is accepted by MongoDB."""
+        if self.MONGO_MAX_STALENESS is not None and self.MONGO_MAX_STALENESS < 90:
+            raise ValueError("MONGO_MAX_STALENESS must be at least 90 seconds.")
+        return self
 
     @property
     def allowed_origins(self) -> list[str]:
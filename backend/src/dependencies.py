@@ -1,12 +1,38 @@
-from typing import Annotated
+import logging
+from typing import TYPE_CHECKING, Annotated
 
-from fastapi import Depends
+from fastapi import Depends, FastAPI
 
 from src.models.user import User
 from src.utils.security import CurrentUser as _CurrentUser
 
+if TYPE_CHECKING:
+    from src.utils.form_generation import FormGenerator
+
+logger = logging.getLogger(__name__)
+
 # Current authenticated user
 CurrentUser = Annotated[User, Depends(_CurrentUser())]
 
 # Current authenticated user with pre-fetched linked documents
 CurrentUserWithLinks = Annotated[User, Depends(_CurrentUser(fetch_links=True))]
+
+
+def get_form_generator(app: FastAPI) -> "FormGenerator":
+    """Returns the form generator of the app, creating it on first use.
+
+    The generator and the language model libraries it imports are only loaded
+    once a generation is requested, which keeps worker startup fast.
+
+    Args:
+        app (FastAPI): The application.
+
+    Returns:
+        FormGenerator: The form generator.
+    """
+    if getattr(app.state, "form_generator", None) is None:
+        from src.utils.form_generation import FormGenerator
+
+        app.state.form_generator = FormGenerator()
+        logger.info("Initialized form generator")
+    return app.state.form_generator
@@ -5,14 +5,17 @@ __all__ = [
     "AuthenticationError",
     "BadRequestError",
     "ForbiddenError",
+    "ServiceUnavailableError",
+    "TooManyRequestsError",
 ]
 
 
 class FormwiseError(Exception):
     """Base exception for all formwise exceptions."""
 
-    def __init__(self, message: str | dict = ""):
+    def __init__(self, message: str | dict = "", headers: dict[str, str] | None = None):
         self.message = message
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -34,3 +37,11 @@ class BadRequestError(FormwiseError):
 
 class ForbiddenError(FormwiseError):
     """Raised when a request is forbidden."""
+
+
+class ServiceUnavailableError(FormwiseError):
+    """Raised when a service is temporarily overloaded or unavailable."""
+
+
+class TooManyRequestsError(FormwiseError):
+    """Raised when a client has exhausted a quota."""
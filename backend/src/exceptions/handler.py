@@ -13,6 +13,8 @@ from src.exceptions import (
     EntityNotFoundError,
     ForbiddenError,
     FormwiseError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
 )
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,9 @@ def create_formwise_exception_handler(
     async def exception_handler(_: Request, exc: FormwiseError) -> JSONResponse:
         message = default_message if exc.message is None else exc.message
         logger.error("Error %s: %s", status_code, message)
-        return JSONResponse(status_code=status_code, content={"detail": message})
+        return JSONResponse(
+            status_code=status_code, content={"detail": message}, headers=exc.headers
+        )
 
     return exception_handler
 
@@ -56,6 +60,14 @@ FORMWISE_EXCEPTION_HANDLERS = {
         "status_code": status.HTTP_403_FORBIDDEN,
         "message": "Not authenticated.",
     },
+    ServiceUnavailableError: {
+        "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+        "message": "Service unavailable.",
+    },
+    TooManyRequestsError: {
+        "status_code": status.HTTP_429_TOO_MANY_REQUESTS,
+        "message": "Too many requests.",
+    },
 }
 
 
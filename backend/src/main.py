@@ -1,17 +1,19 @@
 import logging
+import secrets
 from contextlib import asynccontextmanager
+from typing import Annotated
 
-import logfire
-from beanie import init_beanie
-from fastapi import FastAPI, status
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi import Depends, FastAPI, Header, status
 
 from src.config import configure_logging, settings
+from src.dependencies import get_form_generator
+from src.exceptions import EntityNotFoundError, ForbiddenError
 from src.exceptions.handler import add_exception_handlers
 from src.middlewares import add_middlewares
-from src.models import DOCUMENT_MODELS
 from src.routers import include_routers
-from src.utils.form_generation import FormGenerator
+from src.utils.database import create_mongo_client, init_database, warm_up_pool
+from src.utils.generation_jobs import GenerationWorkerPool
+from src.utils.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,8 @@ async def lifespan(app: FastAPI):
 
     # Initialize Logfire
     if settings.LOGFIRE_TOKEN:
+        import logfire
+
         logfire.configure(
             token=settings.LOGFIRE_TOKEN,
             service_name=settings.APP_TITLE,
@@ -32,21 +36,33 @@ async def lifespan(app: FastAPI):
         logfire.instrument_pymongo()
 
     # Initialize MongoDB connection
-    app.state.db = AsyncIOMotorClient(settings.MONGO_URI.unicode_string())[
-        settings.MONGO_DB_NAME
-    ]
+    app.state.mongo_client = create_mongo_client()
+    app.state.db = app.state.mongo_client[settings.MONGO_DB_NAME]
 
-    # Initialize Beanie
-    await init_beanie(database=app.state.db, document_models=DOCUMENT_MODELS)
+    # Initialize Beanie, indexes may be left to `python -m src.manage indexes`
+    await init_database(app.state.db)
+    await warm_up_pool(app.state.mongo_client, settings.MONGO_MIN_POOL_SIZE)
     logger.info("Initialized database resources")
 
-    # Initialize form generator
-    app.state.form_generator = FormGenerator()
-    logger.info("Initialized form generator")
+    # Form generator is created on first use, see `get_form_generator`
+    app.state.form_generator = None
+
+    # Start generation job workers
+    if settings.GENERATION_WORKERS:
+        app.state.generation_workers = GenerationWorkerPool(
+            lambda: get_form_generator(app)
+        )
+        app.state.generation_workers.start()
 
     yield
 
     logger.info("Cleaning up application resources")
+    if settings.GENERATION_WORKERS:
+        await app.state.generation_workers.stop()
+
+    # Close pooled connections after everything using them has stopped
+    app.state.mongo_client.close()
+    logger.info("Closed database connections")
 
 
 app = FastAPI(
@@ -58,6 +74,8 @@ app = FastAPI(
 
 # Place outside of lifespan, so it can be initialized after app initialization
 if settings.LOGFIRE_TOKEN:
+    import logfire
+
     # Exclude top-level routes e.g. /ping, /openapi.json etc
     logfire.instrument_fastapi(app, excluded_urls=r"^(https?://[^/]+)?/[^/]+/?$")
 
@@ -75,3 +93,35 @@ include_routers(app)
 async def ping():
     """Health check endpoint."""
     return {"detail": "pong"}
+
+
+def verify_metrics_access(
+    authorization: Annotated[str | None, Header()] = None,
+) -> None:
+    """Restricts metrics to scrapers, as they expose internal state.
+
+    Args:
+        authorization (str | None): The Authorization header.
+
+    Raises:
+        EntityNotFoundError: If metrics are disabled.
+        ForbiddenError: If `METRICS_TOKEN` is set and was not presented.
+    """
+    if not settings.METRICS_ENABLED:
+        raise EntityNotFoundError("Not Found")
+
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise ForbiddenError("Not authorized to view metrics.")
+
+
+@app.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics_access)],
+)
+async def metrics():
+    """Process-local metrics snapshot."""
+    return METRICS.snapshot()
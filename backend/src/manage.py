@@ -0,0 +1,186 @@
+"""Management commands for Formwise.
+
+Usage:
+    python -m src.manage calibrate-hash --target-ms 250
+    python -m src.manage worker --workers 4
+    python -m src.manage indexes --check
+    python -m src.manage migrate
+"""
+
+import argparse
+import asyncio
+import logging
+
+from src.config import configure_logging, settings
+from src.utils.database import (
+    create_mongo_client,
+    init_database,
+    missing_indexes,
+    run_migrations,
+)
+from src.utils.form_generation import FormGenerator
+from src.utils.generation_jobs import GenerationWorkerPool
+from src.utils.security import calibrate_hash_rounds
+
+logger = logging.getLogger(__name__)
+
+
+def calibrate_hash(args: argparse.Namespace) -> None:
+    """Benchmarks bcrypt costs on this machine and suggests one for the target."""
+    rounds, timings = calibrate_hash_rounds(args.target_ms)
+    for cost, elapsed in timings.items():
+        print(f"rounds={cost:<3} {elapsed:8.1f} ms")
+
+    print(
+        f"\nSuggested PASSWORD_HASH_ROUNDS={rounds} for a {args.target_ms:g} ms target"
+        f" (current: {settings.PASSWORD_HASH_ROUNDS})"
+    )
+
+
+async def run_workers(workers: int) -> None:
+    """Runs generation job workers until cancelled."""
+    client = create_mongo_client()
+    await init_database(client[settings.MONGO_DB_NAME])
+
+    form_generator = FormGenerator()
+    pool = GenerationWorkerPool(lambda: form_generator, workers=workers)
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        client.close()
+
+
+def worker(args: argparse.Namespace) -> None:
+    """Runs generation job workers separately from the API server."""
+    configure_logging()
+    try:
+        asyncio.run(run_workers(args.workers))
+    except KeyboardInterrupt:
+        logger.info("Stopped generation workers")
+
+
+def report_indexes(missing: dict[str, list[str]]) -> None:
+    """Prints missing indexes, exiting with an error if there are any."""
+    if not missing:
+        print("All indexes are in place.")
+        return
+
+    for collection, names in missing.items():
+        print(f"{collection}: missing {', '.join(names)}")
+    raise SystemExit(1)
+
+
+async def manage_indexes(check: bool, drop: bool) -> dict[str, list[str]]:
+    """Creates missing indexes unless only checking, returning those missing."""
+    client = create_mongo_client()
+    try:
+        await init_database(
+            client[settings.MONGO_DB_NAME],
+            init_indexes=not check,
+            allow_index_dropping=drop,
+        )
+        return await missing_indexes()
+    finally:
+        client.close()
+
+
+def indexes(args: argparse.Namespace) -> None:
+    """Creates and verifies indexes, so workers can skip it at startup."""
+    configure_logging()
+    report_indexes(asyncio.run(manage_indexes(args.check, args.drop)))
+
+
+async def migrate_database(
+    backward: bool, distance: int, use_transaction: bool
+) -> dict[str, list[str]]:
+    """Runs data migrations, then creates missing indexes, returning those missing."""
+    client = create_mongo_client()
+    try:
+        await run_migrations(
+            client,
+            backward=backward,
+            distance=distance,
+            use_transaction=use_transaction,
+        )
+        await init_database(client[settings.MONGO_DB_NAME], init_indexes=True)
+        return await missing_indexes()
+    finally:
+        client.close()
+
+
+def migrate(args: argparse.Namespace) -> None:
+    """Runs data migrations and creates indexes, e.g. before a deployment."""
+    configure_logging()
+    report_indexes(
+        asyncio.run(
+            migrate_database(args.backward, args.distance, not args.no_transaction)
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = commands.add_parser(
+        "calibrate-hash", help="Calibrate the password hash cost for this machine."
+    )
+    calibrate.add_argument(
+        "--target-ms",
+        type=float,
+        default=250,
+        help="Target hash latency in milliseconds (default: 250).",
+    )
+    calibrate.set_defaults(handler=calibrate_hash)
+
+    run_worker = commands.add_parser(
+        "worker", help="Run generation job workers without the API server."
+    )
+    run_worker.add_argument(
+        "--workers",
+        type=int,
+        default=max(settings.GENERATION_WORKERS, 1),
+        help="Number of concurrent workers (default: GENERATION_WORKERS).",
+    )
+    run_worker.set_defaults(handler=worker)
+
+    manage_index = commands.add_parser(
+        "indexes", help="Create and verify the indexes of every collection."
+    )
+    manage_index.add_argument(
+        "--check",
+        action="store_true",
+        help="Only verify indexes, exiting with an error if any are missing.",
+    )
+    manage_index.add_argument(
+        "--drop", action="store_true", help="Drop indexes which are not declared."
+    )
+    manage_index.set_defaults(handler=indexes)
+
+    run_migrate = commands.add_parser(
+        "migrate", help="Run data migrations, then create indexes."
+    )
+    run_migrate.add_argument(
+        "--backward", action="store_true", help="Roll migrations back."
+    )
+    run_migrate.add_argument(
+        "--distance",
+        type=int,
+        default=0,
+        help="Number of migrations to run, 0 for all (default: 0).",
+    )
+    run_migrate.add_argument(
+        "--no-transaction",
+        action="store_true",
+        help="Run migrations without transactions, e.g. without a replica set.",
+    )
+    run_migrate.set_defaults(handler=migrate)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
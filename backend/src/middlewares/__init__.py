@@ -4,7 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from src.config import settings
 
-from .rate_limit import RateLimitMiddleware
+from .rate_limit import CLIENT_KEY, RateLimitMiddleware, RateLimitRule
 
 __all__ = ["add_middlewares"]
 
@@ -17,7 +17,36 @@ def add_middlewares(app: FastAPI) -> None:
     """
     app.add_middleware(
         RateLimitMiddleware,
-        paths=["/api/v1/forms/generate"],
+        rules=[
+            # Blocking and streaming generation share the same quota
+            RateLimitRule("/api/v1/forms/generate", methods=["POST"], name="generate"),
+            RateLimitRule(
+                "/api/v1/forms/generate/stream", methods=["POST"], name="generate"
+            ),
+            # A batch counts once, as its size is capped separately
+            RateLimitRule(
+                "/api/v1/forms/generate/batch",
+                limit=settings.RATE_LIMIT_BATCH_LIMIT,
+                methods=["POST"],
+            ),
+            # Throttle submissions per client on each form, then per form. The
+            # per-client rule goes first, so that requests it rejects do not use
+            # up the quota the form shares with other clients
+            RateLimitRule(
+                "/api/v1/forms/{form_id}/submit",
+                limit=settings.RATE_LIMIT_SUBMIT_LIMIT,
+                delta=settings.RATE_LIMIT_SUBMIT_DELTA,
+                methods=["POST"],
+                key_by=["form_id", CLIENT_KEY],
+            ),
+            RateLimitRule(
+                "/api/v1/forms/{form_id}/submit",
+                limit=settings.RATE_LIMIT_SUBMIT_FORM_LIMIT,
+                delta=settings.RATE_LIMIT_SUBMIT_DELTA,
+                methods=["POST"],
+                key_by=["form_id"],
+            ),
+        ],
     )
 
     app.add_middleware(CorrelationIdMiddleware)
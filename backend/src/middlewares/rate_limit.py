@@ -1,51 +1,181 @@
-import time
-from collections.abc import Callable
+from collections.abc import Iterable
 
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.config import settings
+from src.utils.rate_limit import (
+    RateLimitBackend,
+    RateLimitResult,
+    get_rate_limit_backend,
+)
+from src.utils.security import get_token_subject
 
+# Key part identifying the client rather than a path parameter
+CLIENT_KEY = "client"
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware to limit the rate of requests to specific paths."""
+
+def get_client_key(request: Request) -> str:
+    """Identifies the client by authenticated user, falling back to IP address.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        str: Client identifier used as the rate limit key.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and (email := get_token_subject(token)):
+        return f"user:{email}"
+
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+class RateLimitRule:
+    """Rate limit declared for a route template, e.g. `/forms/{form_id}/submit`.
+
+    Attributes:
+        path (str): Route template, using the same syntax as FastAPI routes.
+        limit (int): Number of requests allowed per period.
+        delta (int): Length of the period in seconds.
+        methods (frozenset[str] | None): HTTP methods to limit, or None for all.
+        key_by (tuple[str, ...]): Path parameters and/or `"client"` that the
+            limit is counted per. An empty tuple makes the limit global.
+        name (str): Name of the limit, rules with the same name share quota.
+            Defaults to the route template.
+    """
 
     def __init__(
         self,
-        app: ASGIApp,
-        paths: list[str],
-        delta: int = settings.RATE_LIMIT_DELTA,
+        path: str,
         limit: int = settings.RATE_LIMIT_LIMIT,
+        delta: int = settings.RATE_LIMIT_DELTA,
+        methods: Iterable[str] | None = None,
+        key_by: Iterable[str] = (CLIENT_KEY,),
+        name: str | None = None,
     ):
-        super().__init__(app)
-        self.paths = paths
-        self.delta = delta
+        self.path = path
+        self.name = name or path
         self.limit = limit
+        self.delta = delta
+        self.methods = frozenset(m.upper() for m in methods) if methods else None
+        self.key_by = tuple(key_by)
+
+        self.regex, _, convertors = compile_path(path)
+        self.prefix = path.split("{", 1)[0]
+
+        if unknown := set(self.key_by) - set(convertors) - {CLIENT_KEY}:
+            raise ValueError(f"Unknown rate limit key parts for {path}: {unknown}")
+
+    def match(self, method: str, path: str) -> dict[str, str] | None:
+        """Matches a request against the rule.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+
+        Returns:
+            dict[str, str] | None: Path parameters if matched, None otherwise.
+        """
+        if self.methods is not None and method not in self.methods:
+            return None
+        if match := self.regex.match(path):
+            return match.groupdict()
+        return None
+
+    def key(self, params: dict[str, str], request: Request) -> str:
+        """Builds the rate limit key for a matched request.
+
+        Args:
+            params (dict[str, str]): Path parameters of the matched request.
+            request (Request): Incoming request.
+
+        Returns:
+            str: Rate limit key.
+        """
+        parts = [
+            get_client_key(request) if part == CLIENT_KEY else f"{part}={params[part]}"
+            for part in self.key_by
+        ]
+        return "|".join([self.name, *parts])
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware to limit the rate of requests to route templates.
+
+    Rules are matched through a precompiled route table: a single prefix check
+    rejects unrelated paths, which are passed through without any wrapping.
+    When several rules match, all of them must allow the request. Rules are
+    applied in order until one rejects the request, and each rule applied is
+    charged, so narrower rules, e.g. per client, must come before broader
+    ones sharing their quota across clients.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: list[RateLimitRule],
+        backend: RateLimitBackend | None = None,
+    ):
+        self.app = app
+        self.rules = rules
+        self.backend = backend or get_rate_limit_backend()
+
+        self._prefixes = tuple({rule.prefix for rule in rules})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle incoming requests and apply the matching rate limit rules."""
+        if scope["type"] != "http" or not scope["path"].startswith(self._prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        result = await self._check(request)
+
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers=result.headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(result.headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _check(self, request: Request) -> RateLimitResult | None:
+        """Applies matching rules until one rejects the request.
+
+        Returns:
+            RateLimitResult | None: The rejecting result, the most restrictive
+                allowing result, or None if no rule matched.
+        """
+        method, path = request.method, request.scope["path"]
+        result = None
+
+        for rule in self.rules:
+            if (params := rule.match(method, path)) is None:
+                continue
+
+            rule_result = await self.backend.hit(
+                rule.key(params, request), limit=rule.limit, period=rule.delta
+            )
+            if not rule_result.allowed:
+                return rule_result
+            if result is None or rule_result.remaining < result.remaining:
+                result = rule_result
 
-        self.map: dict[str, list[float]] = {}
-
-    async def dispatch(self, request: Request, call_next: Callable) -> JSONResponse:
-        """Handle incoming requests and apply rate limiting for the specified paths."""
-        path = request.url.path
-        if path in self.paths:
-            current_time = time.time()
-            # Remove timestamps older than delta
-            self.map[path] = [
-                timestamp
-                for timestamp in self.map.get(path, [])
-                if current_time - timestamp < self.delta
-            ]
-
-            # Check if limit has been reached
-            if len(self.map[path]) >= self.limit:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={"detail": "Rate limit exceeded. Please try again later."},
-                )
-
-            # Add the new request timestamp
-            self.map[path].append(current_time)
-
-        return await call_next(request)
+        return result
@@ -0,0 +1,29 @@
+"""Backfills the form count of users, used to reserve form quota atomically.
+
+Users without a form count get one from their existing forms on their next
+form creation, this migration does it for every user upfront.
+"""
+
+from beanie import free_fall_migration
+from beanie.odm.operators.update.general import Set, Unset
+
+from src.models.form import Form
+from src.models.user import User
+
+
+class Forward:
+    @free_fall_migration(document_models=[Form, User])
+    async def backfill_form_count(self, session):
+        async for user in User.find({"form_count": None}, session=session):
+            count = await Form.find(Form.creator.id == user.id, session=session).count()
+            await User.find_one({"_id": user.id, "form_count": None}).update(
+                Set({User.form_count: count}), session=session
+            )
+
+
+class Backward:
+    @free_fall_migration(document_models=[User])
+    async def unset_form_count(self, session):
+        await User.find_all(session=session).update(
+            Unset({User.form_count: ""}), session=session
+        )
@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from src.config import settings
 
 from .form import Form, FormResponse
+from .generation import GenerationCacheEntry, GenerationJob, TokenUsage
+from .rate_limit import RateLimitCounter
 from .user import User
 
 
@@ -14,7 +16,15 @@ class Config(BaseModel):
     max_responses: int = settings.MAX_RESPONSES
 
 
-DOCUMENT_MODELS = [User, Form, FormResponse]
+DOCUMENT_MODELS = [
+    User,
+    Form,
+    FormResponse,
+    RateLimitCounter,
+    GenerationCacheEntry,
+    GenerationJob,
+    TokenUsage,
+]
 
 __all__ = [
     "Config",
@@ -1,4 +1,6 @@
+from collections.abc import Mapping
 from datetime import UTC, datetime
+from enum import StrEnum
 from typing import TYPE_CHECKING, Annotated, Any
 from uuid import uuid4
 
@@ -44,7 +46,31 @@ class FormCreate(BaseModel):
         return fields
 
 
-class Form(Document, FormCreate):
+class FormDurability(StrEnum):
+    """Durability levels of form submissions, trading latency for safety."""
+
+    FAST = "fast"  # acknowledged by the primary alone
+    STANDARD = "standard"  # the default write concern of the MongoDB client
+    DURABLE = "durable"  # acknowledged by a majority, and journaled
+
+
+class FormOptions(BaseModel):
+    """Options of a form, set by its creator rather than generated."""
+
+    durability: Annotated[
+        FormDurability,
+        Field(
+            FormDurability.STANDARD,
+            description="Durability of submissions, faster when lower",
+        ),
+    ]
+
+
+class FormCreateWithOptions(FormCreate, FormOptions):
+    """Request model for creating a form, with its options."""
+
+
+class Form(Document, FormCreate, FormOptions):
     """Database model for form."""
 
     class Settings:
@@ -64,6 +90,7 @@ class FormRead(BaseModel):
     description: Description | None
     fields: list[FormField]
     is_active: bool
+    durability: FormDurability
     creator: UserPublic
     created_at: datetime
 
@@ -95,12 +122,15 @@ class FormOverview(BaseModel):
     created_at: datetime
 
     @staticmethod
-    async def from_forms(form_list: list[Form]) -> list["FormOverview"]:
+    def from_forms(
+        form_list: list[Form], response_counts: Mapping[str, int]
+    ) -> list["FormOverview"]:
         """Creates a list of FormOverview instances from a list of Form instances,
         sorted by creation date in descending order.
 
         Args:
             form_list (list[Form]): List of Form instances.
+            response_counts (Mapping[str, int]): Number of responses by form ID.
 
         Returns:
             list[FormOverview]: List of FormOverview instances.
@@ -108,10 +138,7 @@ class FormOverview(BaseModel):
         form_list.sort(key=lambda form: form.created_at, reverse=True)
         return [
             FormOverview(
-                **form.model_dump(),
-                response_count=await FormResponse.find(
-                    FormResponse.form.id == form.id
-                ).count(),
+                **form.model_dump(), response_count=response_counts.get(form.id, 0)
             )
             for form in form_list
         ]
@@ -124,6 +151,23 @@ class FormGenerate(BaseModel):
     prompt: Prompt
 
 
+class FormGenerateBatch(BaseModel):
+    """Request model for generating several forms using a language model."""
+
+    forms: Annotated[
+        list[FormGenerate],
+        Field(min_length=1, max_length=settings.GENERATION_BATCH_MAX_SIZE),
+    ]
+
+
+class FormGenerateResult(BaseModel):
+    """Response model for a form generated in a batch."""
+
+    id: str | None = None
+    title: Title | None = None
+    error: str | None = None
+
+
 class FormResponseRead(BaseModel):
     """Response model for a form response."""
 
@@ -0,0 +1,100 @@
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Annotated
+from uuid import uuid4
+
+from beanie import Document
+from pydantic import BaseModel, Field
+from pymongo import IndexModel
+
+from src.models.form import FormCreate
+from src.utils import generate_unique_id
+from src.utils.custom_types import Prompt, Title
+
+
+class GenerationCacheEntry(Document):
+    """Database model for a cached form generation result."""
+
+    class Settings:
+        name = "generation_cache"
+        indexes = [IndexModel("expires_at", expireAfterSeconds=0)]
+
+    id: str  # cache key
+    form: FormCreate
+    expires_at: datetime  # removed by the TTL index
+
+
+class TokenUsage(Document):
+    """Database model for the tokens used by a user on a (UTC) day."""
+
+    class Settings:
+        name = "token_usage"
+        indexes = [IndexModel("expires_at", expireAfterSeconds=0)]
+
+    id: str  # user id and day
+    user_id: str
+    day: str  # ISO date
+    tokens: int = 0
+    expires_at: datetime  # removed by the TTL index, after the day has passed
+
+
+class GenerationJobStatus(StrEnum):
+    """Generation job status options."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class GenerationJob(Document):
+    """Database model for an asynchronous form generation job."""
+
+    class Settings:
+        name = "generation_jobs"
+        indexes = [
+            IndexModel([("status", 1), ("created_at", 1)]),
+            IndexModel("user_id"),
+            IndexModel("expires_at", expireAfterSeconds=0),
+        ]
+
+    id: Annotated[str, Field(default_factory=lambda: uuid4().hex)]
+    user_id: str
+    prompt: Prompt
+    title: Title | None = None
+    status: GenerationJobStatus = GenerationJobStatus.PENDING
+    attempts: int = 0
+    lease_expires_at: datetime | None = None  # reclaimable by workers after this
+    # Assigned upfront, so a retried job cannot create the form twice
+    form_id: Annotated[str, Field(default_factory=generate_unique_id)]
+    error: str | None = None
+    created_at: Annotated[datetime, Field(default_factory=lambda: datetime.now(tz=UTC))]
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None  # finished jobs are removed by the TTL index
+
+
+class GenerationJobRead(BaseModel):
+    """Response model for a generation job."""
+
+    id: str
+    status: GenerationJobStatus
+    form_id: str | None
+    error: str | None
+    created_at: datetime
+    finished_at: datetime | None
+
+    @classmethod
+    def from_job(cls, job: GenerationJob) -> "GenerationJobRead":
+        """Creates a response model from a job, exposing the form once created.
+
+        Args:
+            job (GenerationJob): The generation job.
+
+        Returns:
+            GenerationJobRead: The response model.
+        """
+        succeeded = job.status == GenerationJobStatus.SUCCEEDED
+        return cls(
+            **job.model_dump(exclude={"form_id"}),
+            form_id=job.form_id if succeeded else None,
+        )
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from beanie import Document
+from pymongo import IndexModel
+
+
+class RateLimitCounter(Document):
+    """Database model for a shared rate limit counter."""
+
+    class Settings:
+        name = "rate_limits"
+        indexes = [IndexModel("expires_at", expireAfterSeconds=0)]
+
+    id: str  # rate limit key
+    tat: float  # theoretical arrival time (unix timestamp)
+    allowed: bool  # outcome of the last check
+    expires_at: datetime  # removed by the TTL index once fully replenished
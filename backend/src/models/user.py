@@ -34,6 +34,8 @@ class User(Document):
     auth_provider: AuthProvider
     is_active: bool = False  # TODO: add email verification
     created_at: Annotated[datetime, Field(default_factory=lambda: datetime.now(tz=UTC))]
+    # Reserved form quota, counted from the user's forms on first use when None
+    form_count: int | None = None
 
     forms: Annotated[
         list[BackLink["Form"]], Field(json_schema_extra={"original_field": "creator"})
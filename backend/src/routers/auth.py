@@ -1,10 +1,13 @@
 import logging
+from typing import TYPE_CHECKING
 
+from beanie import UpdateResponse
+from beanie.odm.operators.update.general import Set, SetOnInsert
+from beanie.odm.utils.dump import get_dict
 from fastapi import APIRouter, Request, status
 from fastapi.responses import RedirectResponse
-from fastapi_sso import OpenID
-from fastapi_sso.sso.google import GoogleSSO
 from pydantic import AnyHttpUrl
+from pymongo.errors import DuplicateKeyError
 
 from src.config import settings
 from src.exceptions import (
@@ -15,16 +18,34 @@ from src.exceptions import (
 )
 from src.models.auth import Token
 from src.models.user import AuthProvider, User, UserCreate, UserLogin
-from src.utils.security import create_access_token, get_password_hash, verify_password
+from src.utils.security import (
+    create_access_token,
+    get_password_hash,
+    verify_and_update_password,
+)
+
+if TYPE_CHECKING:
+    from fastapi_sso import OpenID
+    from fastapi_sso.sso.google import GoogleSSO
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-google_sso = GoogleSSO(
-    client_id=settings.GOOGLE_CLIENT_ID,
-    client_secret=settings.GOOGLE_CLIENT_SECRET,
-)
+google_sso: "GoogleSSO | None" = None  # created on first use
+
+
+def get_google_sso() -> "GoogleSSO":
+    """Returns the Google SSO client, importing and creating it on first use."""
+    global google_sso
+    if google_sso is None:
+        from fastapi_sso.sso.google import GoogleSSO
+
+        google_sso = GoogleSSO(
+            client_id=settings.GOOGLE_CLIENT_ID,
+            client_secret=settings.GOOGLE_CLIENT_SECRET,
+        )
+    return google_sso
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
@@ -34,9 +55,6 @@ async def register(user: UserCreate):
     """
     logger.info("Registering user: %s", user.email)
 
-    if await User.find_one(User.email == user.email):
-        raise EntityAlreadyExistsError("User with this email already exists.")
-
     hashed_password = get_password_hash(user.password.get_secret_value())
     new_user = User(
         email=user.email,
@@ -45,7 +63,11 @@ async def register(user: UserCreate):
         hashed_password=hashed_password,
         auth_provider=AuthProvider.EMAIL,
     )
-    await new_user.create()
+    # Rely on the unique email index instead of a separate existence check
+    try:
+        await new_user.create()
+    except DuplicateKeyError as err:
+        raise EntityAlreadyExistsError("User with this email already exists.") from err
     logger.info("Registered user: %s", new_user)
 
     return Token(access_token=create_access_token(new_user.email))
@@ -74,9 +96,15 @@ async def authenticate_user(email: str, password: str) -> User:
     if user.auth_provider == AuthProvider.GOOGLE:
         raise BadRequestError("Please sign in with Google.")
 
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
         raise AuthenticationError("Invalid credentials.")
 
+    # Migrate hashes created with outdated cost parameters
+    if new_hash:
+        await user.set({User.hashed_password: new_hash})
+        logger.info("Rehashed password for: %s", user)
+
     logger.info("Authenticated user: %s", user)
     return user
 
@@ -98,13 +126,51 @@ async def login(user: UserLogin):
 async def google_auth(request: Request, return_url: AnyHttpUrl):
     """Redirects to Google OAuth2 authorization page."""
     logger.info("Google authentication requested from: %s", return_url.path)
-    async with google_sso:
-        return await google_sso.get_login_redirect(
+    sso = get_google_sso()
+    async with sso:
+        return await sso.get_login_redirect(
             redirect_uri=request.url_for("google_auth_callback"),
             state=return_url,
         )
 
 
+async def upsert_google_user(google_user: "OpenID") -> User:
+    """Creates or updates a user from Google profile data in a single round trip.
+
+    Profile fields are refreshed and the user is activated on every sign-in,
+    while the remaining fields are only written when the user is inserted.
+
+    Args:
+        google_user (OpenID): User data returned by Google SSO.
+
+    Returns:
+        User: The created or updated user.
+    """
+    profile = {
+        "first_name": google_user.first_name,
+        "last_name": google_user.last_name,
+        "picture": google_user.picture,
+        "is_active": True,
+    }
+    new_user = User(
+        email=google_user.email, auth_provider=AuthProvider.GOOGLE, **profile
+    )
+    on_insert = {
+        key: value
+        for key, value in get_dict(new_user, to_db=True).items()
+        if key not in profile
+    }
+
+    user = await User.find_one(User.email == google_user.email).update(
+        Set(profile),
+        SetOnInsert(on_insert),
+        upsert=True,
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    logger.info("Upserted user: %s", user)
+    return user
+
+
 @router.get(
     "/google/callback", status_code=status.HTTP_303_SEE_OTHER, include_in_schema=False
 )
@@ -112,8 +178,9 @@ async def google_auth_callback(request: Request, state: AnyHttpUrl):
     """Handles Google OAuth2 callback and redirects to the state URL."""
     try:
         logger.info("Processing Google callback")
-        async with google_sso:
-            google_user: OpenID = await google_sso.verify_and_process(request)
+        sso = get_google_sso()
+        async with sso:
+            google_user: OpenID = await sso.verify_and_process(request)
     except Exception as err:
         logger.error("Google authentication failed: %s, redirecting to: %s", err, state)
         return RedirectResponse(
@@ -122,35 +189,7 @@ async def google_auth_callback(request: Request, state: AnyHttpUrl):
         )
 
     logger.info("Google callback succeeded for: %s", google_user.email)
-    user = await User.find_one(User.email == google_user.email)
-    updated = False
-
-    if not user:
-        user = User(
-            email=google_user.email,
-            first_name=google_user.first_name,
-            last_name=google_user.last_name,
-            picture=google_user.picture,
-            auth_provider=AuthProvider.GOOGLE,
-            is_active=True,
-        )
-        await user.create()
-        logger.info("Registered user: %s", user)
-    else:
-        if not user.is_active:
-            user.is_active = True
-            updated = True
-            logger.info("Activated user: %s", user)
-
-        for key in ("picture", "first_name", "last_name"):
-            google_value = getattr(google_user, key)
-            if getattr(user, key) != google_value:
-                setattr(user, key, google_value)
-                updated = True
-                logger.info("Updated %s for: %s", key, user)
-
-    if updated:
-        await user.save()
+    user = await upsert_google_user(google_user)
 
     access_token = create_access_token(user.email)
 
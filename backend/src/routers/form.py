@@ -1,62 +1,91 @@
+import json
 import logging
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Annotated, Any
 
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Header, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from src.config import settings
 from src.dependencies import (
     CurrentUser,
     CurrentUserWithLinks,
+    get_form_generator,
+)
+from src.exceptions import (
+    BadRequestError,
+    EntityNotFoundError,
+    ForbiddenError,
+    FormwiseError,
 )
-from src.exceptions import BadRequestError, EntityNotFoundError, ForbiddenError
 from src.models.form import (
     Form,
     FormCreate,
+    FormCreateWithOptions,
     FormGenerate,
+    FormGenerateBatch,
+    FormGenerateResult,
     FormOverview,
     FormRead,
     FormResponse,
     FormResponseRead,
     FormSubmission,
 )
+from src.models.generation import GenerationJob, GenerationJobRead
 from src.models.user import User
-from src.utils.form_generation import FormGenerator
+from src.utils.database import count, find_all, find_first, insert
+from src.utils.forms import (
+    create_form_for_user,
+    release_forms,
+    reserve_forms,
+    validate_form_creation_limit,
+)
+from src.utils.prompt_screening import PromptScreener, ScreeningReason
+
+if TYPE_CHECKING:
+    from src.utils.form_generation import FormStreamEvent
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/forms", tags=["Forms"])
 
+prompt_screener = PromptScreener()
 
-def validate_form_creation_limit(user: User):
-    """Validate user's form creation limit.
+
+def screen_prompt(prompt: str) -> str | None:
+    """Screens a generation prompt, before spending any tokens on it.
 
     Args:
-        user (User): The user to validate.
+        prompt (str): The user prompt.
 
-    Raises:
-        BadRequestError: If the user has reached the maximum number of forms.
+    Returns:
+        str | None: Why the prompt was rejected, or None if it was accepted.
     """
-    forms_count = len(user.forms)
-    if forms_count >= settings.MAX_FORMS:
-        raise BadRequestError(
-            f"Maximum number of forms ({settings.MAX_FORMS}) reached."
+    if not settings.GENERATION_PROMPT_SCREENING:
+        return None
+
+    result = prompt_screener.screen(prompt)
+    if result.reason != ScreeningReason.ACCEPTED:
+        logger.info(
+            "%s generation prompt: %s",
+            "Accepted" if result.accepted else "Rejected",
+            result.reason,
         )
+    return result.message
 
 
-async def create_form_for_user(form: FormCreate, user: User) -> Form:
-    """Creates a new form for a given user.
+def validate_prompt(prompt: str) -> None:
+    """Validates a generation prompt, before spending any tokens on it.
 
     Args:
-        form (FormCreate): The form data to create.
-        user (User): The user who owns the form.
+        prompt (str): The user prompt.
 
-    Returns:
-        Form: The newly created form.
+    Raises:
+        BadRequestError: If the prompt is rejected, with the reason.
     """
-    new_form = Form(**form.model_dump(), creator=user)
-    await new_form.create()
-
-    logger.info('Created Form: "%s" for User: %s', new_form.id, user)
-    return new_form
+    if message := screen_prompt(prompt):
+        raise BadRequestError(message)
 
 
 @router.post(
@@ -64,7 +93,7 @@ async def create_form_for_user(form: FormCreate, user: User) -> Form:
     response_model=FormRead,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_form(form: FormCreate, user: CurrentUserWithLinks):
+async def create_form(form: FormCreateWithOptions, user: CurrentUserWithLinks):
     """Creates a new form."""
     validate_form_creation_limit(user)
     return await create_form_for_user(form, user)
@@ -74,17 +103,31 @@ async def create_form(form: FormCreate, user: CurrentUserWithLinks):
     "/generate",
     response_model=FormCreate,
     status_code=status.HTTP_200_OK,
+    responses={202: {"model": GenerationJobRead}},
 )
 async def generate_form(
-    request: Request, data: FormGenerate, user: CurrentUserWithLinks
+    request: Request,
+    data: FormGenerate,
+    user: CurrentUserWithLinks,
+    prefer: Annotated[str | None, Header()] = None,
 ):
-    """Generates a form based on the given description using a language model."""
+    """Generates a form based on the given description using a language model.
+
+    With a `Prefer: respond-async` header, the form is generated in the background
+    and a `202 Accepted` response with the generation job is returned instead.
+    """
     validate_form_creation_limit(user)
+    validate_prompt(data.prompt)
+
+    if prefer and "respond-async" in prefer.lower():
+        return await enqueue_generation_job(request, data, user)
 
-    form_generator: FormGenerator = request.app.state.form_generator
+    form_generator = get_form_generator(request.app)
 
     try:
-        form = await form_generator.generate_form(data.prompt)
+        form = await form_generator.generate_form(data.prompt, user_id=user.id)
+    except FormwiseError:
+        raise
     except Exception as err:
         raise BadRequestError("Failed to generate form. Please try again.") from err
 
@@ -94,6 +137,196 @@ async def generate_form(
     return await create_form_for_user(form, user)
 
 
+async def enqueue_generation_job(
+    request: Request, data: FormGenerate, user: User
+) -> JSONResponse:
+    """Persists a generation job for the background workers.
+
+    Args:
+        request (Request): The incoming request.
+        data (FormGenerate): The generation request.
+        user (User): The user who will own the form.
+
+    Returns:
+        JSONResponse: `202 Accepted` response with the job and its status URL.
+    """
+    job = GenerationJob(user_id=user.id, prompt=data.prompt, title=data.title)
+    await job.create()
+    logger.info('Enqueued generation job: "%s" for User: %s', job.id, user)
+
+    # Wake up in-process workers, if any
+    if workers := getattr(request.app.state, "generation_workers", None):
+        workers.notify()
+
+    return JSONResponse(
+        jsonable_encoder(GenerationJobRead.from_job(job)),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={
+            "Location": str(request.url_for("get_generation_job", job_id=job.id)),
+            "Preference-Applied": "respond-async",
+        },
+    )
+
+
+@router.get(
+    "/generate/{job_id}",
+    response_model=GenerationJobRead,
+    status_code=status.HTTP_200_OK,
+)
+async def get_generation_job(job_id: str, user: CurrentUser):
+    """Retrieves the status of a generation job (if owned by the user)."""
+    job = await GenerationJob.get(job_id)
+    if not job or job.user_id != user.id:
+        raise EntityNotFoundError("Generation job not found.")
+
+    return GenerationJobRead.from_job(job)
+
+
+@router.post(
+    "/generate/batch",
+    response_model=list[FormGenerateResult],
+    status_code=status.HTTP_200_OK,
+)
+async def generate_forms(
+    request: Request, data: FormGenerateBatch, user: CurrentUserWithLinks
+):
+    """Generates several forms based on the given descriptions using a language model.
+
+    Quota for every form is reserved upfront. Forms are generated concurrently
+    and created together, results are returned in order, with an error for
+    each form that failed to generate.
+    """
+    # Rejected prompts fail without spending tokens, or counting against quota
+    rejected = [screen_prompt(item.prompt) for item in data.forms]
+    prompts = [
+        item.prompt
+        for item, error in zip(data.forms, rejected, strict=True)
+        if not error
+    ]
+    if not prompts:
+        raise BadRequestError(rejected[0])
+
+    reserved = len(prompts)
+    await reserve_forms(user, reserved)
+
+    created = 0
+    try:
+        form_generator = get_form_generator(request.app)
+        forms = await form_generator.generate_forms(prompts, user_id=user.id)
+
+        if all(isinstance(form, Exception) for form in forms):
+            err = forms[0]
+            if isinstance(err, FormwiseError):
+                raise err
+            raise BadRequestError(
+                "Failed to generate forms. Please try again."
+            ) from err
+
+        remaining = iter(forms)
+        generated = [
+            BadRequestError(error) if error else next(remaining) for error in rejected
+        ]
+
+        new_forms, results = [], []
+        for item, form in zip(data.forms, generated, strict=True):
+            if isinstance(form, Exception):
+                logger.warning("Failed to generate form in batch: %s", form)
+                error = (
+                    str(form.message)
+                    if isinstance(form, FormwiseError)
+                    else "Failed to generate form. Please try again."
+                )
+                results.append(FormGenerateResult(error=error))
+                continue
+
+            new_form = Form(**form.model_dump(), creator=user)
+            if item.title:
+                new_form.title = item.title
+            new_forms.append(new_form)
+            results.append(FormGenerateResult(id=new_form.id, title=new_form.title))
+
+        await Form.insert_many(new_forms)
+        created = len(new_forms)
+    finally:
+        if created < reserved:
+            await release_forms(user, reserved - created)
+
+    logger.info(
+        "Created %d of %d generated forms for User: %s", created, reserved, user
+    )
+    return results
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Formats a Server-Sent Event.
+
+    Args:
+        event (str): Event name.
+        data (Any): JSON-serializable event payload.
+
+    Returns:
+        str: The encoded event.
+    """
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.post(
+    "/generate/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def generate_form_stream(
+    request: Request, data: FormGenerate, user: CurrentUserWithLinks
+):
+    """Generates a form using a language model, streaming it over Server-Sent Events.
+
+    Emits a `title` event, a `field` event per form field as soon as it has been
+    generated, and finally a `form` event with the id of the persisted form.
+    Failures after the stream has started are reported as an `error` event.
+    """
+    validate_form_creation_limit(user)
+    validate_prompt(data.prompt)
+
+    form_generator = get_form_generator(request.app)
+    events = form_generator.stream_form(data.prompt, user_id=user.id)
+
+    # Wait for the first event, so failures before any output get a status code
+    try:
+        first_event = await anext(events)
+    except FormwiseError:
+        raise
+    except Exception as err:
+        raise BadRequestError("Failed to generate form. Please try again.") from err
+
+    async def stream(event: "FormStreamEvent") -> AsyncIterator[str]:
+        try:
+            while True:
+                match event:
+                    case ("title", title):
+                        yield format_sse("title", {"title": data.title or title})
+                    case ("field", field):
+                        yield format_sse("field", field)
+                    case ("form", form):
+                        if data.title:
+                            form.title = data.title
+                        new_form = await create_form_for_user(form, user)
+                        yield format_sse("form", {"id": new_form.id})
+                        return
+                event = await anext(events)
+        except Exception as err:
+            logger.error("Failed to stream generated form: %s", err)
+            yield format_sse(
+                "error", {"detail": "Failed to generate form. Please try again."}
+            )
+
+    return StreamingResponse(
+        stream(first_event),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/{form_id}",
     response_model=FormRead,
@@ -101,7 +334,10 @@ async def generate_form(
 )
 async def get_form(form_id: str):
     """Retrieves a form."""
-    form = await Form.get(form_id, fetch_links=True)
+    form = await find_first(
+        Form.find(Form.id == form_id, fetch_links=True),
+        settings.MONGO_READ_PREFERENCE_FORM,
+    )
     if not form:
         raise EntityNotFoundError("Form not found.")
 
@@ -125,6 +361,7 @@ async def delete_form(form_id: str, user: CurrentUser):
     await FormResponse.find(FormResponse.form.id == form.id).delete()
     # Delete form
     await form.delete()
+    await release_forms(user)
 
     logger.info('Deleted Form: "%s" for User: %s', form.id, user)
 
@@ -134,9 +371,17 @@ async def delete_form(form_id: str, user: CurrentUser):
     response_model=list[FormOverview],
     status_code=status.HTTP_200_OK,
 )
-async def get_forms(user: CurrentUserWithLinks):
+async def get_forms(user: CurrentUser):
     """Retrieves a list of user's forms."""
-    return await FormOverview.from_forms(user.forms)
+    read_preference = settings.MONGO_READ_PREFERENCE_FORM_LIST
+    forms = await find_all(Form.find(Form.creator.id == user.id), read_preference)
+    response_counts = {
+        form.id: await count(
+            FormResponse.find(FormResponse.form.id == form.id), read_preference
+        )
+        for form in forms
+    }
+    return FormOverview.from_forms(forms, response_counts)
 
 
 @router.post(
@@ -145,6 +390,7 @@ async def get_forms(user: CurrentUserWithLinks):
 )
 async def submit_response(form_id: str, submission: FormSubmission):
     """Submits a form response."""
+    # Reads and writes stay on the primary, as they must see the latest state
     form = await Form.get(form_id)
     if not form:
         raise EntityNotFoundError("Form not found.")
@@ -174,9 +420,9 @@ async def submit_response(form_id: str, submission: FormSubmission):
     if invalid_fields:
         raise BadRequestError(invalid_fields)
 
-    # Save form response
+    # Save form response, as durably as the form requires
     new_response = FormResponse(form=form, answers=validated_answers)
-    await new_response.create()
+    await insert(new_response, form.durability)
     logger.info("Submitted response for form: %s", form.id)
 
     # Check if form response limit has been reached
@@ -198,17 +444,18 @@ async def get_form_responses(
     form_id: str, user: CurrentUser, limit: int = 10, skip: int = 0
 ):
     """Retrieves a list of form responses."""
-    form = await Form.get(form_id, fetch_links=True)
+    read_preference = settings.MONGO_READ_PREFERENCE_RESPONSES
+    form = await find_first(Form.find(Form.id == form_id), read_preference)
     if not form:
         raise EntityNotFoundError("Form not found.")
 
-    if form.creator.id != user.id:
+    if form.creator.ref.id != user.id:
         raise ForbiddenError("Not authorized to view this form.")
 
-    return (
-        await FormResponse.find(FormResponse.form.id == form.id)
+    return await find_all(
+        FormResponse.find(FormResponse.form.id == form.id)
         .sort("-created_at")
         .limit(limit)
-        .skip(skip)
-        .to_list()
+        .skip(skip),
+        read_preference,
     )
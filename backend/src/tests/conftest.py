@@ -38,6 +38,12 @@ async def database() -> AsyncGenerator:
     client.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits() -> None:
+    """Rebuilds the app's middleware, so rate limits do not carry over."""
+    app.middleware_stack = None
+
+
 @pytest.fixture
 async def client() -> AsyncClient:
     """Async test client."""
@@ -2,12 +2,16 @@ from asyncio import sleep
 
 import pytest
 from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
 from httpx import ASGITransport, AsyncClient
 
-from src.middlewares.rate_limit import RateLimitMiddleware
+from src.middlewares.rate_limit import CLIENT_KEY, RateLimitMiddleware, RateLimitRule
+from src.utils.security import create_access_token
 
 LIMITED_PATH = "/limited"
 NON_LIMITED_PATH = "/unlimited"
+STREAMING_PATH = "/streaming"
+SUBMIT_PATH = "/forms/{form_id}/submit"
 DELTA = 1  # 1-second window
 LIMIT = 2  # Allow 2 requests
 
@@ -19,9 +23,24 @@ async def rate_limit_client() -> AsyncClient:
 
     app.add_middleware(
         RateLimitMiddleware,
-        paths=[LIMITED_PATH],
-        delta=DELTA,
-        limit=LIMIT,
+        rules=[
+            RateLimitRule(LIMITED_PATH, limit=LIMIT, delta=DELTA),
+            RateLimitRule(STREAMING_PATH, limit=LIMIT, delta=DELTA),
+            RateLimitRule(
+                SUBMIT_PATH,
+                limit=LIMIT,
+                delta=DELTA,
+                methods=["POST"],
+                key_by=["form_id", CLIENT_KEY],
+            ),
+            RateLimitRule(
+                SUBMIT_PATH,
+                limit=LIMIT + 1,
+                delta=DELTA,
+                methods=["POST"],
+                key_by=["form_id"],
+            ),
+        ],
     )
 
     @app.get(LIMITED_PATH)
@@ -32,6 +51,18 @@ async def rate_limit_client() -> AsyncClient:
     async def unlimited():
         return {"detail": "OK"}
 
+    @app.get(STREAMING_PATH)
+    async def streaming():
+        async def chunks():
+            for chunk in ("a", "b", "c"):
+                yield chunk
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.api_route(SUBMIT_PATH, methods=["GET", "POST"])
+    async def submit(form_id: str):
+        return {"detail": form_id}
+
     return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
 
 
@@ -54,6 +85,8 @@ class TestRateLimitMiddleware:
         assert response.json() == {
             "detail": "Rate limit exceeded. Please try again later."
         }
+        assert response.headers["RateLimit-Remaining"] == "0"
+        assert int(response.headers["Retry-After"]) >= 1
 
     async def test_rate_limit_reset_limit(self, rate_limit_client: AsyncClient):
         """Tests that rate limit is reset after DELTA seconds."""
@@ -76,3 +109,111 @@ class TestRateLimitMiddleware:
             response = await rate_limit_client.get(NON_LIMITED_PATH)
             assert response.status_code == status.HTTP_200_OK
             assert response.json() == {"detail": "OK"}
+
+    async def test_rate_limit_headers(self, rate_limit_client: AsyncClient):
+        """Tests that allowed responses carry the remaining quota."""
+        for remaining in reversed(range(LIMIT)):
+            response = await rate_limit_client.get(LIMITED_PATH)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["RateLimit-Limit"] == str(LIMIT)
+            assert response.headers["RateLimit-Remaining"] == str(remaining)
+            assert "Retry-After" not in response.headers
+
+    async def test_rate_limit_per_user(self, rate_limit_client: AsyncClient):
+        """Tests that authenticated users are limited independently."""
+        headers = {"Authorization": f"Bearer {create_access_token('a@example.com')}"}
+        other_headers = {
+            "Authorization": f"Bearer {create_access_token('b@example.com')}"
+        }
+
+        for _ in range(LIMIT):
+            await rate_limit_client.get(LIMITED_PATH, headers=headers)
+
+        response = await rate_limit_client.get(LIMITED_PATH, headers=headers)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        response = await rate_limit_client.get(LIMITED_PATH, headers=other_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        # Anonymous clients are keyed by IP address
+        response = await rate_limit_client.get(LIMITED_PATH)
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_rate_limit_invalid_token(self, rate_limit_client: AsyncClient):
+        """Tests that invalid tokens fall back to the client IP address."""
+        for _ in range(LIMIT):
+            await rate_limit_client.get(LIMITED_PATH)
+
+        response = await rate_limit_client.get(
+            LIMITED_PATH, headers={"Authorization": "Bearer invalid_token"}
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    async def test_rate_limit_streaming_response(self, rate_limit_client: AsyncClient):
+        """Tests that streaming responses pass through with rate limit headers."""
+        response = await rate_limit_client.get(STREAMING_PATH)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == "abc"
+        assert response.headers["RateLimit-Remaining"] == str(LIMIT - 1)
+
+    async def test_rate_limit_per_client_per_form(self, rate_limit_client: AsyncClient):
+        """Tests that per-client limits on a route template are kept per form."""
+        for _ in range(LIMIT):
+            response = await rate_limit_client.post("/forms/a/submit")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json() == {"detail": "a"}
+
+        response = await rate_limit_client.post("/forms/a/submit")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        response = await rate_limit_client.post("/forms/b/submit")
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_rate_limit_per_form(self, rate_limit_client: AsyncClient):
+        """Tests that per-form limits apply across clients."""
+        for i in range(LIMIT + 1):
+            headers = {"Authorization": f"Bearer {create_access_token(f'{i}@x.com')}"}
+            response = await rate_limit_client.post("/forms/a/submit", headers=headers)
+            assert response.status_code == status.HTTP_200_OK
+
+        response = await rate_limit_client.post("/forms/a/submit")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    async def test_rate_limit_rejected_client_keeps_form_quota(
+        self, rate_limit_client: AsyncClient
+    ):
+        """Tests that requests rejected per client do not use the form's quota."""
+        for _ in range(LIMIT * 3):
+            await rate_limit_client.post("/forms/a/submit")
+
+        headers = {"Authorization": f"Bearer {create_access_token('b@example.com')}"}
+        response = await rate_limit_client.post("/forms/a/submit", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_rate_limit_method_not_limited(self, rate_limit_client: AsyncClient):
+        """Tests that methods outside the rule are not limited."""
+        for _ in range(LIMIT + 1):
+            response = await rate_limit_client.get("/forms/a/submit")
+            assert response.status_code == status.HTTP_200_OK
+            assert "RateLimit-Limit" not in response.headers
+
+
+class TestRateLimitRule:
+    def test_match(self):
+        """Tests that route templates match concrete paths."""
+        rule = RateLimitRule(SUBMIT_PATH, methods=["post"])
+        assert rule.match("POST", "/forms/abc/submit") == {"form_id": "abc"}
+        assert rule.match("GET", "/forms/abc/submit") is None
+        assert rule.match("POST", "/forms/abc/submit/extra") is None
+        assert rule.match("POST", "/forms/generate") is None
+
+    def test_unknown_key_part(self):
+        """Tests that keys must reference path parameters or the client."""
+        with pytest.raises(ValueError, match="Unknown rate limit key parts"):
+            RateLimitRule(SUBMIT_PATH, key_by=["user_id"])
+
+    def test_shared_name(self):
+        """Tests that rules with the same name share a rate limit key."""
+        first = RateLimitRule("/forms/generate", name="generate", key_by=())
+        second = RateLimitRule("/forms/generate/stream", name="generate", key_by=())
+        assert first.key({}, None) == second.key({}, None) == "generate"
@@ -13,7 +13,7 @@ from pydantic_core import Url
 
 from src.models.user import AuthProvider, User
 from src.tests.data import TEST_USER_DATA
-from src.utils.security import CurrentUser
+from src.utils.security import PWD_CONTEXT, CurrentUser
 
 fake = Faker()
 BASE_URL = "/api/v1/auth"
@@ -148,6 +148,28 @@ class TestLogin:
         )
         assert user.email == test_user.email
 
+    async def test_login_rehashes_outdated_hash(
+        self, client: AsyncClient, test_user: User
+    ):
+        """Tests that login migrates a hash created with an outdated cost."""
+        outdated_hash = (
+            PWD_CONTEXT.handler("bcrypt")
+            .using(rounds=4)
+            .hash(TEST_USER_DATA["password"])
+        )
+        await test_user.set({User.hashed_password: outdated_hash})
+
+        response = await client.post(
+            self.URL,
+            json={"email": test_user.email, "password": TEST_USER_DATA["password"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        await test_user.sync()
+        assert test_user.hashed_password != outdated_hash
+        assert PWD_CONTEXT.verify(TEST_USER_DATA["password"], test_user.hashed_password)
+        assert not PWD_CONTEXT.needs_update(test_user.hashed_password)
+
     async def test_login_wrong_password(self, client: AsyncClient, test_user: User):
         """Tests login failure with wrong password."""
         response = await client.post(
@@ -279,6 +301,8 @@ class TestGoogleAuthCallback:
         )
         assert user.email == mock_sso_user.email
         assert user.auth_provider == AuthProvider.EMAIL
+        assert user.id == test_user.id
+        assert user.is_active
 
         # Verify updated user data
         assert (
@@ -311,6 +335,7 @@ class TestGoogleAuthCallback:
         )
         assert user.email == mock_sso_user.email
         assert user.auth_provider == AuthProvider.GOOGLE
+        assert user.id == test_google_user.id
 
         # Verify updated user data
         assert (
@@ -1,12 +1,26 @@
+import logging
+from unittest import mock
+
 import pytest
 from fastapi import status
 from httpx import AsyncClient
 
 from src.config import settings
-from src.models.form import Form, FormOverview
+from src.exceptions import BadRequestError
+from src.main import app
+from src.models.form import (
+    Form,
+    FormCreate,
+    FormDurability,
+    FormOverview,
+    FormResponse,
+)
+from src.models.generation import GenerationJob, GenerationJobStatus
 from src.models.user import User
+from src.routers.form import validate_prompt
 from src.tests.data import TEST_USER_DATA
 from src.tests.helpers import load_json_data
+from src.utils.database import insert, read_collection
 
 BASE_URL = "/api/v1/forms"
 
@@ -56,6 +70,29 @@ class TestCreateForm:
         assert form is not None
         assert form.creator.email == data["creator"]["email"]
 
+    async def test_create_form_durability(
+        self,
+        client: AsyncClient,
+        auth_header: dict[str, str],
+        form_data: dict,
+    ):
+        """Tests that submissions are saved with the durability of the form."""
+        form_data["durability"] = "durable"
+        form_data["fields"] = []
+        response = await client.post(BASE_URL, json=form_data, headers=auth_header)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["durability"] == "durable"
+
+        with mock.patch("src.routers.form.insert", wraps=insert) as insert_spy:
+            response = await client.post(
+                f"{BASE_URL}/{data['id']}/submit", json={"answers": {}}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert insert_spy.call_args.args[1] == FormDurability.DURABLE
+
     async def test_create_form_success_without_fields(
         self, client: AsyncClient, auth_header: dict[str, str], form_data: dict
     ):
@@ -176,6 +213,168 @@ class TestCreateForm:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
+@pytest.mark.anyio
+class TestGenerateFormAsync:
+    prompt = "Create a customer feedback form with name, email and a rating field."
+
+    async def test_generate_form_async(
+        self, client: AsyncClient, auth_header: dict[str, str], test_user: User
+    ):
+        """Tests that `Prefer: respond-async` enqueues a generation job."""
+        response = await client.post(
+            f"{BASE_URL}/generate",
+            json={"prompt": self.prompt},
+            headers=auth_header | {"Prefer": "respond-async"},
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.headers["Preference-Applied"] == "respond-async"
+        data = response.json()
+        assert data["status"] == GenerationJobStatus.PENDING
+        assert data["form_id"] is None
+        assert response.headers["Location"].endswith(f"/generate/{data['id']}")
+
+        job = await GenerationJob.get(data["id"])
+        assert job.user_id == test_user.id
+        assert job.prompt == self.prompt
+
+    async def test_get_generation_job(
+        self, client: AsyncClient, auth_header: dict[str, str], test_user: User
+    ):
+        """Tests that a finished job exposes the generated form."""
+        job = GenerationJob(
+            user_id=test_user.id,
+            prompt=self.prompt,
+            status=GenerationJobStatus.SUCCEEDED,
+        )
+        await job.create()
+
+        response = await client.get(
+            f"{BASE_URL}/generate/{job.id}", headers=auth_header
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["status"] == GenerationJobStatus.SUCCEEDED
+        assert data["form_id"] == job.form_id
+
+    async def test_get_generation_job_other_user(
+        self, client: AsyncClient, auth_header_2: dict[str, str], test_user: User
+    ):
+        """Tests that jobs of other users are not found."""
+        job = GenerationJob(user_id=test_user.id, prompt=self.prompt)
+        await job.create()
+
+        response = await client.get(
+            f"{BASE_URL}/generate/{job.id}", headers=auth_header_2
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+class TestGenerateForms:
+    prompt = "Create a customer feedback form with name, email and a rating field."
+
+    @pytest.fixture
+    def form_generator(self, form_data: dict):
+        generator = mock.Mock()
+        generator.generate_forms = mock.AsyncMock(
+            return_value=[
+                FormCreate.model_validate(form_data),
+                ValueError("Failed to parse generated form."),
+            ]
+        )
+        with mock.patch.object(app.state, "form_generator", generator, create=True):
+            yield generator
+
+    async def test_generate_forms_partial(
+        self,
+        client: AsyncClient,
+        auth_header: dict[str, str],
+        test_user: User,
+        form_generator: mock.Mock,
+    ):
+        """Tests that generated forms are created, and failures reported."""
+        response = await client.post(
+            f"{BASE_URL}/generate/batch",
+            json={"forms": [{"prompt": self.prompt, "title": "Mine"}] * 2},
+            headers=auth_header,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        created, failed = response.json()
+        assert created["title"] == "Mine"
+        assert created["error"] is None
+        assert failed["id"] is None
+        assert failed["error"] == "Failed to generate form. Please try again."
+
+        form = await Form.get(created["id"], fetch_links=True)
+        assert form.creator.id == test_user.id
+        # Quota of the failed generation is released
+        assert (await User.get(test_user.id)).form_count == 1
+
+    async def test_generate_forms_rejected_prompt(
+        self,
+        client: AsyncClient,
+        auth_header: dict[str, str],
+        test_user: User,
+        form_generator: mock.Mock,
+    ):
+        """Tests that rejected prompts are not generated, nor count against quota."""
+        form_generator.generate_forms.return_value = [
+            form_generator.generate_forms.return_value[0]
+        ]
+        response = await client.post(
+            f"{BASE_URL}/generate/batch",
+            json={"forms": [{"prompt": "a" * 60}, {"prompt": self.prompt}]},
+            headers=auth_header,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        rejected, created = response.json()
+        assert rejected["error"] == "The prompt repeats the same characters."
+        assert created["error"] is None
+        form_generator.generate_forms.assert_awaited_once_with(
+            [self.prompt], user_id=test_user.id
+        )
+        assert (await User.get(test_user.id)).form_count == 1
+
+    async def test_generate_forms_exceeds_max_forms(
+        self,
+        client: AsyncClient,
+        auth_header: dict[str, str],
+        form_generator: mock.Mock,
+    ):
+        """Tests that batches beyond the form limit are rejected upfront."""
+        response = await client.post(
+            f"{BASE_URL}/generate/batch",
+            json={"forms": [{"prompt": self.prompt}] * (settings.MAX_FORMS + 1)},
+            headers=auth_header,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        form_generator.generate_forms.assert_not_awaited()
+
+
+class TestValidatePrompt:
+    def test_validate_prompt(self, caplog: pytest.LogCaptureFixture):
+        """Tests that off-topic prompts are logged, and rejected ones raise."""
+        with caplog.at_level(logging.INFO, logger="src.routers.form"):
+            validate_prompt("What is the capital of France?")
+            assert "Accepted generation prompt: off_topic" in caplog.text
+
+            with pytest.raises(BadRequestError) as exc_info:
+                validate_prompt("a" * 60)
+            assert "Rejected generation prompt: repeated_characters" in caplog.text
+
+        assert exc_info.value.message == "The prompt repeats the same characters."
+
+    def test_validate_prompt_disabled(self):
+        """Tests that screening can be turned off."""
+        with mock.patch.object(settings, "GENERATION_PROMPT_SCREENING", False):
+            validate_prompt("a" * 60)
+
+
 @pytest.mark.anyio
 class TestGetForm:
     async def test_get_form_creator(
@@ -324,3 +523,52 @@ class TestGetForms:
         """Tests unauthorized form list retrieval attempt."""
         response = await client.get(BASE_URL)
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.anyio
+class TestReadPreferences:
+    async def test_read_preferences(
+        self, client: AsyncClient, auth_header: dict[str, str], test_user: User
+    ):
+        """Tests that reads use their read preference, and submissions the primary."""
+        test_form = Form(title="Form", creator=test_user)
+        await test_form.create()
+
+        with (
+            mock.patch.object(settings, "MONGO_READ_PREFERENCE_FORM", "nearest"),
+            mock.patch.object(settings, "MONGO_READ_PREFERENCE_FORM_LIST", "secondary"),
+            mock.patch.object(
+                settings, "MONGO_READ_PREFERENCE_RESPONSES", "secondaryPreferred"
+            ),
+            mock.patch(
+                "src.utils.database.read_collection", wraps=read_collection
+            ) as routed,
+        ):
+            response = await client.post(
+                f"{BASE_URL}/{test_form.id}/submit", json={"answers": {}}
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert routed.call_count == 0
+
+            response = await client.get(f"{BASE_URL}/{test_form.id}")
+            assert response.status_code == status.HTTP_200_OK
+            assert routed.call_args.args == (Form, "nearest")
+
+            response = await client.get(BASE_URL, headers=auth_header)
+            assert response.json()[0]["response_count"] == 1
+            assert routed.call_args.args == (FormResponse, "secondary")
+
+            response = await client.get(
+                f"{BASE_URL}/{test_form.id}/responses", headers=auth_header
+            )
+            assert len(response.json()) == 1
+            assert routed.call_args.args == (FormResponse, "secondaryPreferred")
+
+    async def test_get_form_responses_other_user(
+        self, client: AsyncClient, auth_header_2: dict[str, str], test_form: Form
+    ):
+        """Tests that responses of another user's form are not readable."""
+        response = await client.get(
+            f"{BASE_URL}/{test_form.id}/responses", headers=auth_header_2
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
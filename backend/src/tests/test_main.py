@@ -1,7 +1,35 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
 import pytest
 from fastapi import status
 from httpx import AsyncClient
 
+from src.config import settings
+from src.utils.metrics import METRICS
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+# Budget for `import src.main`, for the cumulative import time in seconds
+IMPORT_TIME_BUDGET = 1.5
+
+# Heavy dependencies, imported on first use rather than at startup
+LAZY_MODULES = ["fastapi_sso", "groq", "langchain_core", "langchain_groq", "logfire"]
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Runs Python in a fresh interpreter from the backend directory."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
 
 @pytest.mark.anyio
 class TestPing:
@@ -10,3 +38,62 @@ class TestPing:
         response = await client.get("/ping")
         assert response.status_code == status.HTTP_200_OK
         assert response.json() == {"detail": "pong"}
+
+
+@pytest.mark.anyio
+class TestMetrics:
+    async def test_metrics(self, client: AsyncClient):
+        """Tests that metrics endpoint returns registered metrics."""
+        METRICS.counter("test_metrics_total").inc()
+
+        with mock.patch.object(settings, "METRICS_ENABLED", True):
+            response = await client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["test_metrics_total"] == {"type": "counter", "value": 1}
+
+    async def test_metrics_disabled(self, client: AsyncClient):
+        """Tests that metrics are not served unless enabled."""
+        response = await client.get("/metrics")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_metrics_token(self, client: AsyncClient):
+        """Tests that metrics require the metrics token, if set."""
+        with (
+            mock.patch.object(settings, "METRICS_ENABLED", True),
+            mock.patch.object(settings, "METRICS_TOKEN", "scraper"),
+        ):
+            response = await client.get("/metrics")
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+
+            response = await client.get(
+                "/metrics", headers={"Authorization": "Bearer wrong"}
+            )
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+
+            response = await client.get(
+                "/metrics", headers={"Authorization": "Bearer scraper"}
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+
+class TestStartup:
+    def test_heavy_imports_deferred(self):
+        """Tests that heavy dependencies are not imported at startup."""
+        result = run_python(
+            "-c",
+            "import json, sys, src.main; "
+            f"print(json.dumps([m for m in {LAZY_MODULES} if m in sys.modules]))",
+        )
+        assert json.loads(result.stdout) == []
+
+    def test_import_time_budget(self):
+        """Tests that importing the app stays within the startup budget."""
+
+        def import_time() -> float:
+            result = run_python("-X", "importtime", "-c", "import src.main")
+            # The last line is the top-level module, in microseconds
+            cumulative = result.stderr.strip().splitlines()[-1].split("|")[1]
+            return int(cumulative) / 1e6
+
+        # Best of a few runs, to be robust to a busy machine
+        assert min(import_time() for _ in range(3)) < IMPORT_TIME_BUDGET
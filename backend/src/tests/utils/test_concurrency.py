@@ -0,0 +1,218 @@
+import asyncio
+
+import pytest
+
+from src.exceptions import ServiceUnavailableError
+from src.utils.concurrency import AdmissionController, SingleFlight
+from src.utils.metrics import METRICS
+
+
+@pytest.mark.anyio
+class TestAdmissionController:
+    @staticmethod
+    async def hold(
+        controller: AdmissionController, release: asyncio.Event, key: str | None = None
+    ):
+        async with controller.admit(key):
+            await release.wait()
+
+    async def test_limits_concurrency(self):
+        """Tests that operations beyond the limit wait for a slot."""
+        controller = AdmissionController("test_limit", 2, 4, queue_timeout=1)
+        release = asyncio.Event()
+
+        tasks = [asyncio.create_task(self.hold(controller, release)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert controller.in_flight == 2
+        assert controller.queued == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.in_flight == 0
+        assert controller.queued == 0
+
+    async def test_rejects_when_queue_full(self):
+        """Tests that requests are rejected once the queue is full."""
+        controller = AdmissionController("test_queue_full", 1, 1, queue_timeout=1)
+        release = asyncio.Event()
+
+        tasks = [asyncio.create_task(self.hold(controller, release)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            async with controller.admit():
+                pass
+        assert int(exc_info.value.headers["Retry-After"]) >= 1
+        assert METRICS.counter("test_queue_full_rejected_total").value == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_rejects_on_queue_timeout(self):
+        """Tests that requests waiting too long are rejected."""
+        controller = AdmissionController("test_timeout", 1, 1, queue_timeout=0.05)
+        release = asyncio.Event()
+        task = asyncio.create_task(self.hold(controller, release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ServiceUnavailableError):
+            async with controller.admit():
+                pass
+        assert controller.queued == 0
+        assert METRICS.histogram("test_timeout_queue_wait_seconds").max >= 0.05
+
+        release.set()
+        await task
+
+    async def test_releases_slot_on_error(self):
+        """Tests that a failing operation releases its slot."""
+        controller = AdmissionController("test_error", 1, 0, queue_timeout=1)
+
+        with pytest.raises(RuntimeError):
+            async with controller.admit():
+                raise RuntimeError
+
+        async with controller.admit():
+            assert controller.in_flight == 1
+
+    async def test_round_robin_across_keys(self):
+        """Tests that freed slots are handed to queued keys in turn."""
+        controller = AdmissionController("test_fair", 1, 8, queue_timeout=1)
+        order = []
+
+        async def run(key: str, name: str):
+            async with controller.admit(key):
+                order.append(name)
+
+        async with controller.admit("a"):
+            tasks = [
+                asyncio.create_task(run(key, name))
+                for key, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")]
+            ]
+            await asyncio.sleep(0.01)
+            assert controller.queued == 4
+
+        await asyncio.gather(*tasks)
+        assert order == ["a1", "b1", "a2", "a3"]
+
+    async def test_limits_concurrency_per_key(self):
+        """Tests that keys at their limit wait while other keys are admitted."""
+        controller = AdmissionController(
+            "test_per_key", 3, 8, queue_timeout=1, max_per_key=1
+        )
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(self.hold(controller, release, key))
+            for key in ["a", "a", "b"]
+        ]
+        await asyncio.sleep(0.01)
+        assert controller.in_flight == 2
+        assert controller.queued == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.in_flight == 0
+
+    async def test_rejects_when_key_queue_full(self):
+        """Tests that a key cannot take the whole queue."""
+        controller = AdmissionController(
+            "test_key_queue", 1, 8, queue_timeout=1, max_per_key=1, max_queue_per_key=1
+        )
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(self.hold(controller, release, "a")) for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ServiceUnavailableError):
+            async with controller.admit("a"):
+                pass
+
+        # Other keys can still queue
+        tasks.append(asyncio.create_task(self.hold(controller, release, "b")))
+        await asyncio.sleep(0.01)
+        assert controller.queued == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+
+@pytest.mark.anyio
+class TestSingleFlight:
+    async def test_coalesces_concurrent_calls(self):
+        """Tests that concurrent calls with the same key run once."""
+        single_flight = SingleFlight("test_coalesce")
+        release = asyncio.Event()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return object()
+
+        tasks = [asyncio.create_task(single_flight.do("key", fn)) for _ in range(5)] + [
+            asyncio.create_task(single_flight.do("other", fn))
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 2
+        assert all(result is results[0] for result in results[:5])
+        assert results[5] is not results[0]
+        assert METRICS.counter("test_coalesce_coalesced_total").value == 4
+        assert len(single_flight) == 0
+
+    async def test_shares_exceptions(self):
+        """Tests that every waiting caller receives the exception."""
+        single_flight = SingleFlight("test_exception")
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        results = await asyncio.gather(
+            single_flight.do("key", fn),
+            single_flight.do("key", fn),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(single_flight) == 0
+
+    async def test_caller_cancellation(self):
+        """Tests that the call survives until its last caller is cancelled."""
+        single_flight = SingleFlight("test_cancel")
+        started, release = asyncio.Event(), asyncio.Event()
+        cancelled = False
+
+        async def fn():
+            nonlocal cancelled
+            started.set()
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            return "done"
+
+        first = asyncio.create_task(single_flight.do("key", fn))
+        second = asyncio.create_task(single_flight.do("key", fn))
+        await started.wait()
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled
+
+        release.set()
+        assert await second == "done"
+
+        third = asyncio.create_task(single_flight.do("key", fn))
+        release.clear()
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled
+        assert len(single_flight) == 0
@@ -0,0 +1,240 @@
+from unittest import mock
+
+import pytest
+from pydantic_core import MultiHostUrl
+from pymongo import WriteConcern, monitoring
+from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+from src.config import settings
+from src.models.form import Form, FormDurability, FormResponse
+from src.models.generation import GenerationJob
+from src.models.user import User
+from src.utils.database import (
+    PoolMetricsListener,
+    count,
+    create_mongo_client,
+    declared_indexes,
+    find_all,
+    find_first,
+    init_database,
+    insert,
+    missing_indexes,
+    read_collection,
+    read_preference,
+    warm_up_pool,
+    write_collection,
+)
+from src.utils.metrics import METRICS
+
+ADDRESS = ("localhost", 27017)
+
+
+class TestPoolMetricsListener:
+    def test_connections(self):
+        """Tests that open and checked out connections are tracked."""
+        listener = PoolMetricsListener(max_pool_size=2)
+        for connection_id in (1, 2):
+            listener.connection_created(
+                monitoring.ConnectionCreatedEvent(ADDRESS, connection_id)
+            )
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, duration=0.25)
+        )
+
+        assert METRICS.gauge("mongo_pool_connections").value == 2
+        assert METRICS.gauge("mongo_pool_checked_out").value == 1
+        assert METRICS.gauge("mongo_pool_saturation").value == 0.5
+        assert METRICS.histogram("mongo_pool_checkout_wait_seconds").max >= 0.25
+
+        listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+        listener.connection_closed(
+            monitoring.ConnectionClosedEvent(ADDRESS, 2, reason="idle")
+        )
+
+        assert METRICS.gauge("mongo_pool_connections").value == 1
+        assert METRICS.gauge("mongo_pool_checked_out").value == 0
+        assert METRICS.gauge("mongo_pool_saturation").value == 0
+
+    def test_saturation(self):
+        """Tests that checkouts of the last connection and failures are counted."""
+        listener = PoolMetricsListener(max_pool_size=2)
+        saturated = METRICS.counter("mongo_pool_saturated_total")
+        failures = METRICS.counter("mongo_pool_checkout_failures_total")
+        saturated_before, failures_before = saturated.value, failures.value
+
+        for connection_id in (1, 2):
+            listener.connection_checked_out(
+                monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id, None)
+            )
+        listener.connection_check_out_failed(
+            monitoring.ConnectionCheckOutFailedEvent(
+                ADDRESS, monitoring.ConnectionCheckOutFailedReason.TIMEOUT, 1.0
+            )
+        )
+
+        assert METRICS.gauge("mongo_pool_saturation").value == 1
+        assert saturated.value == saturated_before + 1
+        assert failures.value == failures_before + 1
+
+    def test_unlimited_pool(self):
+        """Tests that pools without a size limit never count as saturated."""
+        listener = PoolMetricsListener(max_pool_size=0)
+        saturated = METRICS.counter("mongo_pool_saturated_total")
+        saturated_before = saturated.value
+
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, None)
+        )
+
+        assert METRICS.gauge("mongo_pool_saturation").value == 0
+        assert saturated.value == saturated_before
+
+
+def test_create_mongo_client():
+    """Tests that pool settings are applied to the client."""
+    with (
+        # Resolving an SRV URI would need DNS
+        mock.patch.object(
+            settings, "MONGO_URI", MultiHostUrl("mongodb://localhost:27017")
+        ),
+        mock.patch.object(settings, "MONGO_MAX_POOL_SIZE", 20),
+        mock.patch.object(settings, "MONGO_MIN_POOL_SIZE", 3),
+        mock.patch.object(settings, "MONGO_MAX_IDLE_TIME", 60),
+        mock.patch.object(settings, "MONGO_WAIT_QUEUE_TIMEOUT", 2.5),
+        mock.patch.object(settings, "MONGO_COMPRESSORS", "zlib"),
+    ):
+        client = create_mongo_client()
+
+    try:
+        pool_options = client.delegate.options.pool_options
+        assert pool_options.max_pool_size == 20
+        assert pool_options.min_pool_size == 3
+        assert pool_options.max_idle_time_seconds == 60
+        assert pool_options.wait_queue_timeout == 2.5
+        assert client.delegate.options.pool_options._compression_settings.compressors
+        assert any(
+            isinstance(listener, PoolMetricsListener)
+            for listener in client.delegate.options.event_listeners
+        )
+    finally:
+        client.close()
+
+
+@pytest.mark.anyio
+class TestWarmUpPool:
+    async def test_warm_up_pool(self):
+        """Tests that a connection is checked out per pooled connection."""
+        client = mock.Mock()
+        client.admin.command = mock.AsyncMock(return_value={"ok": 1})
+
+        await warm_up_pool(client, 3)
+
+        assert client.admin.command.await_count == 3
+
+    async def test_warm_up_pool_failure(self):
+        """Tests that warm-up failures do not prevent startup."""
+        client = mock.Mock()
+        client.admin.command = mock.AsyncMock(
+            side_effect=ServerSelectionTimeoutError("No servers")
+        )
+
+        await warm_up_pool(client, 3)
+        await warm_up_pool(client, 0)
+
+        assert client.admin.command.await_count == 3
+
+
+@pytest.mark.anyio
+class TestIndexes:
+    def test_declared_indexes(self):
+        """Tests that indexed fields and settings indexes are declared."""
+        assert [index.name for index in declared_indexes(User)] == ["email_1"]
+        assert "expires_at_1" in [
+            index.name for index in declared_indexes(GenerationJob)
+        ]
+
+    async def test_missing_indexes(self):
+        """Tests that dropped indexes are reported, and created on demand."""
+        assert await missing_indexes() == {}
+
+        collection = User.get_motor_collection()
+        await collection.drop_indexes()
+        assert await missing_indexes([User]) == {collection.name: ["email_1"]}
+
+        await init_database(collection.database, init_indexes=False)
+        assert await missing_indexes([User]) == {collection.name: ["email_1"]}
+
+        await init_database(collection.database, init_indexes=True)
+        assert await missing_indexes() == {}
+
+
+def test_read_preference():
+    """Tests that secondary reads are bounded by the max staleness."""
+    assert read_preference("primary", 120) == Primary()
+    assert read_preference("secondaryPreferred") == SecondaryPreferred()
+    assert read_preference("secondaryPreferred", 120) == SecondaryPreferred(
+        max_staleness=120
+    )
+    assert read_collection(Form, "secondaryPreferred").read_preference == (
+        read_preference("secondaryPreferred")
+    )
+
+
+@pytest.mark.anyio
+class TestReadPreferenceQueries:
+    # Any read preference is served by a standalone server, which stands in for
+    # a replica set
+
+    async def test_find_all(self, test_user: User):
+        """Tests that queries keep their filters, sort, skip and limit."""
+        for title in ("A", "B", "C"):
+            await Form(title=title, creator=test_user).create()
+
+        forms = await find_all(
+            Form.find(Form.title != "A").sort("-title").skip(1).limit(1),
+            "secondaryPreferred",
+        )
+        assert [form.title for form in forms] == ["B"]
+        assert await count(Form.find(Form.title != "A"), "nearest") == 2
+
+    async def test_find_first_links(self, test_user: User):
+        """Tests that linked documents are fetched."""
+        form = Form(title="Form", creator=test_user)
+        await form.create()
+
+        found = await find_first(
+            Form.find(Form.id == form.id, fetch_links=True), "secondary"
+        )
+        assert found.creator.email == test_user.email
+        assert await find_first(Form.find(Form.id == "missing"), "secondary") is None
+
+
+@pytest.mark.anyio
+class TestDurability:
+    def test_write_collection(self):
+        """Tests that durability levels map to write concerns."""
+        default = FormResponse.get_motor_collection().write_concern
+
+        assert write_collection(
+            FormResponse, FormDurability.FAST
+        ).write_concern == WriteConcern(w=1)
+        assert (
+            write_collection(FormResponse, FormDurability.STANDARD).write_concern
+            == default
+        )
+        assert write_collection(
+            FormResponse, FormDurability.DURABLE
+        ).write_concern == WriteConcern(w="majority", j=True)
+
+    async def test_insert(self, test_user: User):
+        """Tests that documents are inserted at every durability level."""
+        form = Form(title="Form", creator=test_user)
+        await form.create()
+
+        for durability in FormDurability:
+            response = await insert(
+                FormResponse(form=form, answers={"level": durability}), durability
+            )
+            saved = await FormResponse.get(response.id)
+            assert saved.answers == {"level": durability}
@@ -0,0 +1,82 @@
+from unittest import mock
+
+import pytest
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
+
+from src.config import settings
+from src.models.field import FieldType
+from src.models.form import FormCreate
+from src.utils.fake_llm import FakeFormChatModel, synthesize_form
+from src.utils.form_generation import FormGenerator, create_chat_model
+
+PROMPT = "Create an event RSVP form asking for the number of guests and comments."
+
+
+class TestSynthesizeForm:
+    def test_synthesize_form(self):
+        """Tests that fields are picked from keywords in the prompt."""
+        form = FormCreate.model_validate(synthesize_form(PROMPT))
+        field_types = [field.type for field in form.fields]
+
+        assert FieldType.EMAIL in field_types
+        assert FieldType.NUMBER in field_types
+        assert FieldType.PARAGRAPH in field_types
+        assert form.title.startswith("Create an event rsvp")
+
+    def test_synthesize_form_fallback(self):
+        """Tests that prompts without known keywords get default fields."""
+        form = FormCreate.model_validate(synthesize_form("Something unusual"))
+        assert [field.type for field in form.fields] == [
+            FieldType.TEXT,
+            FieldType.EMAIL,
+        ]
+
+
+@pytest.mark.anyio
+class TestFakeFormChatModel:
+    async def test_structured_output(self):
+        """Tests that structured output is parsed into the requested model."""
+        llm = FakeFormChatModel(latency=0.001)
+        form = await llm.with_structured_output(FormCreate).ainvoke(PROMPT)
+        assert isinstance(form, FormCreate)
+
+    async def test_canned_responses(self):
+        """Tests that canned responses are returned in turn."""
+        responses = [{"title": "First"}, {"title": "Second"}]
+        llm = FakeFormChatModel(latency=0, responses=responses).with_structured_output(
+            FormCreate
+        )
+        titles = [(await llm.ainvoke(PROMPT)).title for _ in range(3)]
+        assert titles == ["First", "Second", "First"]
+
+    async def test_stream_tool_call(self):
+        """Tests that streamed tool call chunks parse into the complete arguments."""
+        llm = FakeFormChatModel(latency=0.001, chunk_size=8)
+        chain = llm.bind_tools([FormCreate]) | JsonOutputKeyToolsParser(
+            key_name="FormCreate", first_tool_only=True
+        )
+        partials = [partial async for partial in chain.astream(PROMPT)]
+
+        assert len(partials) > 1
+        assert partials[-1] == synthesize_form(PROMPT)
+
+    def test_seeded_latency(self):
+        """Tests that seeded latencies are reproducible per prompt."""
+        llm = FakeFormChatModel(latency=1, seed=42)
+        assert llm._sample_latency("a") == llm._sample_latency("a")
+        assert llm._sample_latency("a") != llm._sample_latency("b")
+
+
+@pytest.mark.anyio
+async def test_form_generator_fake_provider():
+    """Tests that the fake provider can be used to generate forms offline."""
+    with (
+        mock.patch.object(settings, "LLM_PROVIDER", "fake"),
+        mock.patch.object(settings, "FAKE_LLM_LATENCY", 0.001),
+    ):
+        assert isinstance(create_chat_model(), FakeFormChatModel)
+        form = await FormGenerator().generate_form(PROMPT)
+
+    assert form.model_dump(exclude={"fields"}) == FormCreate.model_validate(
+        synthesize_form(PROMPT)
+    ).model_dump(exclude={"fields"})
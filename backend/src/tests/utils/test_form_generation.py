@@ -1,14 +1,31 @@
+import asyncio
 from datetime import datetime
 from unittest import mock
 
+import groq
+import httpx
 import pytest
 from faker import Faker
+from langchain_core.messages import AIMessage
 
-from src.utils.form_generation import FormGenerator
+from src.exceptions import ServiceUnavailableError
+from src.models.form import FormCreate
+from src.tests.helpers import load_json_data
+from src.utils.form_generation import FormGenerator, is_transient_error
+from src.utils.metrics import METRICS
 
 fake = Faker()
 
 
+def chain_output(form: FormCreate | None = None, error: Exception | None = None):
+    """Builds the output of the structured output chain."""
+    message = AIMessage(
+        content="",
+        usage_metadata={"input_tokens": 100, "output_tokens": 50, "total_tokens": 150},
+    )
+    return {"raw": message, "parsed": form, "parsing_error": error}
+
+
 class TestFormGenerator:
     @mock.patch("src.utils.form_generation.ChatGroq")
     @mock.patch("src.utils.form_generation.logger.error")
@@ -27,7 +44,9 @@ class TestFormGenerator:
         """Tests that generate_form invokes the chain with correct arguments."""
         form_generator = FormGenerator()
         mock_chain = mock.Mock()
-        mock_chain.ainvoke = mock.AsyncMock()
+        mock_chain.ainvoke = mock.AsyncMock(
+            return_value=chain_output(FormCreate(title="Form"))
+        )
         form_generator._chain = mock_chain
 
         description = fake.sentence()
@@ -37,3 +56,290 @@ class TestFormGenerator:
         mock_chain.ainvoke.assert_called_once_with(
             {"user_input": description, "today": today}
         )
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_cached(self):
+        """Tests that identical prompts are served from the cache."""
+        form_generator = FormGenerator()
+        mock_chain = mock.Mock()
+        mock_chain.ainvoke = mock.AsyncMock(
+            return_value=chain_output(
+                FormCreate.model_validate(load_json_data("forms/form.json"))
+            )
+        )
+        form_generator._chain = mock_chain
+
+        description = fake.sentence()
+        first = await form_generator.generate_form(description)
+        second = await form_generator.generate_form(f"  {description.upper()} ")
+
+        mock_chain.ainvoke.assert_called_once()
+        assert first.model_dump() == second.model_dump()
+        assert first is not second
+
+    @pytest.mark.anyio
+    async def test_form_generator_stream_form(self):
+        """Tests that stream_form yields the title and fields as they complete."""
+        form_data = load_json_data("forms/form.json")
+        fields = form_data["fields"]
+        partials = [
+            {"title": form_data["title"][:3]},
+            {"title": form_data["title"]},
+            {"title": form_data["title"], "fields": [fields[0]]},
+            {"title": form_data["title"], "fields": fields},
+            {"title": form_data["title"], "fields": fields, "description": "Desc"},
+        ]
+
+        async def astream(*args, **kwargs):
+            for partial in partials:
+                yield partial
+
+        form_generator = FormGenerator()
+        form_generator._stream_chain = mock.Mock(astream=astream)
+
+        events = [event async for event in form_generator.stream_form(fake.sentence())]
+
+        assert [name for name, _ in events] == [
+            "title",
+            *["field"] * len(fields),
+            "form",
+        ]
+        assert events[0][1] == form_data["title"]
+
+        form = events[-1][1]
+        assert isinstance(form, FormCreate)
+        assert form.description == "Desc"
+        assert [field.tag for field in form.fields] == [
+            field.tag for _, field in events[1:-1]
+        ]
+
+    @pytest.mark.anyio
+    async def test_form_generator_stream_form_cached(self):
+        """Tests that stream_form replays a cached form without calling the model."""
+        form_generator = FormGenerator()
+        mock_chain = mock.Mock()
+        mock_chain.ainvoke = mock.AsyncMock(
+            return_value=chain_output(
+                FormCreate.model_validate(load_json_data("forms/form.json"))
+            )
+        )
+        form_generator._chain = mock_chain
+        form_generator._stream_chain = mock.Mock()
+
+        description = fake.sentence()
+        form = await form_generator.generate_form(description)
+        events = [event async for event in form_generator.stream_form(description)]
+
+        form_generator._stream_chain.astream.assert_not_called()
+        assert len(events) == len(form.fields) + 2
+        assert events[-1][1].model_dump() == form.model_dump()
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_coalesced(self):
+        """Tests that concurrent identical prompts share a single generation."""
+        form_generator = FormGenerator()
+
+        async def ainvoke(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return chain_output(
+                FormCreate.model_validate(load_json_data("forms/form.json"))
+            )
+
+        mock_chain = mock.Mock()
+        mock_chain.ainvoke = mock.AsyncMock(side_effect=ainvoke)
+        form_generator._chain = mock_chain
+
+        description = fake.sentence()
+        forms = await asyncio.gather(
+            *[form_generator.generate_form(description) for _ in range(3)]
+        )
+
+        mock_chain.ainvoke.assert_called_once()
+        assert forms[0].model_dump() == forms[1].model_dump() == forms[2].model_dump()
+        assert forms[0] is not forms[1]
+
+    @pytest.mark.parametrize(
+        "status_code, expected", [(429, True), (500, True), (503, True), (400, False)]
+    )
+    def test_is_transient_error(self, status_code: int, expected: bool):
+        """Tests that only rate limits and server errors are retried."""
+        response = httpx.Response(status_code, request=httpx.Request("POST", "/"))
+        err = groq.APIStatusError("error", response=response, body=None)
+        assert is_transient_error(err) is expected
+        assert is_transient_error(TimeoutError())
+        assert not is_transient_error(ValueError())
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_template(self):
+        """Tests that prompts matching a template are served without the model."""
+        form_generator = FormGenerator()
+        form_generator._chain = mock.Mock()
+        description = "Create a contact us form for my photography website"
+
+        first = await form_generator.generate_form(description)
+        second = await form_generator.generate_form(description)
+
+        form_generator._chain.ainvoke.assert_not_called()
+        assert first.title == "Contact Us"
+        assert {field.tag for field in first.fields}.isdisjoint(
+            field.tag for field in second.fields
+        )
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_metrics(self):
+        """Tests that token usage and attempts are recorded."""
+        form_generator = FormGenerator()
+        form_generator._retry_policy.backoff = 0
+        mock_chain = mock.Mock()
+        mock_chain.ainvoke = mock.AsyncMock(
+            side_effect=[TimeoutError(), chain_output(FormCreate(title="Form"))]
+        )
+        form_generator._chain = mock_chain
+        prompt_tokens = METRICS.counter("generation_prompt_tokens_total").value
+
+        with mock.patch("src.utils.form_generation.logger.info") as mock_logger_info:
+            await form_generator.generate_form(fake.sentence())
+
+        assert METRICS.counter("generation_prompt_tokens_total").value == (
+            prompt_tokens + 100
+        )
+        assert mock_logger_info.call_args.kwargs["extra"] == {
+            "prompt_tokens": 100,
+            "completion_tokens": 50,
+            "provider_seconds": mock.ANY,
+            "attempts": 2,
+        }
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_parse_failure(self):
+        """Tests that parse failures are counted and raised."""
+        form_generator = FormGenerator()
+        mock_chain = mock.Mock()
+        mock_chain.ainvoke = mock.AsyncMock(
+            return_value=chain_output(error=ValueError("invalid"))
+        )
+        form_generator._chain = mock_chain
+        failures = METRICS.counter("generation_parse_failures_total").value
+
+        with pytest.raises(ValueError, match="Failed to parse"):
+            await form_generator.generate_form(fake.sentence())
+
+        assert METRICS.counter("generation_parse_failures_total").value == failures + 1
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_forms(self):
+        """Tests that batches return a result or an error per description."""
+        form = FormCreate.model_validate(load_json_data("forms/form.json"))
+        descriptions = [fake.sentence(), "invalid", fake.sentence()]
+
+        async def ainvoke(inputs):
+            if inputs["user_input"] == "invalid":
+                return chain_output(error=ValueError("invalid"))
+            return chain_output(form)
+
+        form_generator = FormGenerator()
+        form_generator._chain = mock.Mock(ainvoke=ainvoke)
+
+        results = await form_generator.generate_forms(descriptions)
+
+        assert len(results) == len(descriptions)
+        assert results[0].model_dump() == form.model_dump()
+        assert isinstance(results[1], ValueError)
+        assert results[2].model_dump() == form.model_dump()
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_repaired(self):
+        """Tests that invalid outputs are repaired instead of failing."""
+        output = chain_output(error=ValueError("min_length cannot exceed max_length"))
+        output["raw"].tool_calls = [
+            {
+                "name": "FormCreate",
+                "args": {
+                    "title": "Form",
+                    "fields": [
+                        {"type": "text", "label": "Name", "min_length": 90},
+                        {"type": "select", "label": "Rating", "options": []},
+                    ],
+                },
+                "id": "call_1",
+            }
+        ]
+        form_generator = FormGenerator()
+        form_generator._chain = mock.Mock(ainvoke=mock.AsyncMock(return_value=output))
+        repairs = METRICS.counter("generation_repairs_total").value
+
+        form = await form_generator.generate_form(fake.sentence())
+
+        assert [field.label for field in form.fields] == ["Name"]
+        assert form.fields[0].max_length == 90
+        assert METRICS.counter("generation_repairs_total").value == repairs + 1
+
+    @pytest.mark.anyio
+    async def test_form_generator_stream_form_repaired(self):
+        """Tests that invalid streamed fields are repaired or dropped."""
+        fields = [
+            {"type": "number", "label": "Age", "min_value": 99, "max_value": 1},
+            {"type": "select", "label": "Rating", "options": []},
+            {"type": "email", "label": "Email"},
+        ]
+
+        async def astream(*args, **kwargs):
+            yield {"title": "Form", "fields": fields}
+
+        form_generator = FormGenerator()
+        form_generator._stream_chain = mock.Mock(astream=astream)
+
+        events = [event async for event in form_generator.stream_form(fake.sentence())]
+
+        form = events[-1][1]
+        assert [field.label for field in form.fields] == ["Age", "Email"]
+        assert (form.fields[0].min_value, form.fields[0].max_value) == (1, 99)
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_budget(self):
+        """Tests that user generations are checked against and charged to budget."""
+        form_generator = FormGenerator()
+        form_generator._chain = mock.Mock(
+            ainvoke=mock.AsyncMock(return_value=chain_output(FormCreate(title="Form")))
+        )
+        form_generator._budget = mock.Mock(
+            check=mock.AsyncMock(), charge=mock.AsyncMock()
+        )
+
+        await form_generator.generate_form(fake.sentence(), user_id="user")
+
+        form_generator._budget.check.assert_awaited_once_with("user")
+        form_generator._budget.charge.assert_awaited_once_with("user", 150)
+
+    @pytest.mark.anyio
+    async def test_form_generator_generate_form_coalesced_users(self):
+        """Tests that coalesced callers are admitted and charged separately."""
+        form_generator = FormGenerator()
+
+        async def ainvoke(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return chain_output(FormCreate(title="Form"))
+
+        form_generator._chain = mock.Mock(ainvoke=mock.AsyncMock(side_effect=ainvoke))
+        form_generator._budget = mock.Mock(
+            check=mock.AsyncMock(), charge=mock.AsyncMock()
+        )
+        form_generator._admission.max_per_key = 1
+        form_generator._admission.queue_timeout = 0.001
+
+        description = fake.sentence()
+        results = await asyncio.gather(
+            form_generator.generate_form(description, user_id="alice"),
+            form_generator.generate_form(description, user_id="alice"),
+            form_generator.generate_form(description, user_id="bob"),
+            return_exceptions=True,
+        )
+
+        form_generator._chain.ainvoke.assert_called_once()
+        assert isinstance(results[0], FormCreate)
+        assert isinstance(results[1], ServiceUnavailableError)
+        assert isinstance(results[2], FormCreate)
+        assert form_generator._budget.charge.await_args_list == [
+            mock.call("alice", 150),
+            mock.call("bob", 150),
+        ]
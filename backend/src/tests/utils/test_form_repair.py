@@ -0,0 +1,130 @@
+from unittest import mock
+
+import pytest
+from pydantic import ValidationError
+
+from src.config import settings
+from src.models.field import FieldType
+from src.utils.form_repair import repair_field, repair_form
+
+
+class TestRepairField:
+    def test_valid_field_unchanged(self):
+        """Tests that valid fields are not repaired."""
+        repairs = []
+        field = {"type": "text", "label": "Name", "min_length": 2, "max_length": 20}
+
+        assert repair_field(field, repairs) == field | {"type": FieldType.TEXT}
+        assert repairs == []
+
+    @pytest.mark.parametrize(
+        "field, expected",
+        [
+            (
+                {"type": "text", "label": "Name", "min_length": 50, "max_length": 5},
+                {"min_length": 5, "max_length": 50},
+            ),
+            (
+                {"type": "number", "label": "Age", "min_value": 99, "max_value": 1},
+                {"min_value": 1, "max_value": 99},
+            ),
+            (
+                {
+                    "type": "date",
+                    "label": "Date",
+                    "min_date": "2025-12-31",
+                    "max_date": "2025-01-01",
+                },
+                {"min_date": "2025-01-01", "max_date": "2025-12-31"},
+            ),
+        ],
+    )
+    def test_swap_inverted_range(self, field: dict, expected: dict):
+        """Tests that inverted min/max constraints are swapped."""
+        repairs = []
+        assert repair_field(field, repairs).items() >= expected.items()
+        assert len(repairs) == 1
+
+    def test_reset_invalid_lengths(self):
+        """Tests that non-positive lengths fall back to their defaults."""
+        repairs = []
+        field = repair_field(
+            {"type": "paragraph", "label": "Bio", "min_length": 0, "max_length": -1},
+            repairs,
+        )
+
+        assert "min_length" not in field
+        assert "max_length" not in field
+        assert len(repairs) == 2
+
+    def test_normalize_type(self):
+        """Tests that types written like in the prompt are normalized."""
+        repairs = []
+        field = repair_field(
+            {"type": "Multi-Select", "label": "Topics", "options": ["A", "B"]}, repairs
+        )
+        assert field["type"] == FieldType.MULTI_SELECT
+        assert len(repairs) == 1
+
+    def test_clean_options(self):
+        """Tests that blank and duplicate options are removed, keeping order."""
+        repairs = []
+        field = repair_field(
+            {"type": "select", "label": "Rating", "options": ["Good", " ", "Good", 1]},
+            repairs,
+        )
+        assert field["options"] == ["Good"]
+        assert len(repairs) == 1
+
+    @pytest.mark.parametrize(
+        "field",
+        [
+            {"type": "select", "label": "Rating", "options": []},
+            {"type": "dropdown", "label": "Country"},
+            {"type": "slider", "label": "Volume"},
+            {"type": "text", "label": "  "},
+            "text",
+        ],
+    )
+    def test_drop_unrepairable_field(self, field):
+        """Tests that fields which cannot be repaired are dropped."""
+        repairs = []
+        assert repair_field(field, repairs) is None
+        assert len(repairs) == 1
+
+
+class TestRepairForm:
+    def test_repair_form(self):
+        """Tests that an invalid form is repaired into a valid one."""
+        args = {
+            "title": "T" * 150,
+            "description": "Feedback form",
+            "fields": [
+                {"type": "text", "label": "Name", "min_length": 10, "max_length": 5},
+                {"type": "select", "label": "Rating", "options": []},
+                {"type": "email", "label": "Email", "help_text": "x" * 250},
+            ],
+        }
+
+        form, repairs = repair_form(args)
+
+        assert form.title == "T" * 100
+        assert [field.label for field in form.fields] == ["Name", "Email"]
+        assert form.fields[0].min_length == 5
+        assert len(form.fields[1].help_text) == 200
+        assert len(repairs) == 4
+
+    @mock.patch.object(settings, "MAX_FIELDS", 2)
+    def test_truncate_fields(self):
+        """Tests that fields beyond the maximum are dropped."""
+        fields = [{"type": "text", "label": f"Field {i}"} for i in range(4)]
+
+        form, repairs = repair_form({"title": "Form", "fields": fields})
+
+        assert len(form.fields) == 2
+        assert repairs == ["dropped 2 extra fields"]
+
+    def test_unrepairable_form(self):
+        """Tests that forms without a title are not repaired."""
+        with pytest.raises(ValidationError):
+            repair_form({"fields": [{"type": "text", "label": "Name"}]})
@@ -0,0 +1,56 @@
+import pytest
+
+from src.utils.form_templates import TemplateIndex, char_ngrams, load_templates
+
+
+@pytest.fixture(scope="module")
+def index() -> TemplateIndex:
+    return TemplateIndex(load_templates(), threshold=0.75)
+
+
+class TestTemplateIndex:
+    def test_char_ngrams(self):
+        """Tests that n-grams are padded at word boundaries."""
+        assert char_ngrams("RSVP!") == {" rs": 1, "rsv": 1, "svp": 1, "vp ": 1}
+
+    @pytest.mark.parametrize(
+        "prompt, name",
+        [
+            ("Create a customer feedback form for my coffee shop", "customer_feedback"),
+            ("Create an RSVP form for my wedding next month", "event_rsvp"),
+            (
+                "Job application form for a software engineer position",
+                "job_application",
+            ),
+            ("Contact us form for my portfolio website", "contact"),
+            ("Newsletter signup form for our bakery", "newsletter_signup"),
+            (
+                "Registration form for our annual developer conference",
+                "event_registration",
+            ),
+        ],
+    )
+    def test_match(self, index: TemplateIndex, prompt: str, name: str):
+        """Tests that common requests match their template."""
+        match = index.match(prompt)
+        assert match is not None
+        assert match.template.name == name
+
+    @pytest.mark.parametrize(
+        "prompt",
+        [
+            "Patient intake form for a dental clinic including medical history",
+            "Create a customer feedback form with fields for order number, delivery "
+            "speed rating from 1-5, packaging quality, and a free text comment box",
+            "Create a form for booking a table at our restaurant",
+        ],
+    )
+    def test_no_match(self, index: TemplateIndex, prompt: str):
+        """Tests that specific or unrelated requests do not match a template."""
+        assert index.match(prompt) is None
+
+    def test_threshold(self):
+        """Tests that a threshold above 1 disables templates."""
+        index = TemplateIndex(load_templates(), threshold=1.01)
+        assert index.match("contact form") is None
+        assert index.score("contact form").score == pytest.approx(1)
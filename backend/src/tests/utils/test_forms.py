@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from src.config import settings
+from src.exceptions import BadRequestError
+from src.models.form import Form
+from src.models.user import User
+from src.utils.forms import release_forms, reserve_forms
+
+
+@pytest.mark.anyio
+class TestReserveForms:
+    async def test_reserve_forms_backfills_count(self, test_user: User):
+        """Tests that the form count starts from the user's existing forms."""
+        await Form(title="Form", creator=test_user).create()
+
+        await reserve_forms(test_user, 2)
+        assert (await User.get(test_user.id)).form_count == 3
+
+        await release_forms(test_user)
+        assert (await User.get(test_user.id)).form_count == 2
+
+    async def test_reserve_forms_concurrent(self, test_user: User):
+        """Tests that concurrent reservations never exceed the form limit."""
+        results = await asyncio.gather(
+            *(reserve_forms(test_user) for _ in range(settings.MAX_FORMS + 3)),
+            return_exceptions=True,
+        )
+
+        rejected = [result for result in results if isinstance(result, Exception)]
+        assert len(rejected) == 3
+        assert all(isinstance(err, BadRequestError) for err in rejected)
+        assert (await User.get(test_user.id)).form_count == settings.MAX_FORMS
@@ -0,0 +1,92 @@
+from unittest import mock
+
+import pytest
+
+from src.config import settings
+from src.models.form import FormCreate
+from src.models.generation import GenerationCacheEntry
+from src.tests.helpers import load_json_data
+from src.utils.generation_cache import GenerationCache, normalize_prompt
+
+TODAY = "2024-01-01"
+
+
+@pytest.fixture
+def form() -> FormCreate:
+    return FormCreate.model_validate(load_json_data("forms/form.json"))
+
+
+class TestNormalizePrompt:
+    def test_normalize_prompt(self):
+        """Tests that case, whitespace and trailing punctuation are ignored."""
+        assert normalize_prompt("  A Customer\n feedback   SURVEY. ") == (
+            "a customer feedback survey"
+        )
+
+    def test_make_key(self):
+        """Tests that keys depend on the normalized prompt and date."""
+        key = GenerationCache.make_key("Feedback survey", TODAY)
+        assert key == GenerationCache.make_key("feedback  survey!", TODAY)
+        assert key != GenerationCache.make_key("Feedback survey", "2024-01-02")
+        assert key != GenerationCache.make_key("Signup form", TODAY)
+
+    def test_make_key_model(self):
+        """Tests that keys depend on the provider, model and cassette."""
+        key = GenerationCache.make_key("Feedback survey", TODAY)
+        with mock.patch.object(settings, "GROQ_MODEL", "llama-3.3-70b-versatile"):
+            assert GenerationCache.make_key("Feedback survey", TODAY) != key
+        with mock.patch.object(settings, "LLM_PROVIDER", "fake"):
+            fake_key = GenerationCache.make_key("Feedback survey", TODAY)
+            assert fake_key != key
+            with mock.patch.object(settings, "LLM_CASSETTE", "replay"):
+                assert GenerationCache.make_key("Feedback survey", TODAY) != fake_key
+            with mock.patch.object(settings, "LLM_CASSETTE", "record"):
+                assert GenerationCache.make_key("Feedback survey", TODAY) != fake_key
+
+
+@pytest.mark.anyio
+class TestGenerationCache:
+    async def test_get_miss(self):
+        """Tests that unknown keys are misses."""
+        cache = GenerationCache(persist=False)
+        assert await cache.get("key") is None
+
+    async def test_get_returns_copy(self, form: FormCreate):
+        """Tests that cached forms are isolated from caller changes."""
+        cache = GenerationCache(persist=False)
+        await cache.set("key", form)
+        form.title = "Changed"
+
+        cached = await cache.get("key")
+        assert cached.title != "Changed"
+        cached.title = "Changed again"
+        assert (await cache.get("key")).title != "Changed again"
+
+    async def test_lru_eviction(self, form: FormCreate):
+        """Tests that least recently used entries are evicted."""
+        cache = GenerationCache(max_size=2, persist=False)
+        await cache.set("a", form)
+        await cache.set("b", form)
+        await cache.get("a")
+        await cache.set("c", form)
+
+        assert await cache.get("a") is not None
+        assert await cache.get("b") is None
+        assert await cache.get("c") is not None
+
+    async def test_ttl_expiry(self, form: FormCreate):
+        """Tests that expired entries are dropped."""
+        cache = GenerationCache(ttl=10, persist=False)
+        with mock.patch("src.utils.generation_cache.time.monotonic") as monotonic:
+            monotonic.return_value = 100
+            await cache.set("key", form)
+            monotonic.return_value = 111
+            assert await cache.get("key") is None
+
+    async def test_persisted_entries_shared(self, form: FormCreate):
+        """Tests that persisted entries are served to other cache instances."""
+        await GenerationCache(persist=True).set("key", form)
+        assert await GenerationCacheEntry.get("key") is not None
+
+        cached = await GenerationCache(persist=True).get("key")
+        assert cached.model_dump() == form.model_dump()
@@ -0,0 +1,129 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from src.config import settings
+from src.exceptions import ServiceUnavailableError
+from src.models.form import Form, FormCreate
+from src.models.generation import GenerationJob, GenerationJobStatus
+from src.models.user import User
+from src.tests.helpers import load_json_data
+from src.utils.generation_jobs import GenerationWorkerPool
+
+PROMPT = "Create a customer feedback form with name, email and a rating field."
+
+
+@pytest.fixture
+def form_generator() -> mock.Mock:
+    generator = mock.Mock()
+    generator.generate_form = mock.AsyncMock(
+        return_value=FormCreate.model_validate(load_json_data("forms/form.json"))
+    )
+    return generator
+
+
+@pytest.fixture
+def pool(form_generator: mock.Mock) -> GenerationWorkerPool:
+    return GenerationWorkerPool(lambda: form_generator, workers=1, poll_interval=0)
+
+
+@pytest.mark.anyio
+class TestGenerationWorkerPool:
+    async def test_claim_oldest_job(self, pool: GenerationWorkerPool):
+        """Tests that the oldest pending job is claimed with a lease."""
+        now = datetime.now(tz=UTC)
+        newer = GenerationJob(user_id="user", prompt=PROMPT, created_at=now)
+        older = GenerationJob(
+            user_id="user", prompt=PROMPT, created_at=now - timedelta(minutes=1)
+        )
+        await newer.create()
+        await older.create()
+
+        job = await pool.claim()
+        assert job.id == older.id
+        assert job.status == GenerationJobStatus.RUNNING
+        assert job.attempts == 1
+        assert job.lease_expires_at is not None
+
+        assert (await pool.claim()).id == newer.id
+        assert await pool.claim() is None
+
+    async def test_reclaim_expired_lease(self, pool: GenerationWorkerPool):
+        """Tests that running jobs are reclaimed once their lease expires."""
+        job = GenerationJob(
+            user_id="user",
+            prompt=PROMPT,
+            status=GenerationJobStatus.RUNNING,
+            attempts=1,
+            lease_expires_at=datetime.now(tz=UTC) - timedelta(seconds=1),
+        )
+        await job.create()
+
+        claimed = await pool.claim()
+        assert claimed.id == job.id
+        assert claimed.attempts == 2
+
+    async def test_process_job(
+        self, pool: GenerationWorkerPool, form_generator: mock.Mock, test_user: User
+    ):
+        """Tests that a processed job creates the form for its user."""
+        job = GenerationJob(user_id=test_user.id, prompt=PROMPT, title="Mine")
+        await job.create()
+
+        assert await pool.run_once()
+
+        job = await GenerationJob.get(job.id)
+        assert job.status == GenerationJobStatus.SUCCEEDED
+        assert job.finished_at is not None
+        form_generator.generate_form.assert_awaited_once_with(
+            PROMPT, user_id=test_user.id
+        )
+
+        form = await Form.get(job.form_id, fetch_links=True)
+        assert form.title == "Mine"
+        assert form.creator.id == test_user.id
+
+    async def test_process_job_form_limit(
+        self, pool: GenerationWorkerPool, form_generator: mock.Mock, test_user: User
+    ):
+        """Tests that a job fails once the user has reached the form limit."""
+        form = FormCreate.model_validate(load_json_data("forms/form.json"))
+        for _ in range(settings.MAX_FORMS):
+            await Form(**form.model_dump(), creator=test_user).create()
+
+        job = GenerationJob(user_id=test_user.id, prompt=PROMPT)
+        await job.create()
+        await pool.run_once()
+
+        job = await GenerationJob.get(job.id)
+        assert job.status == GenerationJobStatus.FAILED
+        assert "Maximum number of forms" in job.error
+        form_generator.generate_form.assert_not_awaited()
+
+    async def test_process_job_postponed(
+        self, pool: GenerationWorkerPool, form_generator: mock.Mock, test_user: User
+    ):
+        """Tests that jobs are requeued while the generator is unavailable."""
+        form_generator.generate_form.side_effect = ServiceUnavailableError("Busy")
+        job = GenerationJob(user_id=test_user.id, prompt=PROMPT)
+        await job.create()
+        await pool.run_once()
+
+        job = await GenerationJob.get(job.id)
+        assert job.status == GenerationJobStatus.PENDING
+        assert job.attempts == 0
+
+    async def test_process_job_attempts_exhausted(self, pool: GenerationWorkerPool):
+        """Tests that jobs interrupted too many times are failed."""
+        job = GenerationJob(
+            user_id="user",
+            prompt=PROMPT,
+            attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+        )
+        await job.create()
+        await pool.run_once()
+
+        job = await GenerationJob.get(job.id)
+        assert job.status == GenerationJobStatus.FAILED
+        assert job.expires_at is not None
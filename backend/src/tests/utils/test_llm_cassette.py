@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
+
+from src.config import settings
+from src.models.form import FormCreate
+from src.utils.fake_llm import FakeFormChatModel, synthesize_form
+from src.utils.form_generation import FormGenerator, create_chat_model
+from src.utils.llm_cassette import CassetteChatModel, CassetteMissError, load_cassette
+
+PROMPT = "Create an event RSVP form asking for the number of guests and comments."
+_WITHOUT_TAGS = {"fields": {"__all__": {"tag"}}}
+
+
+def _stream_chain(llm: CassetteChatModel):
+    return llm.bind_tools([FormCreate]) | JsonOutputKeyToolsParser(
+        key_name="FormCreate", first_tool_only=True
+    )
+
+
+@pytest.mark.anyio
+class TestCassetteChatModel:
+    async def test_record_and_replay(self, tmp_path: Path):
+        """Tests that recorded outputs are replayed for the same prompt."""
+        path = str(tmp_path / "cassette.jsonl")
+        recorder = CassetteChatModel(
+            path=path, mode="record", model=FakeFormChatModel(latency=0.001)
+        )
+        recorded = await recorder.with_structured_output(FormCreate).ainvoke(PROMPT)
+
+        entry = load_cassette(path)[PROMPT.casefold().rstrip(".")]
+        assert entry["prompt"] == PROMPT
+        assert entry["model"] == "fake-form"
+        assert entry["tool_calls"][0]["args"] == synthesize_form(PROMPT)
+        assert entry["usage"]["total_tokens"] > 0
+
+        player = CassetteChatModel(path=path, replay_latency=False)
+        replayed = await player.with_structured_output(FormCreate).ainvoke(
+            f"  {PROMPT.upper()}  "
+        )
+        assert replayed.model_dump(exclude=_WITHOUT_TAGS) == recorded.model_dump(
+            exclude=_WITHOUT_TAGS
+        )
+
+    async def test_replay_raw_output(self, tmp_path: Path):
+        """Tests that outputs without a valid tool call are replayed as recorded."""
+        path = tmp_path / "cassette.jsonl"
+        entry = {
+            "prompt": PROMPT,
+            "model": "test",
+            "content": "",
+            "tool_calls": [],
+            "invalid_tool_calls": [
+                {"name": "FormCreate", "args": '{"title": ', "error": "Bad JSON"}
+            ],
+            "usage": None,
+            "latency": 1.5,
+        }
+        path.write_text(json.dumps(entry) + "\n")
+
+        player = CassetteChatModel(path=str(path), replay_latency=False)
+        output = await player.with_structured_output(
+            FormCreate, include_raw=True
+        ).ainvoke(PROMPT)
+
+        assert output["parsed"] is None
+        assert output["raw"].invalid_tool_calls[0]["args"] == '{"title": '
+
+    async def test_replay_miss(self, tmp_path: Path):
+        """Tests that prompts which were not recorded are not answered."""
+        player = CassetteChatModel(path=str(tmp_path / "missing.jsonl"))
+        with pytest.raises(CassetteMissError):
+            await player.ainvoke(PROMPT)
+
+    async def test_stream_record_and_replay(self, tmp_path: Path):
+        """Tests that streamed outputs are recorded, and replayed in chunks."""
+        path = str(tmp_path / "cassette.jsonl")
+        recorder = CassetteChatModel(
+            path=path, mode="record", model=FakeFormChatModel(latency=0.001)
+        )
+        recorded = [
+            partial async for partial in _stream_chain(recorder).astream(PROMPT)
+        ]
+
+        player = CassetteChatModel(path=path, replay_latency=False, chunk_size=8)
+        replayed = [partial async for partial in _stream_chain(player).astream(PROMPT)]
+
+        assert len(replayed) > 1
+        assert replayed[-1] == recorded[-1] == synthesize_form(PROMPT)
+
+    def test_record_requires_model(self, tmp_path: Path):
+        """Tests that recording without a model is rejected."""
+        with pytest.raises(ValueError):
+            CassetteChatModel(path=str(tmp_path / "cassette.jsonl"), mode="record")
+
+
+@pytest.mark.anyio
+async def test_form_generator_cassette(tmp_path: Path):
+    """Tests that forms generated from a recording are replayed offline."""
+    with (
+        mock.patch.object(settings, "LLM_PROVIDER", "fake"),
+        mock.patch.object(settings, "FAKE_LLM_LATENCY", 0.001),
+        mock.patch.object(settings, "LLM_CASSETTE_PATH", str(tmp_path / "c.jsonl")),
+        mock.patch.object(settings, "LLM_CASSETTE_LATENCY", False),
+    ):
+        with mock.patch.object(settings, "LLM_CASSETTE", "record"):
+            assert create_chat_model().mode == "record"
+            recorded = await FormGenerator().generate_form(PROMPT)
+
+        with mock.patch.object(settings, "LLM_CASSETTE", "replay"):
+            assert create_chat_model().mode == "replay"
+            replayed = await FormGenerator().generate_form(PROMPT)
+
+    assert replayed.model_dump(exclude=_WITHOUT_TAGS) == recorded.model_dump(
+        exclude=_WITHOUT_TAGS
+    )
@@ -0,0 +1,36 @@
+import pytest
+
+from src.utils.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_counter_and_gauge(self):
+        """Tests that counters and gauges are created once and updated."""
+        registry = MetricsRegistry()
+        registry.counter("requests").inc()
+        registry.counter("requests").inc(2)
+        registry.gauge("in_flight").inc()
+        registry.gauge("in_flight").dec()
+
+        snapshot = registry.snapshot()
+        assert snapshot["requests"] == {"type": "counter", "value": 3}
+        assert snapshot["in_flight"] == {"type": "gauge", "value": 0}
+
+    def test_histogram(self):
+        """Tests histogram summary statistics."""
+        histogram = MetricsRegistry().histogram("latency")
+        for value in range(1, 101):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["mean"] == 50.5
+        assert snapshot["max"] == 100
+        assert (snapshot["p50"], snapshot["p99"]) == (50, 99)
+
+    def test_type_conflict(self):
+        """Tests that a name cannot be reused for another metric type."""
+        registry = MetricsRegistry()
+        registry.counter("requests")
+        with pytest.raises(TypeError):
+            registry.gauge("requests")
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+from src.utils.metrics import METRICS
+from src.utils.prompt_screening import PromptScreener, ScreeningReason, char_entropy
+
+BENCHMARK_PROMPTS = Path(__file__).parents[3] / "benchmarks" / "prompts.txt"
+
+# Legitimate prompts, many without any common form keyword
+PROMPTS = [
+    *BENCHMARK_PROMPTS.read_text(encoding="utf-8").splitlines(),
+    "Help me plan a potluck dinner party: who brings what dish, allergies, "
+    "and how many plates.",
+    "Mentorship programme matching: strengths, goals, availability, "
+    "preferred mentor traits.",
+    "Quarterly OKR self-appraisal for engineering staff covering KPIs, wins "
+    "and blockers.",
+    "Car wash loyalty programme where drivers give their licence plate and "
+    "car model.",
+    "Lost and found claims at the museum: item description, where and when "
+    "it went missing.",
+    "Pet adoption screening covering home type, other animals and hours " "spent away.",
+]
+
+
+def test_char_entropy():
+    """Tests the character entropy of texts."""
+    assert char_entropy("") == 0
+    assert char_entropy("aaaa") == 0
+    assert char_entropy("abcd") == 2
+
+
+class TestPromptScreener:
+    @pytest.mark.parametrize(
+        "prompt",
+        [
+            "Create a customer feedback form with name, email and a rating field.",
+            "Job application for a barista position",
+            "Wedding RSVP with meal preference and plus one",
+            "I want to know what my students think about the new course",
+            "Sign-up sheet for the 5k charity run on 2025-06-01",
+            "Formulario de inscripción para un taller de cocina",
+            "Анкета для участников конференции",
+        ],
+    )
+    def test_accepted(self, prompt: str):
+        """Tests that reasonable descriptions are accepted."""
+        result = PromptScreener().screen(prompt)
+        assert result.accepted
+        assert result.message is None
+
+    def test_accepted_corpus(self):
+        """Tests that every prompt of a corpus of legitimate prompts is accepted."""
+        screener = PromptScreener()
+        rejected = [
+            prompt
+            for prompt in filter(None, PROMPTS)
+            if not screener.screen(prompt).accepted
+        ]
+        assert rejected == []
+
+    @pytest.mark.parametrize(
+        "prompt",
+        ["What is the capital of France?", "Lorem ipsum dolor sit amet consectetur"],
+    )
+    def test_off_topic(self, prompt: str):
+        """Tests that off-topic prompts are flagged, but not rejected."""
+        result = PromptScreener().screen(prompt)
+        assert result.accepted
+        assert result.reason == ScreeningReason.OFF_TOPIC
+        assert result.message is None
+
+    @pytest.mark.parametrize(
+        "prompt, reason",
+        [
+            ("a" * 20, ScreeningReason.REPEATED_CHARACTERS),
+            ("!!!!!!!!!! form please", ScreeningReason.REPEATED_CHARACTERS),
+            ("abab " * 10, ScreeningReason.LOW_ENTROPY),
+            ("asdfghjkl qwrtzxcvb sdfgh mnbvcxz", ScreeningReason.GIBBERISH),
+            ("#$%^&*()_+ 12345 @!~", ScreeningReason.GIBBERISH),
+        ],
+    )
+    def test_rejected(self, prompt: str, reason: ScreeningReason):
+        """Tests that unusable prompts are rejected, with their reason."""
+        result = PromptScreener().screen(prompt)
+        assert not result.accepted
+        assert result.reason == reason
+        assert result.message
+
+    def test_metrics(self):
+        """Tests that decisions are counted per reason."""
+        screener = PromptScreener()
+        accepted = METRICS.counter("prompt_screening_accepted_total")
+        gibberish = METRICS.counter("prompt_screening_gibberish_total")
+        accepted_before, gibberish_before = accepted.value, gibberish.value
+
+        screener.screen("Event registration form")
+        screener.screen("asdfghjkl qwrtzxcvb sdfgh mnbvcxz")
+
+        assert accepted.value == accepted_before + 1
+        assert gibberish.value == gibberish_before + 1
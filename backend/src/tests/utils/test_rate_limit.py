@@ -0,0 +1,95 @@
+import time
+from unittest import mock
+
+import pytest
+
+from src.models.rate_limit import RateLimitCounter
+from src.utils.rate_limit import InMemoryRateLimitBackend, MongoRateLimitBackend
+
+LIMIT = 3
+PERIOD = 10
+
+
+@pytest.fixture
+def clock():
+    """Controllable monotonic clock."""
+    with mock.patch("src.utils.rate_limit.time.monotonic", return_value=1000.0) as m:
+        yield m
+
+
+@pytest.mark.anyio
+class TestInMemoryRateLimitBackend:
+    async def test_allows_burst_up_to_limit(self, clock):
+        """Tests that a full burst is allowed with decreasing quota."""
+        backend = InMemoryRateLimitBackend()
+
+        remaining = [
+            (await backend.hit("key", LIMIT, PERIOD)).remaining for _ in range(LIMIT)
+        ]
+        assert remaining == [2, 1, 0]
+
+        result = await backend.hit("key", LIMIT, PERIOD)
+        assert not result.allowed
+        assert result.retry_after == pytest.approx(PERIOD / LIMIT)
+
+    async def test_replenishes_over_time(self, clock):
+        """Tests that quota is replenished at a steady rate."""
+        backend = InMemoryRateLimitBackend()
+        for _ in range(LIMIT):
+            await backend.hit("key", LIMIT, PERIOD)
+
+        clock.return_value += PERIOD / LIMIT
+        assert (await backend.hit("key", LIMIT, PERIOD)).allowed
+        assert not (await backend.hit("key", LIMIT, PERIOD)).allowed
+
+        clock.return_value += PERIOD
+        assert (await backend.hit("key", LIMIT, PERIOD)).remaining == LIMIT - 1
+
+    async def test_keys_are_independent(self, clock):
+        """Tests that each key has its own quota."""
+        backend = InMemoryRateLimitBackend()
+        assert (await backend.hit("a", 1, PERIOD)).allowed
+        assert not (await backend.hit("a", 1, PERIOD)).allowed
+        assert (await backend.hit("b", 1, PERIOD)).allowed
+
+    async def test_evicts_idle_keys(self, clock):
+        """Tests that fully replenished keys are dropped."""
+        backend = InMemoryRateLimitBackend()
+        await backend.hit("a", LIMIT, PERIOD)
+        await backend.hit("b", LIMIT, PERIOD)
+        assert len(backend) == 2
+
+        clock.return_value += PERIOD
+        await backend.hit("c", LIMIT, PERIOD)
+        assert len(backend) == 1
+
+    async def test_evicts_least_recently_used_keys(self, clock):
+        """Tests that the number of tracked keys is bounded."""
+        backend = InMemoryRateLimitBackend(max_keys=2)
+        for key in ("a", "b", "c"):
+            await backend.hit(key, 1, PERIOD)
+
+        assert len(backend) == 2
+        # "a" was evicted, so its quota starts fresh
+        assert (await backend.hit("a", 1, PERIOD)).allowed
+        assert not (await backend.hit("c", 1, PERIOD)).allowed
+
+
+@pytest.mark.anyio
+class TestMongoRateLimitBackend:
+    async def test_shared_across_instances(self):
+        """Tests that backend instances share the same quota."""
+        backends = [MongoRateLimitBackend(), MongoRateLimitBackend()]
+
+        results = [await backends[i % 2].hit("key", LIMIT, PERIOD) for i in range(4)]
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert [result.remaining for result in results] == [2, 1, 0, 0]
+
+    async def test_counter_expiry(self):
+        """Tests that counters expire once fully replenished."""
+        await MongoRateLimitBackend().hit("key", LIMIT, PERIOD)
+
+        counter = await RateLimitCounter.get("key")
+        assert counter.expires_at.timestamp() == pytest.approx(
+            time.time() + PERIOD / LIMIT, abs=1
+        )
@@ -0,0 +1,135 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.exceptions import ServiceUnavailableError
+from src.utils.metrics import METRICS
+from src.utils.resilience import CircuitBreaker, RetryPolicy
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        """Tests that the circuit opens after consecutive failures."""
+        breaker = CircuitBreaker("test_breaker_open", 2, reset_timeout=30)
+
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            breaker.check()
+        assert 1 <= int(exc_info.value.headers["Retry-After"]) <= 30
+        assert METRICS.gauge("test_breaker_open_circuit_open").value == 1
+
+    def test_success_resets_failures(self):
+        """Tests that a success resets the consecutive failure count."""
+        breaker = CircuitBreaker("test_breaker_reset", 2, reset_timeout=30)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.check()
+        assert not breaker.is_open
+
+    def test_half_open_trial(self):
+        """Tests that a single trial call is allowed after the reset timeout."""
+        breaker = CircuitBreaker("test_breaker_trial", 1, reset_timeout=0.01)
+        breaker.record_failure()
+
+        with mock.patch("src.utils.resilience.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = breaker._opened_at + 1
+            breaker.check()
+            with pytest.raises(ServiceUnavailableError):
+                breaker.check()
+
+        breaker.record_success()
+        breaker.check()
+        assert not breaker.is_open
+
+
+@pytest.mark.anyio
+class TestRetryPolicy:
+    @staticmethod
+    def make_policy(name: str, **kwargs) -> RetryPolicy:
+        options = {"timeout": 0.05, "max_retries": 2, "backoff": 0, "backoff_max": 0}
+        return RetryPolicy(name, **(options | kwargs))
+
+    async def test_retries_transient_errors(self):
+        """Tests that transient errors are retried until an attempt succeeds."""
+        policy = self.make_policy("test_retry")
+        fn = mock.AsyncMock(side_effect=[ConnectionError(), ConnectionError(), "ok"])
+
+        assert await policy.call(fn) == "ok"
+        assert fn.await_count == 3
+        assert METRICS.counter("test_retry_retries_total").value == 2
+
+    async def test_retries_exhausted(self):
+        """Tests that exhausted retries raise a ServiceUnavailableError."""
+        policy = self.make_policy("test_exhausted")
+        fn = mock.AsyncMock(side_effect=ConnectionError())
+
+        with pytest.raises(ServiceUnavailableError):
+            await policy.call(fn)
+        assert fn.await_count == 3
+
+    async def test_non_transient_error(self):
+        """Tests that errors not considered transient are raised immediately."""
+        policy = self.make_policy(
+            "test_non_transient", retry_on=lambda err: isinstance(err, TimeoutError)
+        )
+        fn = mock.AsyncMock(side_effect=ValueError("invalid"))
+
+        with pytest.raises(ValueError, match="invalid"):
+            await policy.call(fn)
+        fn.assert_awaited_once()
+
+    async def test_attempt_timeout(self):
+        """Tests that slow attempts time out and are retried."""
+        policy = self.make_policy("test_attempt_timeout", max_retries=1)
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+            return "ok"
+
+        assert await policy.call(fn) == "ok"
+        assert METRICS.counter("test_attempt_timeout_timeouts_total").value == 1
+
+    async def test_hedged_attempt(self):
+        """Tests that a slow attempt is hedged and the fastest result wins."""
+        policy = self.make_policy(
+            "test_hedge", timeout=1, hedge=True, hedge_min_samples=1
+        )
+        await policy.call(mock.AsyncMock(return_value="warmup"))
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        assert await policy.call(fn) == "fast"
+        assert calls == 2
+        assert METRICS.counter("test_hedge_hedges_total").value == 1
+
+    async def test_circuit_breaker(self):
+        """Tests that an open circuit fails fast without calling the provider."""
+        breaker = CircuitBreaker("test_policy_breaker", 2, reset_timeout=30)
+        policy = self.make_policy("test_policy_breaker", breaker=breaker)
+        fn = mock.AsyncMock(side_effect=ConnectionError())
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            await policy.call(fn)
+        assert fn.await_count == 2
+        assert "Retry-After" in exc_info.value.headers
+
+        with pytest.raises(ServiceUnavailableError):
+            await policy.call(fn)
+        assert fn.await_count == 2
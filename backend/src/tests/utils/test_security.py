@@ -8,9 +8,12 @@ from fastapi.security import HTTPAuthorizationCredentials
 from src.config import settings
 from src.exceptions import AuthenticationError
 from src.utils.security import (
+    PWD_CONTEXT,
     CurrentUser,
+    calibrate_hash_rounds,
     create_access_token,
     get_password_hash,
+    verify_and_update_password,
     verify_password,
 )
 
@@ -28,6 +31,44 @@ class TestPasswordHashing:
         password = fake.password()
         assert get_password_hash(password) != get_password_hash(password)
 
+    def test_password_hash_rounds(self):
+        """Tests that hashes use the configured cost."""
+        hashed_password = get_password_hash(fake.password())
+        handler = PWD_CONTEXT.handler("bcrypt")
+        assert handler.from_string(hashed_password).rounds == (
+            settings.PASSWORD_HASH_ROUNDS
+        )
+
+    def test_verify_and_update_current_hash(self):
+        """Tests that hashes with the configured cost are not rehashed."""
+        password = fake.password()
+        verified, new_hash = verify_and_update_password(
+            password, get_password_hash(password)
+        )
+        assert verified
+        assert new_hash is None
+
+    def test_verify_and_update_outdated_hash(self):
+        """Tests that hashes with an outdated cost are rehashed."""
+        password = fake.password()
+        outdated_hash = PWD_CONTEXT.handler("bcrypt").using(rounds=4).hash(password)
+
+        verified, new_hash = verify_and_update_password(password, outdated_hash)
+        assert verified
+        assert verify_password(password, new_hash)
+        assert not PWD_CONTEXT.needs_update(new_hash)
+
+    def test_verify_and_update_wrong_password(self):
+        """Tests that a wrong password is neither verified nor rehashed."""
+        outdated_hash = PWD_CONTEXT.handler("bcrypt").using(rounds=4).hash("secret")
+        assert verify_and_update_password("wrong", outdated_hash) == (False, None)
+
+    def test_calibrate_hash_rounds(self):
+        """Tests that calibration stops at the first cost above the target."""
+        rounds, timings = calibrate_hash_rounds(target_ms=0, max_rounds=6)
+        assert rounds == 4
+        assert list(timings) == [4]
+
 
 class TestTokenGeneration:
     def test_create_access_token(self):
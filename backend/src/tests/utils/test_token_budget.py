@@ -0,0 +1,41 @@
+import pytest
+
+from src.exceptions import TooManyRequestsError
+from src.models.generation import TokenUsage
+from src.utils.token_budget import TokenBudget
+
+
+@pytest.mark.anyio
+class TestTokenBudget:
+    async def test_charge_accumulates(self):
+        """Tests that usage accumulates per user and day."""
+        budget = TokenBudget(daily_limit=1000)
+
+        await budget.charge("user", 300)
+        await budget.charge("user", 200)
+        await budget.charge("other", 100)
+
+        usage = await TokenUsage.find_one(TokenUsage.user_id == "user")
+        assert usage.tokens == 500
+        assert usage.expires_at is not None
+
+    async def test_check_exhausted(self):
+        """Tests that users over their budget are rejected until tomorrow."""
+        budget = TokenBudget(daily_limit=1000)
+        await budget.check("user")
+
+        await budget.charge("user", 1000)
+        with pytest.raises(TooManyRequestsError) as exc_info:
+            await budget.check("user")
+
+        retry_after = int(exc_info.value.headers["Retry-After"])
+        assert 0 < retry_after <= 24 * 60 * 60
+        await budget.check("other")
+
+    async def test_disabled(self):
+        """Tests that a zero limit disables the budget."""
+        budget = TokenBudget(daily_limit=0)
+
+        await budget.charge("user", 1000)
+        await budget.check("user")
+        assert await TokenUsage.count() == 0
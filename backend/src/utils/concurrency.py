@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from src.exceptions import ServiceUnavailableError
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """Caps concurrent operations, with bounded fair queues and a queue timeout.
+
+    Requests beyond `max_concurrency` wait in a FIFO queue per key (e.g. per
+    user), and freed slots are handed to the queued keys in turn, so a key with
+    many waiting requests cannot starve the others. Keys can also be capped to
+    `max_per_key` operations in flight and `max_queue_per_key` waiting, except
+    for requests without a key. Requests that find the queue full, or that
+    wait longer than `queue_timeout`, are rejected with a
+    `ServiceUnavailableError` carrying a `Retry-After` estimate.
+
+    Queue length, in-flight count, queue wait time and rejections are recorded
+    as `<name>_*` metrics.
+
+    Attributes:
+        name (str): Name used as the metric prefix.
+        max_concurrency (int): Maximum number of operations in flight.
+        max_queue (int): Maximum number of operations waiting for a slot.
+        queue_timeout (float): Maximum time to wait for a slot, in seconds.
+        max_per_key (int | None): Maximum number of operations in flight per key.
+        max_queue_per_key (int | None): Maximum number of operations waiting
+            per key.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_per_key: int | None = None,
+        max_queue_per_key: int | None = None,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_per_key = max_per_key
+        self.max_queue_per_key = max_queue_per_key
+
+        self._active = 0
+        self._active_by_key: Counter[Hashable] = Counter()
+        # Waiters per key, keys are served in order and moved last once served
+        self._queues: dict[Hashable, deque[asyncio.Future]] = {}
+
+        self._in_flight = METRICS.gauge(f"{name}_in_flight", "Operations in flight")
+        self._queued = METRICS.gauge(f"{name}_queued", "Operations waiting")
+        self._queue_wait = METRICS.histogram(
+            f"{name}_queue_wait_seconds", "Time spent waiting for a slot"
+        )
+        self._duration = METRICS.histogram(
+            f"{name}_duration_seconds", "Time spent holding a slot"
+        )
+        self._rejected = METRICS.counter(
+            f"{name}_rejected_total", "Operations rejected by admission control"
+        )
+
+    @property
+    def queued(self) -> int:
+        return self._queued.value
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight.value
+
+    def _reject(self, reason: str) -> ServiceUnavailableError:
+        """Builds a rejection with a `Retry-After` estimate based on throughput."""
+        self._rejected.inc()
+        logger.warning("Admission rejected for %s: %s", self.name, reason)
+
+        if self._duration.count:
+            backlog = (self.queued + self.in_flight + 1) / self.max_concurrency
+            retry_after = math.ceil(self._duration.mean * backlog)
+        else:
+            retry_after = math.ceil(self.queue_timeout)
+
+        return ServiceUnavailableError(
+            "Service is busy. Please try again later.",
+            headers={"Retry-After": str(max(retry_after, 1))},
+        )
+
+    def _below_key_limit(self, key: Hashable) -> bool:
+        """Returns whether the key may start another operation."""
+        if key is None or self.max_per_key is None:
+            return True
+        return self._active_by_key[key] < self.max_per_key
+
+    def _acquire(self, key: Hashable) -> None:
+        self._active += 1
+        self._active_by_key[key] += 1
+        self._in_flight.inc()
+
+    def _release(self, key: Hashable) -> None:
+        self._active -= 1
+        self._active_by_key[key] -= 1
+        if not self._active_by_key[key]:
+            del self._active_by_key[key]
+        self._in_flight.dec()
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hands free slots to waiting operations, one key at a time."""
+        while self._active < self.max_concurrency:
+            for key in self._queues:
+                if self._below_key_limit(key):
+                    break
+            else:
+                return
+
+            # Served keys go to the back of the round
+            queue = self._queues.pop(key)
+            waiter = queue.popleft()
+            if queue:
+                self._queues[key] = queue
+
+            self._queued.dec()
+            self._acquire(key)
+            waiter.set_result(None)
+
+    def _abandon(self, key: Hashable, waiter: asyncio.Future) -> None:
+        """Removes a waiter that gave up, releasing its slot if it got one."""
+        if waiter.done() and not waiter.cancelled():
+            self._release(key)
+            return
+
+        queue = self._queues[key]
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[key]
+        self._queued.dec()
+
+    async def _wait(self, key: Hashable) -> None:
+        """Queues for a slot, rejecting the request if its queue is full."""
+        busy = bool(self._queues) or self._active >= self.max_concurrency
+        if busy and self.queued >= self.max_queue:
+            raise self._reject("queue full")
+        if (
+            key is not None
+            and self.max_queue_per_key is not None
+            and len(self._queues.get(key, ())) >= self.max_queue_per_key
+        ):
+            raise self._reject(f"queue full for {key}")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._queued.inc()
+        self._dispatch()
+
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except TimeoutError:
+            self._abandon(key, waiter)
+            raise self._reject("queue timeout") from None
+        except BaseException:
+            self._abandon(key, waiter)
+            raise
+        finally:
+            self._queue_wait.observe(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def admit(self, key: Hashable = None) -> AsyncIterator[None]:
+        """Waits for a slot and holds it for the duration of the context.
+
+        Args:
+            key (Hashable, optional): Key the operation is queued and capped
+                under, e.g. a user id. Defaults to None, for no per-key limits.
+
+        Raises:
+            ServiceUnavailableError: If the queue is full or the wait times out.
+        """
+        await self._wait(key)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._duration.observe(time.perf_counter() - start)
+            self._release(key)
+
+
+@dataclass
+class _Call:
+    """An in-flight single-flight call and the number of callers awaiting it."""
+
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single execution.
+
+    The first caller for a key starts the call, and callers arriving while it
+    is in flight await the same result (or exception) instead of starting their
+    own. The call runs as a separate task, so a caller going away does not
+    cancel it for the others; it is only cancelled once every caller has gone.
+
+    Attributes:
+        name (str): Name used as the metric prefix.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._coalesced = METRICS.counter(
+            f"{name}_coalesced_total", "Calls served by an in-flight call"
+        )
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do[T](self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Runs `fn`, or waits for the in-flight call with the same key.
+
+        Args:
+            key (Hashable): Identifier of the call.
+            fn (Callable[[], Awaitable[T]]): Function starting the call.
+
+        Returns:
+            T: The result of the call, shared by every caller.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self._coalesced.inc()
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """Removes a finished call, unless it was already replaced."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
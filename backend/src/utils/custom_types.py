@@ -1,10 +1,14 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import SecretStr, StringConstraints, UrlConstraints
 from pydantic_core import MultiHostUrl
 
 type MongoDsn = Annotated[MultiHostUrl, UrlConstraints(allowed_schemes=["mongodb+srv"])]
 
+type ReadPreferenceMode = Literal[
+    "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+]
+
 type Name = Annotated[
     str, StringConstraints(min_length=1, max_length=20, strip_whitespace=True)
 ]
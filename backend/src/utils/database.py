@@ -0,0 +1,493 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from beanie import Document
+from beanie.migrations.database import DBHandler
+from beanie.migrations.models import RunningDirections, RunningMode
+from beanie.migrations.runner import MigrationNode
+from beanie.odm.fields import IndexModelField
+from beanie.odm.queries.find import FindMany
+from beanie.odm.utils.dump import get_dict
+from beanie.odm.utils.init import Initializer
+from beanie.odm.utils.parsing import parse_obj
+from beanie.odm.utils.projection import get_projection
+from beanie.odm.utils.pydantic import get_model_fields
+from beanie.odm.utils.typing import get_index_attributes
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
+from pymongo import IndexModel, WriteConcern, monitoring
+from pymongo.errors import PyMongoError
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+    _ServerMode,
+)
+
+from src.config import settings
+from src.models import DOCUMENT_MODELS
+from src.models.form import FormDurability
+from src.utils.custom_types import ReadPreferenceMode
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_SECONDARY_READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Write concerns by durability, the standard level uses the client's default
+_WRITE_CONCERNS = {
+    FormDurability.FAST: WriteConcern(w=1),
+    FormDurability.DURABLE: WriteConcern(w="majority", j=True),
+}
+
+# Data migrations, applied in file name order by `python -m src.manage migrate`
+MIGRATIONS_PATH = Path(__file__).parents[1] / "migrations"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Reports MongoDB connection pool usage as metrics.
+
+    Tracks open and checked out connections, the time spent waiting to check
+    out a connection, and saturation: the share of the busiest server's pool
+    in use. Checkouts taking the last free connection and failed checkouts,
+    e.g. wait queue timeouts, are counted.
+
+    Events are published from pymongo's threads, so state is updated under a
+    lock.
+
+    Attributes:
+        max_pool_size (int): Maximum connections per server.
+    """
+
+    def __init__(self, max_pool_size: int = settings.MONGO_MAX_POOL_SIZE):
+        self.max_pool_size = max_pool_size
+
+        self._lock = threading.Lock()
+        self._open = 0
+        self._in_use: Counter[Any] = Counter()  # by server address
+
+        self._open_gauge = METRICS.gauge(
+            "mongo_pool_connections", "Open MongoDB connections"
+        )
+        self._in_use_gauge = METRICS.gauge(
+            "mongo_pool_checked_out", "MongoDB connections in use"
+        )
+        self._saturation = METRICS.gauge(
+            "mongo_pool_saturation", "Share of the busiest MongoDB pool in use"
+        )
+        self._wait = METRICS.histogram(
+            "mongo_pool_checkout_wait_seconds", "Time to check out a connection"
+        )
+        self._saturated = METRICS.counter(
+            "mongo_pool_saturated_total", "Checkouts of the last free connection"
+        )
+        self._failures = METRICS.counter(
+            "mongo_pool_checkout_failures_total", "Failed connection checkouts"
+        )
+
+    def _update(self) -> None:
+        """Publishes the current state, called with the lock held."""
+        self._open_gauge.set(self._open)
+        self._in_use_gauge.set(self._in_use.total())
+        busiest = max(self._in_use.values(), default=0)
+        self._saturation.set(busiest / self.max_pool_size if self.max_pool_size else 0)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._open += 1
+            self._update()
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self._open -= 1
+            self._update()
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        if event.duration is not None:
+            self._wait.observe(event.duration)
+        with self._lock:
+            self._in_use[event.address] += 1
+            # A max pool size of 0 means no limit, so the pool never saturates
+            if self.max_pool_size and self._in_use[event.address] >= self.max_pool_size:
+                self._saturated.inc()
+            self._update()
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            if self._in_use[event.address] > 0:
+                self._in_use[event.address] -= 1
+            self._update()
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        self._failures.inc()
+        if event.duration is not None:
+            self._wait.observe(event.duration)
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            logger.warning(
+                "Timed out waiting for a MongoDB connection to %s, pool is saturated",
+                event.address,
+            )
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+
+def _milliseconds(seconds: float | None) -> int | None:
+    return None if seconds is None else int(seconds * 1000)
+
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    """Creates a MongoDB client with the configured connection pool.
+
+    Pool settings override the options of `MONGO_URI`, and pool usage is
+    reported through `PoolMetricsListener`.
+
+    Returns:
+        AsyncIOMotorClient: The MongoDB client, to be closed by the caller.
+    """
+    options: dict[str, Any] = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": _milliseconds(settings.MONGO_MAX_IDLE_TIME),
+        "waitQueueTimeoutMS": _milliseconds(settings.MONGO_WAIT_QUEUE_TIMEOUT),
+        "connectTimeoutMS": _milliseconds(settings.MONGO_CONNECT_TIMEOUT),
+        "serverSelectionTimeoutMS": _milliseconds(
+            settings.MONGO_SERVER_SELECTION_TIMEOUT
+        ),
+        "socketTimeoutMS": _milliseconds(settings.MONGO_SOCKET_TIMEOUT),
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+
+    return AsyncIOMotorClient(
+        settings.MONGO_URI.unicode_string(),
+        event_listeners=[PoolMetricsListener(settings.MONGO_MAX_POOL_SIZE)],
+        **options,
+    )
+
+
+async def warm_up_pool(client: AsyncIOMotorClient, size: int) -> None:
+    """Opens connections up to `size`, so first requests skip connection setup.
+
+    Sends `size` concurrent pings, each checking out a connection of its own
+    while the pool has fewer. Failures are logged, not raised, as the pool
+    also opens connections on demand.
+
+    Args:
+        client (AsyncIOMotorClient): The MongoDB client.
+        size (int): Number of connections to open, usually `minPoolSize`.
+    """
+    if size <= 0:
+        return
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(size)))
+    except PyMongoError as err:
+        logger.warning("Failed to warm up MongoDB connection pool: %s", err)
+        return
+
+    logger.info(
+        "Warmed up MongoDB connection pool to %d connections in %.2fs",
+        size,
+        time.perf_counter() - start,
+    )
+
+
+def read_preference(
+    mode: ReadPreferenceMode, max_staleness: int | None = settings.MONGO_MAX_STALENESS
+) -> _ServerMode:
+    """Returns the read preference for a mode.
+
+    Args:
+        mode (ReadPreferenceMode): The read preference mode.
+        max_staleness (int | None, optional): Maximum replication lag of
+            secondaries to read from, in seconds. Defaults to
+            `MONGO_MAX_STALENESS`.
+
+    Returns:
+        _ServerMode: The read preference.
+    """
+    if mode == "primary":
+        return Primary()
+    return _SECONDARY_READ_PREFERENCES[mode](
+        max_staleness=-1 if max_staleness is None else max_staleness
+    )
+
+
+def read_collection(
+    model: type[Document], mode: ReadPreferenceMode
+) -> AsyncIOMotorCollection:
+    """Returns the collection of a document model, reading with a read preference.
+
+    Args:
+        model (type[Document]): The document model.
+        mode (ReadPreferenceMode): The read preference mode.
+
+    Returns:
+        AsyncIOMotorCollection: The collection.
+    """
+    return model.get_motor_collection().with_options(
+        read_preference=read_preference(mode)
+    )
+
+
+async def find_all(query: FindMany, mode: ReadPreferenceMode) -> list[Any]:
+    """Runs a Beanie query with a read preference, e.g. on secondaries.
+
+    Beanie queries always read from the default collection, so the query is
+    run on a copy of it with the read preference instead.
+
+    Args:
+        query (FindMany): The query, with its sort, skip, limit and links.
+        mode (ReadPreferenceMode): The read preference mode.
+
+    Returns:
+        list[Any]: The documents, or projections, found.
+    """
+    collection = read_collection(query.document_model, mode)
+    projection = get_projection(query.projection_model)
+
+    if query.fetch_links:
+        pipeline = query.build_aggregation_pipeline()
+        if projection is not None:
+            pipeline.append({"$project": projection})
+        cursor = collection.aggregate(pipeline, session=query.session)
+    else:
+        cursor = collection.find(
+            filter=query.get_filter_query(),
+            sort=query.sort_expressions,
+            projection=projection,
+            skip=query.skip_number,
+            limit=query.limit_number,
+            session=query.session,
+        )
+
+    return [parse_obj(query.projection_model, document) async for document in cursor]
+
+
+async def find_first(query: FindMany, mode: ReadPreferenceMode) -> Any | None:
+    """Runs a Beanie query with a read preference, returning the first result.
+
+    Args:
+        query (FindMany): The query.
+        mode (ReadPreferenceMode): The read preference mode.
+
+    Returns:
+        Any | None: The document found, or None.
+    """
+    documents = await find_all(query.limit(1), mode)
+    return documents[0] if documents else None
+
+
+async def count(query: FindMany, mode: ReadPreferenceMode) -> int:
+    """Counts the documents matching a Beanie query with a read preference.
+
+    Args:
+        query (FindMany): The query, without links.
+        mode (ReadPreferenceMode): The read preference mode.
+
+    Returns:
+        int: Number of documents found.
+    """
+    collection = read_collection(query.document_model, mode)
+    return await collection.count_documents(
+        query.get_filter_query(), session=query.session
+    )
+
+
+def write_collection(
+    model: type[Document], durability: FormDurability
+) -> AsyncIOMotorCollection:
+    """Returns the collection of a document model, writing with a durability level.
+
+    Args:
+        model (type[Document]): The document model.
+        durability (FormDurability): The durability level.
+
+    Returns:
+        AsyncIOMotorCollection: The collection.
+    """
+    collection = model.get_motor_collection()
+    if (write_concern := _WRITE_CONCERNS.get(durability)) is not None:
+        return collection.with_options(write_concern=write_concern)
+    return collection
+
+
+async def insert(document: Document, durability: FormDurability) -> Document:
+    """Inserts a document with the write concern of a durability level.
+
+    Like `Document.insert`, without Beanie's event actions and revisions, which
+    the document model must not use.
+
+    Args:
+        document (Document): The document.
+        durability (FormDurability): The durability level.
+
+    Returns:
+        Document: The inserted document.
+    """
+    collection = write_collection(type(document), durability)
+    await collection.insert_one(
+        get_dict(document, to_db=True, keep_nulls=document.get_settings().keep_nulls)
+    )
+    return document
+
+
+class _Initializer(Initializer):
+    """Beanie initializer, which can leave indexes untouched.
+
+    Beanie 1.27 checks and creates the indexes of every model on
+    initialization, and has no option to skip it.
+    """
+
+    def __init__(self, *args: Any, init_indexes: bool = True, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._init_indexes = init_indexes
+
+    async def init_indexes(self, cls, allow_index_dropping: bool = False) -> None:
+        if self._init_indexes:
+            await super().init_indexes(cls, allow_index_dropping)
+
+
+async def init_database(
+    database: AsyncIOMotorDatabase,
+    init_indexes: bool = settings.MONGO_INIT_INDEXES,
+    allow_index_dropping: bool = False,
+) -> None:
+    """Initializes Beanie with the document models.
+
+    Args:
+        database (AsyncIOMotorDatabase): The database.
+        init_indexes (bool, optional): Whether to create missing indexes.
+            Defaults to `MONGO_INIT_INDEXES`.
+        allow_index_dropping (bool, optional): Whether to drop indexes that
+            are no longer declared. Defaults to False.
+    """
+    await _Initializer(
+        database=database,
+        document_models=DOCUMENT_MODELS,
+        init_indexes=init_indexes,
+        allow_index_dropping=allow_index_dropping,
+    )
+
+
+def declared_indexes(model: type[Document]) -> list[IndexModelField]:
+    """Returns the indexes declared by a document model, as Beanie creates them.
+
+    Args:
+        model (type[Document]): The document model.
+
+    Returns:
+        list[IndexModelField]: Indexes of `Indexed` fields and `Settings.indexes`.
+    """
+    indexes = [
+        IndexModelField(
+            IndexModel([(field.alias or name, attributes[0])], **attributes[1])
+        )
+        for name, field in get_model_fields(model).items()
+        if (attributes := get_index_attributes(field)) is not None
+    ]
+    return IndexModelField.merge_indexes(indexes, model.get_settings().indexes)
+
+
+async def missing_indexes(
+    models: Sequence[type[Document]] = DOCUMENT_MODELS,
+) -> dict[str, list[str]]:
+    """Returns declared indexes which do not exist, or differ, by collection.
+
+    Beanie must be initialized.
+
+    Args:
+        models (Sequence[type[Document]], optional): Document models to check.
+            Defaults to `DOCUMENT_MODELS`.
+
+    Returns:
+        dict[str, list[str]]: Names of the missing indexes, by collection.
+    """
+    missing = {}
+    for model in models:
+        collection = model.get_motor_collection()
+        existing = IndexModelField.from_motor_index_information(
+            await collection.index_information()
+        )
+        if names := [
+            index.name
+            for index in IndexModelField.list_difference(
+                declared_indexes(model), existing
+            )
+        ]:
+            missing[collection.name] = names
+    return missing
+
+
+async def run_migrations(
+    client: AsyncIOMotorClient,
+    database_name: str = settings.MONGO_DB_NAME,
+    backward: bool = False,
+    distance: int = 0,
+    use_transaction: bool = True,
+    path: Path = MIGRATIONS_PATH,
+) -> None:
+    """Runs Beanie data migrations, from the last one applied.
+
+    Applied migrations are tracked by Beanie in the `migrations_log` collection.
+
+    Args:
+        client (AsyncIOMotorClient): The MongoDB client.
+        database_name (str, optional): The database. Defaults to `MONGO_DB_NAME`.
+        backward (bool, optional): Whether to roll migrations back.
+            Defaults to False.
+        distance (int, optional): Number of migrations to run, 0 for all.
+            Defaults to 0.
+        use_transaction (bool, optional): Whether to run each migration in a
+            transaction, which requires a replica set. Defaults to True.
+        path (Path, optional): Migrations directory. Defaults to `MIGRATIONS_PATH`.
+    """
+    DBHandler.client = client
+    DBHandler.database = client[database_name]
+
+    root = await MigrationNode.build(path)
+    direction = RunningDirections.BACKWARD if backward else RunningDirections.FORWARD
+    await root.run(
+        mode=RunningMode(direction=direction, distance=distance),
+        allow_index_dropping=False,
+        use_transaction=use_transaction,
+    )
@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+_RATING_OPTIONS = ["Excellent", "Good", "Fair", "Poor"]
+
+# Fields added to synthesized forms when the prompt mentions any of the keywords
+_FIELD_CATALOG: list[tuple[tuple[str, ...], dict[str, Any]]] = [
+    (
+        ("name", "register", "signup", "sign up", "rsvp", "application"),
+        {"type": "text", "label": "Full Name"},
+    ),
+    (
+        ("email", "contact", "newsletter", "register", "signup", "sign up", "rsvp"),
+        {"type": "email", "label": "Email"},
+    ),
+    (
+        ("phone", "call", "contact"),
+        {"type": "text", "label": "Phone Number", "required": False},
+    ),
+    (
+        ("date", "birth", "event", "appointment", "booking", "rsvp"),
+        {"type": "date", "label": "Date"},
+    ),
+    (
+        ("guest", "quantity", "age", "number", "attendees"),
+        {"type": "number", "label": "Number of Guests", "min_value": 1},
+    ),
+    (
+        ("rating", "feedback", "satisfaction", "review", "survey"),
+        {"type": "select", "label": "Overall Rating", "options": _RATING_OPTIONS},
+    ),
+    (
+        ("interest", "topic", "skill", "preference"),
+        {
+            "type": "multi_select",
+            "label": "Interests",
+            "options": ["Technology", "Design", "Business", "Science"],
+        },
+    ),
+    (
+        ("country", "location", "region"),
+        {
+            "type": "dropdown",
+            "label": "Country",
+            "options": ["India", "United States", "United Kingdom", "Germany", "Other"],
+        },
+    ),
+    (
+        ("website", "portfolio", "url", "link", "linkedin"),
+        {"type": "url", "label": "Website", "required": False},
+    ),
+    (
+        ("comment", "feedback", "message", "suggestion", "application", "describe"),
+        {"type": "paragraph", "label": "Comments", "required": False},
+    ),
+]
+
+
+def synthesize_form(prompt: str) -> dict[str, Any]:
+    """Deterministically builds form arguments from keywords in the prompt.
+
+    Args:
+        prompt (str): The user prompt.
+
+    Returns:
+        dict[str, Any]: Arguments for the `FormCreate` tool call.
+    """
+    text = prompt.casefold()
+    fields = [
+        dict(field)
+        for keywords, field in _FIELD_CATALOG
+        if any(keyword in text for keyword in keywords)
+    ]
+    if not fields:
+        fields = [dict(_FIELD_CATALOG[0][1]), dict(_FIELD_CATALOG[1][1])]
+
+    words = re.findall(r"[\w'-]+", prompt)[:8]
+    return {
+        "title": " ".join(words).capitalize()[:100] or "Form",
+        "description": f"Generated offline for: {prompt[:200]}",
+        "fields": fields,
+    }
+
+
+def extract_user_input(prompt: str) -> str:
+    """Returns the user input from the rendered generation prompt, if present."""
+    match = re.search(r"<USER_INPUT>(.*?)</USER_INPUT>", prompt, re.DOTALL)
+    return match.group(1).strip() if match else prompt
+
+
+class FakeFormChatModel(BaseChatModel):
+    """Offline chat model that answers tool calls with synthesized forms.
+
+    Intended for load tests and local development without a provider. Each
+    call waits for a log-normally distributed latency, then returns a tool call
+    built from the prompt (or one of the canned `responses`, in turn).
+    Streaming splits the tool call arguments into small chunks, spread over
+    the same latency.
+
+    Attributes:
+        latency (float): Median latency, in seconds.
+        latency_sigma (float): Shape of the log-normal latency distribution.
+        responses (list[dict[str, Any]]): Canned tool call arguments to return
+            instead of synthesized ones.
+        chunk_size (int): Characters per streamed chunk.
+        seed (int | None): Seed for the latency distribution.
+    """
+
+    latency: float = 1.0
+    latency_sigma: float = 0.5
+    responses: list[dict[str, Any]] = []
+    chunk_size: int = 24
+    seed: int | None = None
+
+    _calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-form"
+
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """Binds tools, the first one is always called."""
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted_tools, tool_choice=tool_choice, **kwargs)
+
+    def _sample_latency(self, key: str) -> float:
+        """Samples a latency, reproducible per prompt when seeded."""
+        if self.seed is None:
+            rng = random
+        else:
+            digest = hashlib.sha256(f"{self.seed}:{key}".encode()).digest()
+            rng = random.Random(digest)
+        return rng.lognormvariate(0, self.latency_sigma) * self.latency
+
+    def _tool_call(self, messages: list[BaseMessage], **kwargs: Any) -> dict:
+        """Builds the tool call answering the last message."""
+        prompt = str(messages[-1].content) if messages else ""
+        tools = kwargs.get("tools") or [{"function": {"name": "FormCreate"}}]
+
+        if self.responses:
+            args = self.responses[self._calls % len(self.responses)]
+        else:
+            args = synthesize_form(extract_user_input(prompt))
+        self._calls += 1
+
+        call_id = f"call_{self._calls}"
+        return {"name": tools[0]["function"]["name"], "args": args, "id": call_id}
+
+    @staticmethod
+    def _result(messages: list[BaseMessage], tool_call: dict) -> ChatResult:
+        """Wraps a tool call in a result, with roughly estimated token usage."""
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        output_tokens = len(json.dumps(tool_call["args"])) // 4
+        message = AIMessage(
+            content="",
+            tool_calls=[tool_call],
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self._result(messages, self._tool_call(messages, **kwargs))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tool_call = self._tool_call(messages, **kwargs)
+        await asyncio.sleep(self._sample_latency(json.dumps(tool_call["args"])))
+        return self._result(messages, tool_call)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tool_call = self._tool_call(messages, **kwargs)
+        arguments = json.dumps(tool_call["args"])
+        pieces = [
+            arguments[i : i + self.chunk_size]
+            for i in range(0, len(arguments), self.chunk_size)
+        ]
+        delay = self._sample_latency(arguments) / len(pieces)
+
+        for index, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            first = index == 0
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": tool_call["name"] if first else None,
+                            "args": piece,
+                            "id": tool_call["id"] if first else None,
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
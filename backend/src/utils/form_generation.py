@@ -1,11 +1,31 @@
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
 from datetime import datetime
+from typing import Any, Literal, NamedTuple
 
+import groq
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langchain_groq import ChatGroq
+from pydantic import TypeAdapter, ValidationError
 
 from src.config import settings
+from src.models.field import FormField
 from src.models.form import FormCreate
+from src.utils.concurrency import AdmissionController, SingleFlight
+from src.utils.fake_llm import FakeFormChatModel
+from src.utils.form_repair import repair_field, repair_form
+from src.utils.form_templates import TemplateIndex, load_templates
+from src.utils.generation_cache import GenerationCache
+from src.utils.llm_cassette import CassetteChatModel
+from src.utils.metrics import METRICS
+from src.utils.resilience import CircuitBreaker, RetryPolicy
+from src.utils.token_budget import TokenBudget
 
 logger = logging.getLogger(__name__)
 
@@ -82,15 +102,209 @@ Notes:
 - Today's date: {today}
 """  # noqa: E501
 
+_FIELD_ADAPTER = TypeAdapter(FormField)
+
+# Event emitted while streaming a generated form
+type FormStreamEvent = (
+    tuple[Literal["title"], str]
+    | tuple[Literal["field"], FormField]
+    | tuple[Literal["form"], FormCreate]
+)
+
+
+def is_transient_error(err: BaseException) -> bool:
+    """Returns whether a provider error is worth retrying.
+
+    Args:
+        err (BaseException): The error raised by an attempt.
+
+    Returns:
+        bool: True for timeouts, connection errors, rate limits and server errors.
+    """
+    if isinstance(err, TimeoutError | groq.APIConnectionError):
+        return True
+    if isinstance(err, groq.APIStatusError):
+        return err.status_code == 429 or err.status_code >= 500
+    return False
+
+
+def create_chat_model() -> BaseChatModel:
+    """Creates the chat model for the configured LLM provider.
+
+    With a cassette configured, outputs of the provider are recorded to it,
+    or replayed from it without calling the provider.
+
+    Returns:
+        BaseChatModel: The chat model.
+    """
+    if settings.LLM_CASSETTE == "replay":
+        return CassetteChatModel(
+            path=settings.LLM_CASSETTE_PATH,
+            replay_latency=settings.LLM_CASSETTE_LATENCY,
+        )
+
+    if settings.LLM_PROVIDER == "fake":
+        llm = FakeFormChatModel(
+            latency=settings.FAKE_LLM_LATENCY,
+            latency_sigma=settings.FAKE_LLM_LATENCY_SIGMA,
+            seed=settings.FAKE_LLM_SEED,
+        )
+    else:
+        # Timeouts and retries are handled by the retry policy
+        llm = ChatGroq(
+            model=settings.GROQ_MODEL,
+            temperature=settings.GROQ_TEMPERATURE,
+            api_key=settings.GROQ_API_KEY,
+            timeout=settings.GENERATION_TIMEOUT,
+            max_retries=0,
+        )
+
+    if settings.LLM_CASSETTE == "record":
+        return CassetteChatModel(
+            path=settings.LLM_CASSETTE_PATH, mode="record", model=llm
+        )
+    return llm
+
+
+class _PartialFormParser:
+    """Tracks a partially streamed form and reports newly completed parts.
+
+    Keys of a partially parsed object keep the order in which they were
+    streamed, so only the last key (or the last item of a list under it) may
+    still be incomplete. Invalid fields are repaired, or dropped when they
+    cannot be, as are fields beyond `MAX_FIELDS`.
+    """
+
+    def __init__(self):
+        self.partial: dict[str, Any] = {}
+        self.title: str | None = None
+        self.fields: list[FormField] = []
+        self.repairs: list[str] = []
+        self._parsed_fields = 0
+
+    def feed(self, partial: dict[str, Any], final: bool = False) -> list:
+        """Updates the parser with the latest partial output.
+
+        Args:
+            partial (dict[str, Any]): Partially parsed form.
+            final (bool, optional): Whether the output is complete.
+                Defaults to False.
+
+        Returns:
+            list[FormStreamEvent]: Events for parts completed by this update.
+        """
+        self.partial = partial
+        last_key = None if final else next(reversed(partial), None)
+        events = []
+
+        if self.title is None and partial.get("title") and last_key != "title":
+            self.title = partial["title"]
+            events.append(("title", self.title))
+
+        raw_fields = partial.get("fields") or []
+        complete = len(raw_fields) - int(last_key == "fields" and bool(raw_fields))
+        while self._parsed_fields < complete:
+            field = self._parse_field(raw_fields[self._parsed_fields])
+            self._parsed_fields += 1
+            if field is not None:
+                self.fields.append(field)
+                events.append(("field", field))
+
+        return events
+
+    def _parse_field(self, raw_field: Any) -> FormField | None:
+        """Validates a completed field, repairing it if needed."""
+        if len(self.fields) >= settings.MAX_FIELDS:
+            self.repairs.append("dropped an extra field")
+            return None
+
+        try:
+            return _FIELD_ADAPTER.validate_python(raw_field)
+        except ValidationError:
+            if (repaired := repair_field(raw_field, self.repairs)) is None:
+                return None
+            return _FIELD_ADAPTER.validate_python(repaired)
+
+    def form(self) -> FormCreate:
+        """Returns the validated form, keeping the already emitted fields."""
+        return FormCreate(
+            title=self.title,
+            description=self.partial.get("description"),
+            fields=self.fields,
+        )
+
+
+class _Generation(NamedTuple):
+    """Outcome of a language model generation, shared by coalesced callers."""
+
+    result: FormCreate | ValueError  # the form, or why it failed to parse
+    tokens: int  # total tokens used, charged to each caller
+
 
 class FormGenerator:
     """Class for generating forms using a language model."""
 
     def __init__(self):
+        self._admission = AdmissionController(
+            name="generation",
+            max_concurrency=settings.GENERATION_MAX_CONCURRENCY,
+            max_queue=settings.GENERATION_MAX_QUEUE,
+            queue_timeout=settings.GENERATION_QUEUE_TIMEOUT,
+            max_per_key=settings.GENERATION_USER_MAX_CONCURRENCY,
+            max_queue_per_key=settings.GENERATION_USER_MAX_QUEUE,
+        )
+        self._budget = TokenBudget(daily_limit=settings.GENERATION_USER_DAILY_TOKENS)
+        self._cache = GenerationCache()
+        self._templates = TemplateIndex(
+            load_templates(), threshold=settings.GENERATION_TEMPLATE_THRESHOLD
+        )
+        self._template_hits = METRICS.counter(
+            "generation_template_hits_total", "Forms served from a template"
+        )
+        self._single_flight = SingleFlight(name="generation")
+        self._breaker = CircuitBreaker(
+            name="generation",
+            failure_threshold=settings.GENERATION_BREAKER_THRESHOLD,
+            reset_timeout=settings.GENERATION_BREAKER_RESET,
+        )
+        self._retry_policy = RetryPolicy(
+            name="generation",
+            timeout=settings.GENERATION_TIMEOUT,
+            max_retries=settings.GENERATION_MAX_RETRIES,
+            backoff=settings.GENERATION_RETRY_BACKOFF,
+            backoff_max=settings.GENERATION_RETRY_BACKOFF_MAX,
+            hedge=settings.GENERATION_HEDGE,
+            hedge_min_samples=settings.GENERATION_HEDGE_MIN_SAMPLES,
+            breaker=self._breaker,
+            retry_on=is_transient_error,
+        )
+        self._first_field_latency = METRICS.histogram(
+            "generation_stream_first_field_seconds", "Time to first streamed field"
+        )
+        self._latency = METRICS.histogram(
+            "generation_latency_seconds", "End-to-end generate_form time"
+        )
+        self._provider_latency = METRICS.histogram(
+            "generation_provider_seconds", "Provider time per generation, with retries"
+        )
+        self._prompt_tokens = METRICS.counter(
+            "generation_prompt_tokens_total", "Prompt tokens used"
+        )
+        self._completion_tokens = METRICS.counter(
+            "generation_completion_tokens_total", "Completion tokens used"
+        )
+        self._tokens = METRICS.histogram(
+            "generation_tokens", "Total tokens per generation"
+        )
+        self._parse_failures = METRICS.counter(
+            "generation_parse_failures_total", "Outputs that failed to parse"
+        )
+        self._repairs = METRICS.counter(
+            "generation_repairs_total", "Invalid outputs repaired locally"
+        )
+
         try:
-            llm = ChatGroq(
-                model=settings.GROQ_MODEL, temperature=settings.GROQ_TEMPERATURE
-            )
+            llm = create_chat_model()
 
             prompt = ChatPromptTemplate.from_messages(
                 [
@@ -99,22 +313,301 @@ class FormGenerator:
                 ]
             )  # pragma: no cover
 
+            # Keeps the raw message for token usage, and parse errors for metrics
             self._chain = prompt | llm.with_structured_output(
-                FormCreate
+                FormCreate, include_raw=True
+            )  # pragma: no cover
+
+            # Emits partially parsed tool call arguments while streaming
+            tool_name = FormCreate.__name__
+            self._stream_chain = (
+                prompt
+                | llm.bind_tools([FormCreate], tool_choice=tool_name)
+                | JsonOutputKeyToolsParser(key_name=tool_name, first_tool_only=True)
             )  # pragma: no cover
         except Exception as err:
             logger.error("Failed to initialize FormGenerator: %s", err)
             raise
 
-    async def generate_form(self, description: str) -> FormCreate:
+    async def generate_form(
+        self, description: str, user_id: str | None = None
+    ) -> FormCreate:
         """Asynchronously generates a form based on the given description.
 
+        Descriptions closely matching a curated template are served from it
+        without calling the language model. Concurrent calls with the same
+        normalized description share a single language model call, and each
+        caller receives its own copy of the form. Each caller is still admitted
+        fairly across users, and charged to their own daily token budget.
+
         Args:
             description (str): The description of the form.
+            user_id (str | None, optional): The user requesting the form.
+                Defaults to None, for no per-user limits.
 
         Returns:
             FormCreate: The generated form.
+
+        Raises:
+            ServiceUnavailableError: If too many generations are in progress, or
+                the provider is unavailable.
+            TooManyRequestsError: If the user has used up their daily tokens.
         """
+        start = time.perf_counter()
         today = str(datetime.now().date())
 
-        return await self._chain.ainvoke({"user_input": description, "today": today})
+        try:
+            cache_key = self._cache.make_key(description, today)
+            if (form := await self._get_ready_form(description, cache_key)) is not None:
+                return form
+
+            await self._check_budget(user_id)
+
+            # Identical prompts in flight share the provider call, while limits
+            # and the budget apply to each caller
+            async with self._admission.admit(user_id):
+                generation = await self._single_flight.do(
+                    cache_key, lambda: self._generate(cache_key, description, today)
+                )
+            if user_id:
+                await self._budget.charge(user_id, generation.tokens)
+
+            if isinstance(generation.result, Exception):
+                raise generation.result
+            return generation.result.model_copy(deep=True)
+        finally:
+            self._latency.observe(time.perf_counter() - start)
+
+    async def generate_forms(
+        self, descriptions: list[str], user_id: str | None = None
+    ) -> list[FormCreate | Exception]:
+        """Asynchronously generates forms for several descriptions.
+
+        Runs `generate_form` for each description as a batch, with at most
+        `GENERATION_BATCH_CONCURRENCY` generations in flight. Each generation
+        still goes through templates, the cache, admission control and retries,
+        and repeated descriptions are generated once.
+
+        Args:
+            descriptions (list[str]): The descriptions of the forms.
+            user_id (str | None, optional): The user requesting the forms.
+                Defaults to None, for no per-user limits.
+
+        Returns:
+            list[FormCreate | Exception]: The generated form, or the error raised
+                while generating it, for each description in order.
+        """
+
+        async def generate_form(description: str) -> FormCreate:
+            return await self.generate_form(description, user_id=user_id)
+
+        return await RunnableLambda(generate_form).abatch(
+            descriptions,
+            config={"max_concurrency": settings.GENERATION_BATCH_CONCURRENCY},
+            return_exceptions=True,
+        )
+
+    def match_template(self, description: str) -> FormCreate | None:
+        """Returns a copy of the template matching the description, if any.
+
+        Args:
+            description (str): The description of the form.
+
+        Returns:
+            FormCreate | None: The template form, with fresh field tags.
+        """
+        if (match := self._templates.match(description)) is None:
+            return None
+
+        self._template_hits.inc()
+        logger.info(
+            'Served form from template "%s" (score: %.2f)',
+            match.template.name,
+            match.score,
+        )
+        return FormCreate.model_validate(
+            match.template.form.model_dump(exclude={"fields": {"__all__": {"tag"}}})
+        )
+
+    async def _check_budget(self, user_id: str | None) -> None:
+        """Checks the daily token budget of the user, if any."""
+        if user_id:
+            await self._budget.check(user_id)
+
+    async def _get_ready_form(
+        self, description: str, cache_key: str
+    ) -> FormCreate | None:
+        """Returns a form from a matching template or the cache, if available."""
+        if (form := self.match_template(description)) is not None:
+            return form
+
+        if (form := await self._cache.get(cache_key)) is not None:
+            logger.info("Served generated form from cache")
+        return form
+
+    async def _generate(
+        self, cache_key: str, description: str, today: str
+    ) -> _Generation:
+        """Generates a form with the language model and caches it.
+
+        Records token usage, provider latency, attempts and parse failures as
+        metrics and log fields. Outputs that fail validation are repaired
+        locally when possible, rather than failing the request. Parse failures
+        are returned rather than raised, so the tokens used are still charged.
+        """
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            return self._chain.ainvoke({"user_input": description, "today": today})
+
+        start = time.perf_counter()
+        output = await self._retry_policy.call(attempt)
+        provider_seconds = time.perf_counter() - start
+
+        usage = output["raw"].usage_metadata or {}
+        stats = {
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+            "provider_seconds": round(provider_seconds, 3),
+            "attempts": attempts,
+        }
+        self._provider_latency.observe(provider_seconds)
+        self._prompt_tokens.inc(stats["prompt_tokens"])
+        self._completion_tokens.inc(stats["completion_tokens"])
+        tokens = stats["prompt_tokens"] + stats["completion_tokens"]
+        self._tokens.observe(tokens)
+
+        form, error = output["parsed"], output["parsing_error"]
+        if error is not None or form is None:
+            try:
+                form = self._repair(output["raw"], error, stats)
+            except ValueError as err:
+                return _Generation(err, tokens)
+
+        logger.info(
+            "Generated form in %.2fs (attempts: %d, tokens: %d prompt, %d completion)",
+            provider_seconds,
+            attempts,
+            stats["prompt_tokens"],
+            stats["completion_tokens"],
+            extra=stats,
+        )
+
+        await self._cache.set(cache_key, form)
+        return _Generation(form, tokens)
+
+    def _repair(
+        self, message: AIMessage, error: Exception | None, stats: dict[str, Any]
+    ) -> FormCreate:
+        """Repairs the generated form arguments, which failed to validate.
+
+        Raises:
+            ValueError: If the output has no arguments, or cannot be repaired.
+        """
+        try:
+            repaired = repair_form(message.tool_calls[0]["args"])
+        except (IndexError, ValidationError) as err:
+            self._parse_failures.inc()
+            logger.warning("Failed to parse generated form: %s", error, extra=stats)
+            raise ValueError("Failed to parse generated form.") from (error or err)
+
+        self._repairs.inc()
+        logger.warning(
+            "Repaired generated form: %s",
+            "; ".join(repaired.repairs),
+            extra=stats | {"repairs": repaired.repairs},
+        )
+        return repaired.form
+
+    async def stream_form(
+        self, description: str, user_id: str | None = None
+    ) -> AsyncIterator[FormStreamEvent]:
+        """Asynchronously generates a form, yielding parts as soon as they are parsed.
+
+        Yields the title and each field once they are complete in the partially
+        streamed structured output, followed by the validated form.
+
+        Args:
+            description (str): The description of the form.
+            user_id (str | None, optional): The user requesting the form.
+                Defaults to None, for no per-user limits.
+
+        Yields:
+            FormStreamEvent: `("title", str)`, then `("field", FormField)` per field,
+                then `("form", FormCreate)`.
+
+        Raises:
+            ServiceUnavailableError: If too many generations are in progress, or
+                the provider is unavailable.
+            TooManyRequestsError: If the user has used up their daily tokens.
+            ValidationError: If the generated form is invalid.
+        """
+        today = str(datetime.now().date())
+        cache_key = self._cache.make_key(description, today)
+
+        if (form := await self._get_ready_form(description, cache_key)) is not None:
+            yield "title", form.title
+            for field in form.fields:
+                yield "field", field
+            yield "form", form
+            return
+
+        await self._check_budget(user_id)
+
+        parser = _PartialFormParser()
+
+        # Partial output cannot be retried, but an unhealthy provider fails fast
+        self._breaker.check()
+        async with self._admission.admit(user_id):
+            start = time.perf_counter()
+            try:
+                async for partial in self._stream_chain.astream(
+                    {"user_input": description, "today": today}
+                ):
+                    if not isinstance(partial, dict) or not partial:
+                        continue
+
+                    for event in parser.feed(partial):
+                        if event[0] == "field" and event[1] is parser.fields[0]:
+                            latency = time.perf_counter() - start
+                            self._first_field_latency.observe(latency)
+                        yield event
+            except Exception as err:
+                if is_transient_error(err):
+                    self._breaker.record_failure()
+                raise
+            self._breaker.record_success()
+
+        # The stream has ended, so every remaining part is complete
+        for event in parser.feed(parser.partial, final=True):
+            yield event
+
+        yield (
+            "form",
+            await self._complete_stream(parser, cache_key, description, user_id),
+        )
+
+    async def _complete_stream(
+        self,
+        parser: _PartialFormParser,
+        cache_key: str,
+        description: str,
+        user_id: str | None,
+    ) -> FormCreate:
+        """Builds the streamed form, recording repairs and usage, and caches it."""
+        if user_id:
+            # Streamed chunks carry no usage, so it is estimated from the text
+            text = "".join(
+                [_SYSTEM_PROMPT, _USER_PROMPT, description, json.dumps(parser.partial)]
+            )
+            await self._budget.charge(user_id, len(text) // 4)
+
+        if parser.repairs:
+            self._repairs.inc()
+            logger.warning("Repaired streamed form: %s", "; ".join(parser.repairs))
+
+        form = parser.form()
+        await self._cache.set(cache_key, form)
+        return form
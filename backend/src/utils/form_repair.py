@@ -0,0 +1,189 @@
+import copy
+from typing import Any, NamedTuple
+
+from src.config import settings
+from src.models.field import FieldType, ParagraphField, TextField
+from src.models.form import FormCreate
+
+_SELECTION_TYPES = {FieldType.SELECT, FieldType.DROPDOWN, FieldType.MULTI_SELECT}
+_TEXT_MODELS = {FieldType.TEXT: TextField, FieldType.PARAGRAPH: ParagraphField}
+
+# Maximum lengths of the string constraints in `src.utils.custom_types`
+_TITLE_MAX_LENGTH = 100
+_DESCRIPTION_MAX_LENGTH = 300
+_HELP_TEXT_MAX_LENGTH = 200
+
+# Constraints that must be positive integers, per field type
+_POSITIVE_CONSTRAINTS = {
+    FieldType.TEXT: ("min_length", "max_length"),
+    FieldType.PARAGRAPH: ("min_length", "max_length"),
+    FieldType.NUMBER: ("precision",),
+}
+
+# Inclusive ranges that must not be inverted, per field type
+_RANGES = {
+    FieldType.TEXT: ("min_length", "max_length"),
+    FieldType.PARAGRAPH: ("min_length", "max_length"),
+    FieldType.NUMBER: ("min_value", "max_value"),
+    FieldType.DATE: ("min_date", "max_date"),
+}
+
+
+class RepairedForm(NamedTuple):
+    """Form repaired from invalid generated arguments."""
+
+    form: FormCreate
+    repairs: list[str]  # human-readable description of each change
+
+
+def _clean_text(value: Any, max_length: int) -> str | None:
+    """Strips and truncates a string, returning None for blank or non-strings."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip()[:max_length].rstrip()
+
+
+def _repair_options(field: dict[str, Any], repairs: list[str]) -> bool:
+    """Removes blank and duplicate options, returning False if none are left."""
+    raw_options = field.get("options")
+    options = list(
+        dict.fromkeys(
+            option.strip()
+            for option in raw_options or []
+            if isinstance(option, str) and option.strip()
+        )
+    )
+    if not options:
+        repairs.append(f'dropped "{field["label"]}" without options')
+        return False
+    if options != raw_options:
+        repairs.append(f'removed empty or duplicate options of "{field["label"]}"')
+    field["options"] = options
+    return True
+
+
+def _repair_constraints(
+    field: dict[str, Any], field_type: FieldType, repairs: list[str]
+) -> None:
+    """Resets invalid positive constraints, and fixes inverted ranges."""
+    label = field["label"]
+    for key in _POSITIVE_CONSTRAINTS.get(field_type, ()):
+        value = field.get(key)
+        if value is not None and (not isinstance(value, int | float) or value < 1):
+            repairs.append(f'reset the invalid {key} of "{label}"')
+            del field[key]
+
+    # A minimum length above the default maximum is inverted too
+    if field_type in _TEXT_MODELS and field.get("max_length") is None:
+        default_max = _TEXT_MODELS[field_type].model_fields["max_length"].default
+        if field.get("min_length", 1) > default_max:
+            repairs.append(f'raised the max_length of "{label}" to its min_length')
+            field["max_length"] = field["min_length"]
+
+    if field_type in _RANGES:
+        low, high = _RANGES[field_type]
+        try:
+            inverted = field.get(low) is not None and field[low] > field.get(high)
+        except TypeError:  # missing, or values of different types
+            inverted = False
+        if inverted:
+            repairs.append(f'swapped the inverted {low} and {high} of "{label}"')
+            field[low], field[high] = field[high], field[low]
+
+
+def repair_field(field: Any, repairs: list[str]) -> dict[str, Any] | None:
+    """Repairs common constraint violations in generated field arguments.
+
+    Args:
+        field (Any): Generated field arguments.
+        repairs (list[str]): Repairs made so far, appended to.
+
+    Returns:
+        dict[str, Any] | None: The repaired arguments, or None if the field
+            should be dropped.
+    """
+    if not isinstance(field, dict):
+        repairs.append("dropped a malformed field")
+        return None
+
+    field = copy.deepcopy(field)
+    label = _clean_text(field.get("label"), _TITLE_MAX_LENGTH)
+    if label is None:
+        repairs.append("dropped a field without a label")
+        return None
+    if label != field["label"].strip():
+        repairs.append(f'truncated the label of "{label}"')
+    field["label"] = label
+
+    # Models often write types the way the prompt does, e.g. "multi-select"
+    raw_type = str(field.get("type", "")).strip().lower().replace("-", "_")
+    if raw_type not in FieldType:
+        repairs.append(f'dropped "{label}" with unknown type "{field.get("type")}"')
+        return None
+    if raw_type != field["type"]:
+        repairs.append(f'renamed the type of "{label}" to "{raw_type}"')
+    field_type = field["type"] = FieldType(raw_type)
+
+    if field.get("help_text") is not None:
+        help_text = _clean_text(field["help_text"], _HELP_TEXT_MAX_LENGTH)
+        if help_text != str(field["help_text"]).strip():
+            repairs.append(f'cleaned the help text of "{label}"')
+        field["help_text"] = help_text
+
+    if field_type in _SELECTION_TYPES and not _repair_options(field, repairs):
+        return None
+
+    _repair_constraints(field, field_type, repairs)
+    return field
+
+
+def repair_form(args: dict[str, Any]) -> RepairedForm:
+    """Repairs common constraint violations in generated form arguments.
+
+    Repairs are deterministic, and only relax what the model got wrong:
+    strings are trimmed to their maximum length, inverted ranges swapped,
+    lengths clamped to valid values, empty or duplicate options
+    removed, fields that cannot be fixed (no label, unknown type or no
+    options) dropped, and extra fields truncated to `MAX_FIELDS`.
+
+    Args:
+        args (dict[str, Any]): Generated form arguments.
+
+    Returns:
+        RepairedForm: The validated form, and the repairs made.
+
+    Raises:
+        ValidationError: If the form is still invalid, e.g. it has no title.
+    """
+    repairs: list[str] = []
+
+    title = _clean_text(args.get("title"), _TITLE_MAX_LENGTH)
+    if title is not None and title != args["title"].strip():
+        repairs.append("truncated the title")
+
+    description = _clean_text(args.get("description"), _DESCRIPTION_MAX_LENGTH)
+    if (
+        args.get("description") is not None
+        and description != str(args["description"]).strip()
+    ):
+        repairs.append("cleaned the description")
+
+    raw_fields = args.get("fields")
+    if not isinstance(raw_fields, list):
+        raw_fields = []
+        if args.get("fields") is not None:
+            repairs.append("dropped malformed fields")
+
+    fields = [
+        field
+        for raw_field in raw_fields
+        if (field := repair_field(raw_field, repairs)) is not None
+    ]
+    if len(fields) > settings.MAX_FIELDS:
+        repairs.append(f"dropped {len(fields) - settings.MAX_FIELDS} extra fields")
+        fields = fields[: settings.MAX_FIELDS]
+
+    form = FormCreate.model_validate(
+        {"title": title, "description": description, "fields": fields}
+    )
+    return RepairedForm(form, repairs)
@@ -0,0 +1,330 @@
+import math
+from collections import Counter
+from typing import Any, NamedTuple
+
+from src.config import settings
+from src.models.form import FormCreate
+from src.utils.generation_cache import normalize_prompt
+
+_RATING_OPTIONS = ["Excellent", "Good", "Fair", "Poor"]
+
+# Curated templates for common requests, with example prompts used for matching
+_TEMPLATES: list[dict[str, Any]] = [
+    {
+        "name": "customer_feedback",
+        "examples": [
+            "customer feedback form",
+            "create a feedback form for my customers",
+            "collect customer feedback about our service",
+            "feedback form for my restaurant",
+            "product feedback form",
+        ],
+        "form": {
+            "title": "Customer Feedback",
+            "description": "We value your feedback. Let us know how we did.",
+            "fields": [
+                {"type": "text", "label": "Name", "required": False},
+                {"type": "email", "label": "Email", "required": False},
+                {
+                    "type": "select",
+                    "label": "Overall Experience",
+                    "options": _RATING_OPTIONS,
+                },
+                {
+                    "type": "select",
+                    "label": "Would You Recommend Us?",
+                    "options": ["Yes", "No", "Maybe"],
+                },
+                {
+                    "type": "paragraph",
+                    "label": "Comments",
+                    "help_text": "What did you like, and what could we improve?",
+                    "required": False,
+                },
+            ],
+        },
+    },
+    {
+        "name": "event_rsvp",
+        "examples": [
+            "event rsvp form",
+            "rsvp form for my party",
+            "create an rsvp form for a wedding",
+            "rsvp for our event",
+            "guest rsvp form for a birthday party",
+        ],
+        "form": {
+            "title": "Event RSVP",
+            "description": "Please let us know if you can make it.",
+            "fields": [
+                {"type": "text", "label": "Full Name"},
+                {"type": "email", "label": "Email"},
+                {
+                    "type": "select",
+                    "label": "Will You Attend?",
+                    "options": ["Yes", "No", "Maybe"],
+                },
+                {
+                    "type": "number",
+                    "label": "Number of Guests",
+                    "min_value": 0,
+                    "max_value": 10,
+                    "precision": 1,
+                },
+                {
+                    "type": "paragraph",
+                    "label": "Dietary Requirements",
+                    "required": False,
+                },
+            ],
+        },
+    },
+    {
+        "name": "job_application",
+        "examples": [
+            "job application form",
+            "create a job application form for hiring",
+            "application form for a job opening",
+            "form to collect job applications from candidates",
+            "employment application form",
+        ],
+        "form": {
+            "title": "Job Application",
+            "description": "Apply for a position with our team.",
+            "fields": [
+                {"type": "text", "label": "Full Name"},
+                {"type": "email", "label": "Email"},
+                {"type": "text", "label": "Phone Number"},
+                {"type": "text", "label": "Position Applied For"},
+                {"type": "url", "label": "Resume Link"},
+                {"type": "url", "label": "LinkedIn Profile", "required": False},
+                {
+                    "type": "number",
+                    "label": "Years of Experience",
+                    "min_value": 0,
+                    "precision": 1,
+                },
+                {"type": "date", "label": "Available Start Date"},
+                {
+                    "type": "paragraph",
+                    "label": "Cover Letter",
+                    "max_length": 2000,
+                    "required": False,
+                },
+            ],
+        },
+    },
+    {
+        "name": "contact",
+        "examples": [
+            "contact form",
+            "contact us form for my website",
+            "create a simple contact form",
+            "get in touch form",
+            "contact form for customer inquiries",
+        ],
+        "form": {
+            "title": "Contact Us",
+            "description": "Send us a message and we will get back to you.",
+            "fields": [
+                {"type": "text", "label": "Name"},
+                {"type": "email", "label": "Email"},
+                {"type": "text", "label": "Subject", "max_length": 100},
+                {"type": "paragraph", "label": "Message"},
+            ],
+        },
+    },
+    {
+        "name": "newsletter_signup",
+        "examples": [
+            "newsletter signup form",
+            "newsletter subscription form",
+            "sign up form for our newsletter",
+            "create a form for people to subscribe to our mailing list",
+        ],
+        "form": {
+            "title": "Newsletter Signup",
+            "description": "Subscribe to receive our latest updates.",
+            "fields": [
+                {"type": "text", "label": "First Name", "required": False},
+                {"type": "email", "label": "Email"},
+                {
+                    "type": "multi_select",
+                    "label": "Topics of Interest",
+                    "options": ["Product Updates", "Events", "Tips", "Offers"],
+                    "required": False,
+                },
+            ],
+        },
+    },
+    {
+        "name": "event_registration",
+        "examples": [
+            "event registration form",
+            "workshop registration form",
+            "registration form for a conference",
+            "sign up form for a webinar",
+            "create a registration form for our meetup",
+        ],
+        "form": {
+            "title": "Event Registration",
+            "description": "Register to reserve your spot.",
+            "fields": [
+                {"type": "text", "label": "Full Name"},
+                {"type": "email", "label": "Email"},
+                {"type": "text", "label": "Organization", "required": False},
+                {
+                    "type": "select",
+                    "label": "Ticket Type",
+                    "options": ["General", "Student", "VIP"],
+                },
+                {
+                    "type": "paragraph",
+                    "label": "Accessibility Needs",
+                    "required": False,
+                },
+            ],
+        },
+    },
+]
+
+
+class FormTemplate(NamedTuple):
+    """Curated form definition for a common request."""
+
+    name: str
+    examples: list[str]
+    form: FormCreate
+
+
+class TemplateMatch(NamedTuple):
+    """Best matching template for a prompt."""
+
+    template: FormTemplate
+    score: float  # cosine similarity in [0, 1]
+
+
+def char_ngrams(text: str, n: int = 3) -> Counter[str]:
+    """Counts the character n-grams of normalized text, padded at word boundaries.
+
+    Args:
+        text (str): Text to split.
+        n (int, optional): N-gram length. Defaults to 3.
+
+    Returns:
+        Counter[str]: N-gram counts.
+    """
+    padded = f" {normalize_prompt(text)} "
+    return Counter(padded[i : i + n] for i in range(len(padded) - n + 1))
+
+
+class TemplateIndex:
+    """TF-IDF index of character n-grams over the template example prompts.
+
+    Each example is an L2-normalized sparse vector, and a prompt is scored
+    against a template by its best cosine similarity with the template's
+    examples. N-grams shared by most examples (e.g. "form") weigh little.
+
+    Attributes:
+        templates (list[FormTemplate]): Indexed templates.
+        threshold (float): Minimum score for a match.
+    """
+
+    def __init__(
+        self,
+        templates: list[FormTemplate],
+        threshold: float = settings.GENERATION_TEMPLATE_THRESHOLD,
+    ):
+        self.templates = templates
+        self.threshold = threshold
+
+        documents = [
+            (template, char_ngrams(example))
+            for template in templates
+            for example in template.examples
+        ]
+        document_frequency = Counter(
+            ngram for _, counts in documents for ngram in counts
+        )
+        self._idf = {
+            ngram: math.log((1 + len(documents)) / (1 + frequency)) + 1
+            for ngram, frequency in document_frequency.items()
+        }
+        self._vectors = [
+            (template, self._vectorize(counts)) for template, counts in documents
+        ]
+
+    def _vectorize(self, counts: Counter[str]) -> dict[str, float]:
+        """Builds an L2-normalized TF-IDF vector, ignoring unknown n-grams."""
+        vector = {
+            ngram: count * self._idf[ngram]
+            for ngram, count in counts.items()
+            if ngram in self._idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return (
+            {ngram: weight / norm for ngram, weight in vector.items()} if norm else {}
+        )
+
+    def score(self, prompt: str) -> TemplateMatch | None:
+        """Returns the most similar template, regardless of the threshold.
+
+        Args:
+            prompt (str): The user prompt.
+
+        Returns:
+            TemplateMatch | None: The best match, if any n-gram is shared.
+        """
+        counts = char_ngrams(prompt)
+        # Unknown n-grams still count towards the prompt norm, so prompts with
+        # many details not covered by a template score lower
+        norm = math.sqrt(
+            sum(
+                (count * self._idf.get(ngram, 1)) ** 2
+                for ngram, count in counts.items()
+            )
+        )
+        if not norm:
+            return None
+
+        best = None
+        for template, vector in self._vectors:
+            score = (
+                sum(
+                    count * self._idf[ngram] * vector[ngram]
+                    for ngram, count in counts.items()
+                    if ngram in vector
+                )
+                / norm
+            )
+            if best is None or score > best.score:
+                best = TemplateMatch(template, score)
+        return best
+
+    def match(self, prompt: str) -> TemplateMatch | None:
+        """Returns the most similar template, if it scores above the threshold.
+
+        Args:
+            prompt (str): The user prompt.
+
+        Returns:
+            TemplateMatch | None: The match, if any.
+        """
+        best = self.score(prompt)
+        return best if best and best.score >= self.threshold else None
+
+
+def load_templates() -> list[FormTemplate]:
+    """Returns the curated form templates.
+
+    Returns:
+        list[FormTemplate]: The templates.
+    """
+    return [
+        FormTemplate(
+            name=template["name"],
+            examples=template["examples"],
+            form=FormCreate.model_validate(template["form"]),
+        )
+        for template in _TEMPLATES
+    ]
@@ -0,0 +1,105 @@
+import logging
+
+from beanie.odm.operators.update.general import Inc, Set
+
+from src.config import settings
+from src.exceptions import BadRequestError
+from src.models.form import Form, FormCreate
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def validate_form_creation_limit(user: User):
+    """Validate user's form creation limit.
+
+    This is a cheap early check on the loaded forms, the limit is enforced
+    atomically by `reserve_forms`.
+
+    Args:
+        user (User): The user to validate.
+
+    Raises:
+        BadRequestError: If the user has reached the maximum number of forms.
+    """
+    forms_count = len(user.forms)
+    if forms_count >= settings.MAX_FORMS:
+        raise BadRequestError(
+            f"Maximum number of forms ({settings.MAX_FORMS}) reached."
+        )
+
+
+async def reserve_forms(user: User, count: int = 1):
+    """Atomically reserves quota for new forms of a user.
+
+    The user's form count is only incremented if it stays within `MAX_FORMS`,
+    so concurrent requests cannot exceed the limit. Users without a form count
+    get one from their existing forms first.
+
+    Args:
+        user (User): The user who will own the forms.
+        count (int, optional): Number of forms. Defaults to 1.
+
+    Raises:
+        BadRequestError: If the forms would exceed the maximum number of forms.
+    """
+    for backfilled in (False, True):
+        result = await User.find_one(
+            User.id == user.id, User.form_count <= settings.MAX_FORMS - count
+        ).update(Inc({User.form_count: count}))
+        if result.modified_count or backfilled:
+            break
+
+        forms_count = await Form.find(Form.creator.id == user.id).count()
+        await User.find_one({"_id": user.id, "form_count": None}).update(
+            Set({User.form_count: forms_count})
+        )
+
+    if not result.modified_count:
+        raise BadRequestError(
+            f"Maximum number of forms ({settings.MAX_FORMS}) reached."
+        )
+
+
+async def release_forms(user: User, count: int = 1):
+    """Releases form quota, after a form was deleted or failed to be created.
+
+    Args:
+        user (User): The user who owned the forms.
+        count (int, optional): Number of forms. Defaults to 1.
+    """
+    await User.find_one(User.id == user.id, User.form_count >= count).update(
+        Inc({User.form_count: -count})
+    )
+
+
+async def create_form_for_user(
+    form: FormCreate, user: User, form_id: str | None = None
+) -> Form:
+    """Creates a new form for a given user, within their form limit.
+
+    Args:
+        form (FormCreate): The form data to create.
+        user (User): The user who owns the form.
+        form_id (str | None, optional): Id for the new form. Defaults to None,
+            which generates one.
+
+    Returns:
+        Form: The newly created form.
+
+    Raises:
+        BadRequestError: If the user has reached the maximum number of forms.
+    """
+    new_form = Form(**form.model_dump(), creator=user)
+    if form_id:
+        new_form.id = form_id
+
+    await reserve_forms(user)
+    try:
+        await new_form.create()
+    except Exception:
+        await release_forms(user)
+        raise
+
+    logger.info('Created Form: "%s" for User: %s', new_form.id, user)
+    return new_form
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+
+from pymongo.errors import PyMongoError
+
+from src.config import settings
+from src.models.form import FormCreate
+from src.models.generation import GenerationCacheEntry
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalizes a prompt so trivially different variants share a cache entry.
+
+    Applies Unicode NFKC normalization, case folding and whitespace collapsing,
+    and strips trailing punctuation.
+
+    Args:
+        prompt (str): The user prompt.
+
+    Returns:
+        str: The normalized prompt.
+    """
+    prompt = unicodedata.normalize("NFKC", prompt).casefold()
+    return _WHITESPACE.sub(" ", prompt).strip().rstrip(".!?")
+
+
+def model_signature() -> str:
+    """Identifies the configured model, so its forms are not served for another.
+
+    Replayed forms are identified by their cassette, and recording is kept
+    apart, so that cache hits do not leave prompts unrecorded.
+
+    Returns:
+        str: The provider, model name and settings affecting generated forms.
+    """
+    if settings.LLM_CASSETTE == "replay":
+        return f"cassette:{settings.LLM_CASSETTE_PATH}"
+
+    if settings.LLM_PROVIDER == "fake":
+        signature = "fake"
+    else:
+        signature = (
+            f"{settings.LLM_PROVIDER}:{settings.GROQ_MODEL}:{settings.GROQ_TEMPERATURE}"
+        )
+
+    if settings.LLM_CASSETTE == "record":
+        signature += ":record"
+    return signature
+
+
+class GenerationCache:
+    """Cache of generated forms keyed by prompt, model settings and date.
+
+    Entries live in an in-memory LRU and can optionally be persisted to MongoDB
+    with a TTL index, so they are shared across workers and survive restarts.
+    Cached forms are copied on the way in and out, so callers may modify them.
+
+    Attributes:
+        max_size (int): Maximum number of in-memory entries.
+        ttl (int): Entry lifetime in seconds.
+        persist (bool): Whether to persist entries to MongoDB.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.GENERATION_CACHE_SIZE,
+        ttl: int = settings.GENERATION_CACHE_TTL,
+        persist: bool = settings.GENERATION_CACHE_PERSIST,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persist = persist
+
+        self._entries: OrderedDict[str, tuple[float, FormCreate]] = OrderedDict()
+        self._hits = METRICS.counter("generation_cache_hits_total", "Cache hits")
+        self._misses = METRICS.counter("generation_cache_misses_total", "Cache misses")
+
+    @staticmethod
+    def make_key(prompt: str, today: str) -> str:
+        """Builds the cache key for a prompt.
+
+        Args:
+            prompt (str): The user prompt.
+            today (str): Date the prompt is rendered with, as it affects output.
+
+        Returns:
+            str: The cache key.
+        """
+        parts = [normalize_prompt(prompt), model_signature(), today]
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    async def get(self, key: str) -> FormCreate | None:
+        """Returns a copy of the cached form for the key, if any.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            FormCreate | None: The cached form, or None on a miss.
+        """
+        form = self._get_local(key)
+
+        if form is None and self.persist:
+            try:
+                entry = await GenerationCacheEntry.get(key)
+            except PyMongoError as err:
+                logger.warning("Generation cache lookup failed: %s", err)
+                entry = None
+
+            if entry and entry.expires_at.replace(tzinfo=UTC) > datetime.now(UTC):
+                form = entry.form
+                self._set_local(key, form)
+
+        if form is None:
+            self._misses.inc()
+            return None
+
+        self._hits.inc()
+        return form.model_copy(deep=True)
+
+    async def set(self, key: str, form: FormCreate) -> None:
+        """Caches a copy of the form under the key.
+
+        Args:
+            key (str): The cache key.
+            form (FormCreate): The generated form.
+        """
+        form = form.model_copy(deep=True)
+        self._set_local(key, form)
+
+        if self.persist:
+            entry = GenerationCacheEntry(
+                id=key,
+                form=form,
+                expires_at=datetime.now(UTC) + timedelta(seconds=self.ttl),
+            )
+            try:
+                await entry.save()
+            except PyMongoError as err:
+                logger.warning("Generation cache write failed: %s", err)
+
+    def _get_local(self, key: str) -> FormCreate | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        expires_at, form = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return form
+
+    def _set_local(self, key: str, form: FormCreate) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, form)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from beanie.odm.operators.update.general import Inc, Set
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from src.config import settings
+from src.exceptions import FormwiseError, ServiceUnavailableError
+from src.models.form import Form
+from src.models.generation import GenerationJob, GenerationJobStatus
+from src.models.user import User
+from src.utils.forms import create_form_for_user, validate_form_creation_limit
+from src.utils.metrics import METRICS
+
+if TYPE_CHECKING:
+    from src.utils.form_generation import FormGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationWorkerPool:
+    """Pool of workers running persisted form generation jobs.
+
+    Workers claim the oldest pending job with an atomic `find_one_and_update`,
+    which also takes a lease on it. Jobs whose lease expired (e.g. the worker
+    was restarted) are claimed again, up to `max_attempts` times. Workers poll
+    for jobs every `poll_interval` seconds, or sooner when notified.
+
+    Attributes:
+        get_form_generator (Callable[[], FormGenerator]): Returns the generator
+            used to run the jobs, so it is only created once a job is run.
+        workers (int): Number of concurrent workers.
+        poll_interval (float): Time between polls when idle, in seconds.
+        lease (float): Time a claimed job is reserved for a worker, in seconds.
+        max_attempts (int): Maximum number of times a job is claimed.
+    """
+
+    def __init__(
+        self,
+        get_form_generator: Callable[[], "FormGenerator"],
+        workers: int = settings.GENERATION_WORKERS,
+        poll_interval: float = settings.GENERATION_JOB_POLL_INTERVAL,
+        lease: float = settings.GENERATION_JOB_LEASE,
+        max_attempts: int = settings.GENERATION_JOB_MAX_ATTEMPTS,
+    ):
+        self.get_form_generator = get_form_generator
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._completed = METRICS.counter(
+            "generation_jobs_completed_total", "Generation jobs that succeeded"
+        )
+        self._failed = METRICS.counter(
+            "generation_jobs_failed_total", "Generation jobs that failed"
+        )
+
+    def start(self) -> None:
+        """Starts the workers in the background."""
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"generation-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info("Started %d generation workers", self.workers)
+
+    async def stop(self) -> None:
+        """Stops the workers, leaving claimed jobs to be reclaimed later."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wakes up idle workers, e.g. after a job was enqueued."""
+        self._wakeup.set()
+
+    async def claim(self) -> GenerationJob | None:
+        """Claims the oldest runnable job.
+
+        Returns:
+            GenerationJob | None: The claimed job, if any.
+        """
+        now = datetime.now(tz=UTC)
+        raw_job = await GenerationJob.get_motor_collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": GenerationJobStatus.PENDING},
+                    {
+                        "status": GenerationJobStatus.RUNNING,
+                        "lease_expires_at": {"$lt": now},
+                    },
+                ]
+            },
+            {
+                "$set": {
+                    "status": GenerationJobStatus.RUNNING,
+                    "lease_expires_at": now + timedelta(seconds=self.lease),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return GenerationJob.model_validate(raw_job) if raw_job else None
+
+    async def run_once(self) -> bool:
+        """Claims and processes a single job.
+
+        Returns:
+            bool: Whether a job was processed.
+        """
+        job = await self.claim()
+        if job is None:
+            return False
+
+        await self.process(job)
+        return True
+
+    async def process(self, job: GenerationJob) -> None:
+        """Generates and creates the form for a claimed job.
+
+        Args:
+            job (GenerationJob): The claimed job.
+        """
+        # An earlier attempt may have created the form before being interrupted
+        if job.attempts > 1 and await Form.get(job.form_id):
+            return await self._finish(job, GenerationJobStatus.SUCCEEDED)
+
+        if job.attempts > self.max_attempts:
+            return await self._finish(
+                job, GenerationJobStatus.FAILED, "Failed to generate form."
+            )
+
+        user = await User.get(job.user_id, fetch_links=True)
+        if not user:
+            return await self._finish(
+                job, GenerationJobStatus.FAILED, "User not found."
+            )
+
+        try:
+            validate_form_creation_limit(user)
+            form = await self.get_form_generator().generate_form(
+                job.prompt, user_id=job.user_id
+            )
+        except ServiceUnavailableError:
+            # Overloaded or unhealthy provider, leave the job for a later attempt
+            logger.warning("Generation job %s postponed", job.id)
+            return await self._release(job)
+        except FormwiseError as err:
+            return await self._finish(job, GenerationJobStatus.FAILED, err.message)
+        except Exception as err:
+            logger.error("Generation job %s failed: %s", job.id, err)
+            return await self._finish(
+                job,
+                GenerationJobStatus.FAILED,
+                "Failed to generate form. Please try again.",
+            )
+
+        if job.title:
+            form.title = job.title
+
+        try:
+            await create_form_for_user(form, user, form_id=job.form_id)
+        except DuplicateKeyError:
+            logger.info("Form %s already created for job %s", job.form_id, job.id)
+        except FormwiseError as err:
+            # The form limit was reached while generating
+            return await self._finish(job, GenerationJobStatus.FAILED, err.message)
+
+        await self._finish(job, GenerationJobStatus.SUCCEEDED)
+
+    async def _finish(
+        self, job: GenerationJob, status: GenerationJobStatus, error: str | None = None
+    ) -> None:
+        """Records the outcome of a job, unless it was claimed by another worker."""
+        now = datetime.now(tz=UTC)
+        await GenerationJob.find_one(
+            GenerationJob.id == job.id, GenerationJob.attempts == job.attempts
+        ).update(
+            Set(
+                {
+                    GenerationJob.status: status,
+                    GenerationJob.error: error,
+                    GenerationJob.lease_expires_at: None,
+                    GenerationJob.finished_at: now,
+                    GenerationJob.expires_at: now
+                    + timedelta(seconds=settings.GENERATION_JOB_TTL),
+                }
+            )
+        )
+
+        if status == GenerationJobStatus.SUCCEEDED:
+            self._completed.inc()
+        else:
+            self._failed.inc()
+        logger.info("Generation job %s %s", job.id, status)
+
+    async def _release(self, job: GenerationJob) -> None:
+        """Returns a job to the queue without counting the attempt, then backs off."""
+        await GenerationJob.find_one(
+            GenerationJob.id == job.id, GenerationJob.attempts == job.attempts
+        ).update(
+            Set(
+                {
+                    GenerationJob.status: GenerationJobStatus.PENDING,
+                    GenerationJob.lease_expires_at: None,
+                }
+            ),
+            Inc({GenerationJob.attempts: -1}),
+        )
+        await asyncio.sleep(self.poll_interval)
+
+    async def _run(self) -> None:
+        """Processes jobs until cancelled."""
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as err:
+                logger.error("Generation worker failed: %s", err)
+
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            self._wakeup.clear()
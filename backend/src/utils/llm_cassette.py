@@ -0,0 +1,245 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Literal, Self
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import model_validator
+
+from src.utils.fake_llm import extract_user_input
+from src.utils.generation_cache import normalize_prompt
+
+
+class CassetteMissError(LookupError):
+    """Raised when replaying a prompt that was not recorded."""
+
+
+def load_cassette(path: str | Path) -> dict[str, dict[str, Any]]:
+    """Loads recorded outputs by normalized prompt, the last recording wins.
+
+    Args:
+        path (str | Path): Cassette file, in JSON Lines.
+
+    Returns:
+        dict[str, dict[str, Any]]: Recorded entries, empty if the file is missing.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+
+    entries = {}
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                entries[normalize_prompt(entry["prompt"])] = entry
+    return entries
+
+
+def _user_input(messages: list[BaseMessage]) -> str:
+    """Returns the user input of the rendered generation prompt."""
+    return extract_user_input(str(messages[-1].content)) if messages else ""
+
+
+def _chunks(message: AIMessage, chunk_size: int) -> Iterator[AIMessageChunk]:
+    """Splits a message into stream chunks, tool call arguments in small pieces."""
+    calls = [
+        (call["name"], call["id"], json.dumps(call["args"]))
+        for call in message.tool_calls
+    ] + [
+        (call["name"], call["id"], call["args"]) for call in message.invalid_tool_calls
+    ]
+
+    if message.content or not calls:
+        yield AIMessageChunk(content=message.content)
+    for index, (name, call_id, arguments) in enumerate(calls):
+        for start in range(0, len(arguments), chunk_size):
+            first = start == 0
+            yield AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {
+                        "name": name if first else None,
+                        "args": arguments[start : start + chunk_size],
+                        "id": call_id if first else None,
+                        "index": index,
+                    }
+                ],
+            )
+    if message.usage_metadata:
+        yield AIMessageChunk(content="", usage_metadata=message.usage_metadata)
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model recording the outputs of another model, or replaying them.
+
+    In "record" mode, calls are forwarded to `model`, and each prompt is
+    appended to the cassette with the raw output (content, tool calls and
+    token usage) and its latency. In "replay" mode, outputs are served back
+    from the cassette without a provider, so a prompt corpus can be re-run
+    deterministically and offline. Prompts are matched on their normalized
+    user input.
+
+    Attributes:
+        path (str): Cassette file, in JSON Lines.
+        mode (Literal["record", "replay"]): Whether to record or replay outputs.
+        model (BaseChatModel | None): Model to record, required in "record" mode.
+        replay_latency (bool): Whether replays wait for the recorded latency.
+        chunk_size (int): Characters per replayed stream chunk.
+    """
+
+    path: str
+    mode: Literal["record", "replay"] = "replay"
+    model: BaseChatModel | None = None
+    replay_latency: bool = True
+    chunk_size: int = 24
+
+    _entries: dict[str, dict[str, Any]] | None = None
+
+    @model_validator(mode="after")
+    def validate_model(self) -> Self:
+        """Ensures there is a model to record."""
+        if self.mode == "record" and self.model is None:
+            raise ValueError('A model is required in "record" mode.')
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def entries(self) -> dict[str, dict[str, Any]]:
+        """Recorded entries by normalized prompt, loaded on first use."""
+        if self._entries is None:
+            self._entries = load_cassette(self.path)
+        return self._entries
+
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """Binds tools, formatted as the recorded model expects them."""
+        if self.model is not None:
+            binding = self.model.bind_tools(tools, tool_choice=tool_choice, **kwargs)
+            return self.bind(**binding.kwargs)
+
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted_tools, tool_choice=tool_choice, **kwargs)
+
+    def _record(
+        self, messages: list[BaseMessage], message: AIMessage, latency: float
+    ) -> None:
+        """Appends the output for the prompt to the cassette."""
+        entry = {
+            "prompt": _user_input(messages),
+            "model": getattr(self.model, "model_name", self.model._llm_type),
+            "content": message.content,
+            "tool_calls": [
+                {"name": call["name"], "args": call["args"]}
+                for call in message.tool_calls
+            ],
+            "invalid_tool_calls": [
+                {"name": call["name"], "args": call["args"], "error": call["error"]}
+                for call in message.invalid_tool_calls
+            ],
+            "usage": message.usage_metadata,
+            "latency": round(latency, 3),
+        }
+
+        path = Path(self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+        self.entries[normalize_prompt(entry["prompt"])] = entry
+
+    def _replay(self, messages: list[BaseMessage]) -> tuple[AIMessage, float]:
+        """Returns the recorded output for the prompt, and the latency to wait.
+
+        Raises:
+            CassetteMissError: If the prompt was not recorded.
+        """
+        prompt = _user_input(messages)
+        if (entry := self.entries.get(normalize_prompt(prompt))) is None:
+            raise CassetteMissError(f"No recorded output for prompt: {prompt[:100]}")
+
+        message = AIMessage(
+            content=entry["content"],
+            tool_calls=[
+                call | {"id": f"call_{index}"}
+                for index, call in enumerate(entry["tool_calls"])
+            ],
+            invalid_tool_calls=[
+                call | {"id": f"invalid_call_{index}"}
+                for index, call in enumerate(entry.get("invalid_tool_calls", []))
+            ],
+            usage_metadata=entry["usage"],
+        )
+        return message, entry["latency"] if self.replay_latency else 0.0
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.mode == "replay":
+            message, latency = self._replay(messages)
+            time.sleep(latency)
+        else:
+            start = time.perf_counter()
+            message = self.model.invoke(messages, stop=stop, **kwargs)
+            self._record(messages, message, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.mode == "replay":
+            message, latency = self._replay(messages)
+            await asyncio.sleep(latency)
+        else:
+            start = time.perf_counter()
+            message = await self.model.ainvoke(messages, stop=stop, **kwargs)
+            self._record(messages, message, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.mode == "replay":
+            message, latency = self._replay(messages)
+            chunks = list(_chunks(message, self.chunk_size))
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield ChatGenerationChunk(message=chunk)
+            return
+
+        start = time.perf_counter()
+        message = None
+        async for chunk in self.model.astream(messages, stop=stop, **kwargs):
+            message = chunk if message is None else message + chunk
+            yield ChatGenerationChunk(message=chunk)
+        if message is not None:
+            self._record(messages, message, time.perf_counter() - start)
@@ -0,0 +1,118 @@
+import threading
+from collections import deque
+from typing import Any
+
+
+class Counter:
+    """Monotonically increasing metric."""
+
+    def __init__(self, description: str = ""):
+        self.description = description
+        self.value = 0
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "counter", "value": self.value}
+
+
+class Gauge:
+    """Metric that can go up and down."""
+
+    def __init__(self, description: str = ""):
+        self.description = description
+        self.value = 0
+
+    def set(self, value: int | float) -> None:
+        self.value = value
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: int | float = 1) -> None:
+        self.value -= amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    """Distribution of observed values.
+
+    Count, sum and max cover every observation, while percentiles are computed
+    over a bounded window of the most recent observations.
+    """
+
+    def __init__(self, description: str = "", window: int = 1024):
+        self.description = description
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._window: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self._window.append(value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Returns the nearest-rank percentile of recent observations."""
+        if not self._window:
+            return 0.0
+        ordered = sorted(self._window)
+        return ordered[max(round(pct / 100 * len(ordered)) - 1, 0)]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "type": "histogram",
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.mean,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+type Metric = Counter | Gauge | Histogram
+
+
+class MetricsRegistry:
+    """Process-local registry of named metrics."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create[M: Metric](self, name: str, cls: type[M], description: str) -> M:
+        with self._lock:
+            metric = self._metrics.setdefault(name, cls(description))
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric {name} is already registered as another type.")
+        return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Returns the counter with the given name, creating it if necessary."""
+        return self._get_or_create(name, Counter, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        """Returns the gauge with the given name, creating it if necessary."""
+        return self._get_or_create(name, Gauge, description)
+
+    def histogram(self, name: str, description: str = "") -> Histogram:
+        """Returns the histogram with the given name, creating it if necessary."""
+        return self._get_or_create(name, Histogram, description)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Returns the current value of every registered metric."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+METRICS = MetricsRegistry()
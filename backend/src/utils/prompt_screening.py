@@ -0,0 +1,149 @@
+import math
+import re
+from collections import Counter
+from enum import StrEnum
+from typing import NamedTuple
+
+from src.utils.metrics import METRICS
+
+_WORD = re.compile(r"[^\W\d_]+")
+_VOWELS = set("aeiouy")
+_CONSONANT_RUN = re.compile(r"[bcdfghjklmnpqrstvwxz]{5,}")
+
+# Stems of words that tell what a form is for or what it should ask, matched
+# against the start of each word of the prompt
+_KEYWORD_STEMS = (
+    "form", "survey", "questionnaire", "question", "quiz", "poll", "feedback",
+    "review", "rating", "rate", "regist", "sign", "signup", "subscri", "enrol",
+    "appl", "rsvp", "invit", "attend", "event", "book", "reserv", "appointment",
+    "order", "request", "inquir", "enquir", "contact", "report", "collect",
+    "gather", "ask", "capture", "record", "track", "intake", "onboard",
+    "evaluat", "assess", "check", "consent", "waiver", "nominat", "vote",
+    "field", "email", "name", "phone", "address", "date", "detail", "info",
+    "input", "submi", "respon", "answer", "opinion", "preference", "choice",
+    "select", "option", "participa", "member", "volunteer", "candidate",
+    "customer", "student", "patient", "employee", "guest", "client", "user",
+    "people", "parent", "child", "kid", "visitor", "interest", "join", "know",
+    "tell", "think", "find", "learn", "want", "need", "let", "sheet",
+)  # fmt: skip
+
+
+class ScreeningReason(StrEnum):
+    """Prompt screening decision reasons."""
+
+    ACCEPTED = "accepted"
+    REPEATED_CHARACTERS = "repeated_characters"
+    LOW_ENTROPY = "low_entropy"
+    GIBBERISH = "gibberish"
+    OFF_TOPIC = "off_topic"
+
+
+_MESSAGES = {
+    ScreeningReason.REPEATED_CHARACTERS: "The prompt repeats the same characters.",
+    ScreeningReason.LOW_ENTROPY: "The prompt is too repetitive.",
+    ScreeningReason.GIBBERISH: "The prompt does not look like readable text.",
+}
+
+
+class ScreeningResult(NamedTuple):
+    """Decision of the prompt pre-screen."""
+
+    accepted: bool
+    reason: ScreeningReason
+    message: str | None = None  # why the prompt was rejected
+
+
+def char_entropy(text: str) -> float:
+    """Computes the Shannon entropy of the characters of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        float: Entropy in bits per character, about 4 for English prose.
+    """
+    if not text:
+        return 0.0
+    total = len(text)
+    return -sum(
+        count / total * math.log2(count / total) for count in Counter(text).values()
+    )
+
+
+def _is_wordlike(word: str) -> bool:
+    """Returns whether a word could be natural language, e.g. has vowels."""
+    if len(word) > 25:
+        return False
+    if not word.isascii():
+        return True  # only Latin words are checked
+    return bool(_VOWELS & set(word)) and not _CONSONANT_RUN.search(word)
+
+
+class PromptScreener:
+    """Cheap local checks rejecting prompts that cannot produce a useful form.
+
+    Runs before any generation, in microseconds, so unusable prompts do not
+    cost a provider round trip. In order, it rejects prompts with long runs of
+    a repeated character, low character entropy, and mostly non-word tokens.
+    Prompts with no word related to forms or the information they collect are
+    flagged as off-topic but accepted, as no keyword list covers every form.
+
+    Decisions are counted as `prompt_screening_<reason>_total` metrics.
+
+    Attributes:
+        max_repeat (int): Longest allowed run of one non-space character.
+        min_entropy (float): Minimum character entropy, in bits.
+        min_wordlike (float): Minimum share of words that look like words.
+    """
+
+    def __init__(
+        self, max_repeat: int = 8, min_entropy: float = 3.0, min_wordlike: float = 0.6
+    ):
+        self.max_repeat = max_repeat
+        self.min_entropy = min_entropy
+        self.min_wordlike = min_wordlike
+
+        self._repeat = re.compile(rf"(\S)\1{{{max_repeat},}}")
+        self._counters = {
+            reason: METRICS.counter(
+                f"prompt_screening_{reason}_total", f"Prompts screened as {reason}"
+            )
+            for reason in ScreeningReason
+        }
+
+    def _classify(self, prompt: str) -> ScreeningReason:
+        text = prompt.casefold()
+        if self._repeat.search(text):
+            return ScreeningReason.REPEATED_CHARACTERS
+
+        if char_entropy(text) < self.min_entropy:
+            return ScreeningReason.LOW_ENTROPY
+
+        words = _WORD.findall(text)
+        wordlike = sum(map(_is_wordlike, words))
+        if not words or wordlike / len(words) < self.min_wordlike:
+            return ScreeningReason.GIBBERISH
+
+        # Prompts in other scripts cannot be matched against English keywords
+        if text.isascii() and not any(
+            word.startswith(_KEYWORD_STEMS) for word in words
+        ):
+            return ScreeningReason.OFF_TOPIC
+
+        return ScreeningReason.ACCEPTED
+
+    def screen(self, prompt: str) -> ScreeningResult:
+        """Screens a prompt.
+
+        Args:
+            prompt (str): The user prompt.
+
+        Returns:
+            ScreeningResult: The decision, and its reason.
+        """
+        reason = self._classify(prompt)
+        self._counters[reason].inc()
+
+        if (message := _MESSAGES.get(reason)) is None:
+            return ScreeningResult(True, reason)
+        return ScreeningResult(False, reason, message)
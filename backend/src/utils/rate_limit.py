@@ -0,0 +1,193 @@
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from beanie import UpdateResponse
+from pymongo.errors import PyMongoError
+
+from src.config import settings
+from src.models.rate_limit import RateLimitCounter
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for floating point drift when accumulating emission intervals
+_EPSILON = 1e-9
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the full limit is available again
+    retry_after: float  # seconds until the next request is allowed
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Returns `RateLimit-*` and, if rejected, `Retry-After` response headers."""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+def gcra_result(
+    allowed: bool, tat: float, now: float, limit: int, period: float
+) -> RateLimitResult:
+    """Builds a rate limit result from the Generic Cell Rate Algorithm (GCRA) state.
+
+    Args:
+        allowed (bool): Whether the request was allowed.
+        tat (float): Theoretical arrival time after the check.
+        now (float): Time of the check.
+        limit (int): Number of requests allowed per period.
+        period (float): Length of the period in seconds.
+
+    Returns:
+        RateLimitResult: The rate limit result.
+    """
+    interval = period / limit
+
+    if not allowed:
+        return RateLimitResult(
+            allowed=False,
+            limit=limit,
+            remaining=0,
+            reset_after=tat - now,
+            retry_after=tat + interval - period - now,
+        )
+
+    return RateLimitResult(
+        allowed=True,
+        limit=limit,
+        remaining=max(int((now + period - tat) / interval + _EPSILON), 0),
+        reset_after=tat - now,
+        retry_after=0.0,
+    )
+
+
+class RateLimitBackend(ABC):
+    """Base class for rate limit state storage.
+
+    Backends implement GCRA, where each key only stores its theoretical arrival
+    time (TAT), so a check is O(1) regardless of the limit.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, period: float) -> RateLimitResult:
+        """Records a request for the given key if it is within the limit.
+
+        Args:
+            key (str): Identifier of the rate-limited client.
+            limit (int): Number of requests allowed per period.
+            period (float): Length of the period in seconds.
+
+        Returns:
+            RateLimitResult: Whether the request is allowed, with quota details.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Rate limit backend that keeps state in the current process.
+
+    Keys are kept in LRU order and are evicted once they are idle (fully
+    replenished) or when `max_keys` is exceeded.
+
+    Attributes:
+        max_keys (int): Maximum number of keys to track.
+    """
+
+    def __init__(self, max_keys: int = settings.RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._tats: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def hit(self, key: str, limit: int, period: float) -> RateLimitResult:
+        now = time.monotonic()
+        self._evict(now)
+
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + period / limit
+
+        if new_tat - period - now > _EPSILON:
+            return gcra_result(False, tat, now, limit, period)
+
+        if key not in self._tats and len(self._tats) >= self.max_keys:
+            self._tats.popitem(last=False)
+
+        self._tats[key] = new_tat
+        self._tats.move_to_end(key)
+        return gcra_result(True, new_tat, now, limit, period)
+
+    def _evict(self, now: float) -> None:
+        """Evicts idle (fully replenished) keys from the LRU end."""
+        while self._tats:
+            key, tat = next(iter(self._tats.items()))
+            if tat > now:
+                break
+            del self._tats[key]
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """Rate limit backend that shares state across processes through MongoDB.
+
+    Each check is a single atomic `find_one_and_update` upsert using an update
+    pipeline, and idle counters are removed by a TTL index. If MongoDB is
+    unavailable, requests are allowed rather than failing.
+    """
+
+    async def hit(self, key: str, limit: int, period: float) -> RateLimitResult:
+        now = time.time()
+        interval = period / limit
+        pipeline = [
+            {"$set": {"tat": {"$max": [{"$ifNull": ["$tat", now]}, now]}}},
+            {
+                "$set": {
+                    "allowed": {
+                        "$lte": [
+                            {"$add": ["$tat", interval - period]},
+                            now + _EPSILON,
+                        ]
+                    }
+                }
+            },
+            {
+                "$set": {
+                    "tat": {"$cond": ["$allowed", {"$add": ["$tat", interval]}, "$tat"]}
+                }
+            },
+            {"$set": {"expires_at": {"$toDate": {"$multiply": ["$tat", 1000]}}}},
+        ]
+
+        try:
+            counter = await RateLimitCounter.find_one(
+                RateLimitCounter.id == key
+            ).update(pipeline, upsert=True, response_type=UpdateResponse.NEW_DOCUMENT)
+        except PyMongoError as err:
+            logger.warning("Rate limit check failed, allowing request: %s", err)
+            return RateLimitResult(
+                allowed=True, limit=limit, remaining=limit, reset_after=0, retry_after=0
+            )
+
+        return gcra_result(counter.allowed, counter.tat, now, limit, period)
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Returns the rate limit backend configured in settings.
+
+    Returns:
+        RateLimitBackend: A rate limit backend instance.
+    """
+    if settings.RATE_LIMIT_BACKEND == "mongo":
+        return MongoRateLimitBackend()
+    return InMemoryRateLimitBackend()
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+from src.exceptions import ServiceUnavailableError
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Fails fast while a dependency is unhealthy.
+
+    The circuit opens after `failure_threshold` consecutive failures and rejects
+    calls for `reset_timeout` seconds. After that a single trial call is let
+    through per `reset_timeout` (half-open): success closes the circuit, and
+    failure keeps it open.
+
+    Attributes:
+        name (str): Name used as the metric prefix.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Time the circuit stays open, in seconds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._open = METRICS.gauge(
+            f"{name}_circuit_open", "Whether the circuit is open"
+        )
+        self._rejected = METRICS.counter(
+            f"{name}_circuit_rejected_total", "Calls rejected by the open circuit"
+        )
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def check(self) -> None:
+        """Checks whether a call may proceed.
+
+        Raises:
+            ServiceUnavailableError: If the circuit is open.
+        """
+        if self._opened_at is None:
+            return
+
+        now = time.monotonic()
+        remaining = self._opened_at + self.reset_timeout - now
+        if remaining <= 0:
+            # Let a trial call through, rejecting others until it completes
+            self._opened_at = now
+            return
+
+        self._rejected.inc()
+        raise ServiceUnavailableError(
+            "Service is temporarily unavailable. Please try again later.",
+            headers={"Retry-After": str(max(math.ceil(remaining), 1))},
+        )
+
+    def record_success(self) -> None:
+        """Records a successful call, closing the circuit."""
+        if self._opened_at is not None:
+            logger.info("Circuit %s closed", self.name)
+        self._failures = 0
+        self._opened_at = None
+        self._open.set(0)
+
+    def record_failure(self) -> None:
+        """Records a failed call, opening the circuit past the threshold."""
+        self._failures += 1
+        if self._failures >= self.failure_threshold or self._opened_at is not None:
+            if self._opened_at is None:
+                logger.warning("Circuit %s opened", self.name)
+            self._opened_at = time.monotonic()
+            self._open.set(1)
+
+
+class RetryPolicy:
+    """Runs calls with a per-attempt timeout, retries and optional hedging.
+
+    Failed attempts are retried up to `max_retries` times with full-jitter
+    exponential backoff, if `retry_on` considers the error transient. With
+    hedging enabled, a second attempt is started once the first has been
+    running longer than the p95 latency of past attempts, and the first to
+    succeed wins.
+
+    Attributes:
+        name (str): Name used as the metric prefix.
+        timeout (float): Time allowed per attempt, in seconds.
+        max_retries (int): Maximum number of retries after the first attempt.
+        backoff (float): Base backoff delay, in seconds.
+        backoff_max (float): Maximum backoff delay, in seconds.
+        hedge (bool): Whether to hedge slow attempts.
+        hedge_min_samples (int): Latency samples required before hedging.
+        breaker (CircuitBreaker | None): Circuit breaker guarding the calls.
+        retry_on (Callable[[BaseException], bool]): Whether an error is transient.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        max_retries: int,
+        backoff: float,
+        backoff_max: float,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        breaker: CircuitBreaker | None = None,
+        retry_on: Callable[[BaseException], bool] = lambda err: True,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker
+        self.retry_on = retry_on
+
+        self._latency = METRICS.histogram(
+            f"{name}_attempt_seconds", "Duration of successful attempts"
+        )
+        self._timeouts = METRICS.counter(f"{name}_timeouts_total", "Attempts timed out")
+        self._retries = METRICS.counter(f"{name}_retries_total", "Attempts retried")
+        self._hedges = METRICS.counter(f"{name}_hedges_total", "Hedged attempts")
+
+    def backoff_delay(self, retry: int) -> float:
+        """Returns a full-jitter exponential backoff delay for the given retry."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2**retry))
+
+    def hedge_delay(self) -> float | None:
+        """Returns the delay before hedging an attempt, or None to not hedge."""
+        if not self.hedge or self._latency.count < self.hedge_min_samples:
+            return None
+        return self._latency.percentile(95)
+
+    async def call[T](self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Runs `fn` under the retry policy.
+
+        Args:
+            fn (Callable[[], Awaitable[T]]): Function starting an attempt.
+
+        Returns:
+            T: The result of the first successful attempt.
+
+        Raises:
+            ServiceUnavailableError: If the circuit is open, or all attempts
+                failed with transient errors.
+        """
+        for retry in range(self.max_retries + 1):
+            if self.breaker:
+                self.breaker.check()
+
+            try:
+                result = await self._attempt(fn)
+            except Exception as err:
+                if not self.retry_on(err):
+                    # The dependency responded, so it counts towards its health
+                    if self.breaker:
+                        self.breaker.record_success()
+                    raise
+                if self.breaker:
+                    self.breaker.record_failure()
+                logger.warning("Attempt %d of %s failed: %r", retry + 1, self.name, err)
+                last_error = err
+            else:
+                if self.breaker:
+                    self.breaker.record_success()
+                return result
+
+            if retry < self.max_retries:
+                self._retries.inc()
+                await asyncio.sleep(self.backoff_delay(retry))
+
+        raise ServiceUnavailableError(
+            "Service is temporarily unavailable. Please try again later."
+        ) from last_error
+
+    async def _attempt[T](self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Runs a single attempt, hedging it if it is slower than usual."""
+        pending = {asyncio.ensure_future(self._timed(fn))}
+        try:
+            if (delay := self.hedge_delay()) is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    self._hedges.inc()
+                    pending.add(asyncio.ensure_future(self._timed(fn)))
+
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed[T](self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Runs `fn` with the attempt timeout, recording its latency."""
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(fn(), self.timeout)
+        except TimeoutError:
+            self._timeouts.inc()
+            raise
+        self._latency.observe(time.perf_counter() - start)
+        return result
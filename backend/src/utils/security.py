@@ -1,4 +1,5 @@
 import logging
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
@@ -13,7 +14,11 @@ from src.models.user import User
 
 logger = logging.getLogger(__name__)
 
-PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PWD_CONTEXT = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 http_scheme = HTTPBearer()
 
 
@@ -42,6 +47,68 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return PWD_CONTEXT.verify(password, hashed_password)
 
 
+def verify_and_update_password(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verifies a password and rehashes it if its hash parameters are outdated.
+
+    Args:
+        password (str): Password to verify.
+        hashed_password (str): Hashed password.
+
+    Returns:
+        tuple[bool, str | None]: Whether the password matches, and a new hash
+            if the existing one should be replaced.
+    """
+    return PWD_CONTEXT.verify_and_update(password, hashed_password)
+
+
+def measure_hash_time(rounds: int, samples: int = 3) -> float:
+    """Measures the time taken to hash a password with the given bcrypt cost.
+
+    Args:
+        rounds (int): bcrypt cost factor.
+        samples (int, optional): Number of hashes to time. Defaults to 3.
+
+    Returns:
+        float: Fastest observed hash time in milliseconds.
+    """
+    handler = PWD_CONTEXT.handler("bcrypt").using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def calibrate_hash_rounds(
+    target_ms: float, min_rounds: int = 4, max_rounds: int = 20
+) -> tuple[int, dict[int, float]]:
+    """Finds the highest bcrypt cost whose hash time stays within the target.
+
+    Each additional round doubles the hashing time, so the search stops at the
+    first cost that exceeds the target.
+
+    Args:
+        target_ms (float): Target hash latency in milliseconds.
+        min_rounds (int, optional): Lowest cost to consider. Defaults to 4.
+        max_rounds (int, optional): Highest cost to consider. Defaults to 20.
+
+    Returns:
+        tuple[int, dict[int, float]]: The selected cost and the measured hash
+            time (ms) for each cost tried.
+    """
+    selected = min_rounds
+    timings = {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = measure_hash_time(rounds)
+        if timings[rounds] > target_ms:
+            break
+        selected = rounds
+    return selected, timings
+
+
 def create_access_token(email: str) -> str:
     """Creates a JWT access token for the given email.
 
@@ -61,6 +128,24 @@ def create_access_token(email: str) -> str:
     )
 
 
+def get_token_subject(token: str) -> str | None:
+    """Returns the subject (email) of a valid JWT access token.
+
+    Args:
+        token (str): Encoded JWT token.
+
+    Returns:
+        str | None: The token subject, or None if the token is invalid.
+    """
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except jwt.PyJWTError:
+        return None
+    return payload.get("sub")
+
+
 class CurrentUser:
     """
     Dependency to fetch the current authenticated user.
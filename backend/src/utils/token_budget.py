@@ -0,0 +1,87 @@
+import logging
+import math
+from datetime import UTC, date, datetime, time, timedelta
+
+from beanie.odm.operators.update.general import Inc, SetOnInsert
+
+from src.config import settings
+from src.exceptions import TooManyRequestsError
+from src.models.generation import TokenUsage
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudget:
+    """Daily LLM token budget per user, persisted to MongoDB.
+
+    Usage is counted per user and UTC day, so the budget is shared across
+    workers and survives restarts. It is checked before calling the provider
+    and charged afterwards, so concurrent generations of a user may overshoot
+    it by what they use, which per-user concurrency limits keep small.
+
+    Attributes:
+        daily_limit (int): Tokens per user per day, 0 disables the budget.
+    """
+
+    def __init__(self, daily_limit: int = settings.GENERATION_USER_DAILY_TOKENS):
+        self.daily_limit = daily_limit
+        self._exhausted = METRICS.counter(
+            "generation_budget_exhausted_total", "Generations denied by the budget"
+        )
+
+    @staticmethod
+    def _key(user_id: str, day: date) -> str:
+        return f"{user_id}:{day.isoformat()}"
+
+    async def check(self, user_id: str) -> None:
+        """Checks that the user has tokens left today.
+
+        Args:
+            user_id (str): The user id.
+
+        Raises:
+            TooManyRequestsError: If the user has used up today's budget, with a
+                `Retry-After` until the budget resets.
+        """
+        if not self.daily_limit:
+            return
+
+        now = datetime.now(UTC)
+        usage = await TokenUsage.get(self._key(user_id, now.date()))
+        if usage is None or usage.tokens < self.daily_limit:
+            return
+
+        self._exhausted.inc()
+        logger.warning("Daily token budget exhausted for User: %s", user_id)
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), time(), UTC)
+        retry_after = math.ceil((tomorrow - now).total_seconds())
+        raise TooManyRequestsError(
+            "Daily form generation limit reached. Please try again tomorrow.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def charge(self, user_id: str, tokens: int) -> None:
+        """Adds tokens to the user's usage for today.
+
+        Args:
+            user_id (str): The user id.
+            tokens (int): Tokens used.
+        """
+        if not self.daily_limit or not tokens:
+            return
+
+        today = datetime.now(UTC).date()
+        await TokenUsage.find_one(TokenUsage.id == self._key(user_id, today)).update(
+            Inc({TokenUsage.tokens: tokens}),
+            SetOnInsert(
+                {
+                    TokenUsage.user_id: user_id,
+                    TokenUsage.day: today.isoformat(),
+                    TokenUsage.expires_at: datetime.combine(
+                        today + timedelta(days=2), time(), UTC
+                    ),
+                }
+            ),
+            upsert=True,
+        )